@@ -0,0 +1,328 @@
+"""Benchmark the load, queue and transfer hot paths against a throwaway Postgres database and a local FTP server.
+
+A database named `lichens_bench_<pid>` is created on the server of `--dsn` (or `$LICHENS_BENCH_DSN`) and dropped afterwards.
+The FTP benchmark needs `pyftpdlib` and is skipped without it.
+
+Usage:
+    export LICHENS_BENCH_DSN=postgresql+psycopg2://postgres@localhost:5432/postgres
+    python benchmarks/bench_hotpaths.py --rows 100000 --history 100000 --repeat 5 --output bench_hotpaths.json
+    # compare with the result of another version
+    python benchmarks/bench_hotpaths.py --compare bench_hotpaths_old.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+from importlib.metadata import PackageNotFoundError, version
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Engine, create_engine, text
+from sqlalchemy.engine import make_url
+
+from lichens.db.models import Base, EtlProcHist, EtlProgMng
+from lichens.manager import EtlManager
+from lichens.utils import generate_insert_sql
+from lichens.utils.load import LoadTarget
+
+ETL_NAME: str = "bench"
+TABLE: str = "pharmquer.bench_target"
+LOT_TABLE: str = "pharmquer.bench_lot"
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "id": np.arange(rows),
+        "lot": np.char.add("LOT_", rng.integers(0, 10_000, rows).astype(str)).astype(object),
+        "value": rng.uniform(0, 100, rows).round(4),
+        "grade": rng.choice(["A", "B", "C", "D"], rows),
+        # as text, `generate_insert_sql` renders the rows with their repr
+        "measured_at": (pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 86400 * 365, rows), unit="s")).astype(str),
+    })
+
+
+def make_history(rows: int, etl_id: int, queued_ratio: float = 0.1, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    status = rng.choice(["success", "fail", "skip"], rows).astype(object)
+    status[rng.random(rows) < queued_ratio] = "queue"
+    return pd.DataFrame({
+        "etl_id": etl_id,
+        "file_name": [f"file_{i:08d}.csv" for i in range(rows)],
+        "status": status,
+        "update_by": 1,
+        "last_log": '{"status": "seeded"}',
+        "create_dtt": pd.Timestamp("2024-01-01"),
+        "update_dtt": pd.Timestamp("2024-01-01"),
+    })
+
+
+class ThrowawayDatabase:
+    """Create a database on the server of `dsn`, with the lichens tables, and drop it on exit."""
+    def __init__(self, dsn: str) -> None:
+        self._server_url = make_url(dsn)
+        self.name: str = f"lichens_bench_{os.getpid()}"
+        self.url: str = self._server_url.set(database=self.name).render_as_string(hide_password=False)
+
+    def _admin(self, sql: str) -> None:
+        engine: Engine = create_engine(self._server_url, isolation_level="AUTOCOMMIT")
+        with engine.connect() as con:
+            con.execute(text(sql))
+        engine.dispose()
+
+    def __enter__(self) -> "ThrowawayDatabase":
+        self._admin(f"DROP DATABASE IF EXISTS {self.name}")
+        self._admin(f"CREATE DATABASE {self.name}")
+        self.engine: Engine = create_engine(self.url)
+        with self.engine.begin() as con:
+            con.execute(text("CREATE SCHEMA IF NOT EXISTS pharmquer"))
+        Base.metadata.create_all(self.engine)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.engine.dispose()
+        self._admin(f"DROP DATABASE IF EXISTS {self.name} WITH (FORCE)")
+
+
+def measure(fn: Callable[[], object], repeat: int, before: Callable[[], object] = None) -> dict:
+    """Time `repeat` calls, then one more under tracemalloc for the peak memory."""
+    elapsed: list[float] = []
+    for _ in range(repeat):
+        if before:
+            before()
+        t0: float = time.perf_counter()
+        fn()
+        elapsed.append(time.perf_counter() - t0)
+    if before:
+        before()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    ms = np.array(elapsed) * 1000
+    return {
+        "calls": repeat,
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "peak_mem_mb": peak / 1024**2,
+    }
+
+
+def with_rows(result: dict, rows: int) -> dict:
+    result["rows"] = rows
+    result["rows_per_s"] = rows / (result["p50_ms"] / 1000) if result["p50_ms"] else None
+    return result
+
+
+def bench_database(args: argparse.Namespace, df: pd.DataFrame) -> dict:
+    results: dict = {}
+    with ThrowawayDatabase(args.dsn) as db:
+        with db.engine.begin() as con:
+            etl_id: int = con.execute(
+                EtlProgMng.__table__.insert()
+                .values(name=ETL_NAME, src_folder=args.workdir, dst_folder=args.workdir, json_setting={})
+                .returning(EtlProgMng.id)
+            ).scalar_one()
+            con.execute(text(
+                f"CREATE TABLE {TABLE} (id bigint PRIMARY KEY, lot text, value double precision, grade text, measured_at timestamp)"
+            ))
+            con.execute(text(f"CREATE TABLE {LOT_TABLE} (lot text PRIMARY KEY, grade text)"))
+        make_history(args.history, etl_id).to_sql(
+            EtlProcHist.__tablename__, db.engine, schema="pharmquer", if_exists="append", index=False, chunksize=10_000
+        )
+        with db.engine.begin() as con:
+            con.execute(text("ANALYZE pharmquer.etl_proc_hist"))
+
+        em = EtlManager(db.url, ETL_NAME)
+        truncate = lambda: _execute(em._engine, f"TRUNCATE {TABLE}")
+
+        results["generate_insert_sql"] = with_rows(
+            measure(lambda: generate_insert_sql(df, TABLE, args.chunksize, ["id"], False), args.repeat), len(df)
+        )
+        results["load_df"] = with_rows(
+            measure(
+                lambda: em.load_df(df, "bench_target", schema="pharmquer", if_exists="skip", chunksize=args.chunksize, unique_key=["id"]),
+                args.repeat,
+                before=truncate,
+            ),
+            len(df),
+        )
+        try:
+            import pyarrow as pa
+        except ImportError:
+            pa = None
+        if pa is not None:
+            # the same frame as an Arrow table, rendered from its buffers
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            results["load_df arrow"] = with_rows(
+                measure(
+                    lambda: em.load_df(table, "bench_target", schema="pharmquer", if_exists="skip", chunksize=args.chunksize, unique_key=["id"]),
+                    args.repeat,
+                    before=truncate,
+                ),
+                len(df),
+            )
+        # a header and a detail table of one frame: two load_df against one load_many
+        truncate_both = lambda: _execute(em._engine, f"TRUNCATE {TABLE}, {LOT_TABLE}")
+        lots = lambda: df[["lot", "grade"]].drop_duplicates("lot")
+        results["load_df header+detail"] = with_rows(
+            measure(
+                lambda: (
+                    em.load_df(lots(), "bench_lot", schema="pharmquer", if_exists="skip", chunksize=args.chunksize, unique_key=["lot"]),
+                    em.load_df(df, "bench_target", schema="pharmquer", if_exists="skip", chunksize=args.chunksize, unique_key=["id"]),
+                ),
+                args.repeat,
+                before=truncate_both,
+            ),
+            len(df),
+        )
+        targets: list[LoadTarget] = [
+            LoadTarget("bench_lot", columns=["lot", "grade"], schema="pharmquer", if_exists="skip", unique_key=["lot"]),
+            LoadTarget("bench_target", schema="pharmquer", if_exists="skip", unique_key=["id"]),
+        ]
+        results["load_many header+detail"] = with_rows(
+            measure(lambda: em.load_many(targets, df=df, chunksize=args.chunksize), args.repeat, before=truncate_both),
+            len(df),
+        )
+        results["get_queue_list"] = measure(em.get_queue_list, args.calls)
+        results["get_queue_list"]["queued"] = len(em.get_queue_list())
+
+        filenames = iter(f"file_{i:08d}.csv" for i in range(10**9))
+        results["update_status"] = measure(
+            lambda: em.update_status(next(filenames), 1, "success", {"status": "success"}), args.calls
+        )
+        em._engine.dispose()
+    return results
+
+
+def _execute(engine: Engine, sql: str) -> None:
+    with engine.begin() as con:
+        con.execute(text(sql))
+
+
+def bench_ftp(args: argparse.Namespace) -> dict:
+    try:
+        from pyftpdlib.authorizers import DummyAuthorizer
+        from pyftpdlib.handlers import FTPHandler
+        from pyftpdlib.servers import ThreadedFTPServer
+    except ImportError:
+        print("pyftpdlib is not installed. Skip the FTP benchmark.")
+        return {}
+    from lichens.utils.ftp import FtpServer
+
+    root: str = os.path.join(args.workdir, "ftp")
+    local: str = os.path.join(args.workdir, "local")
+    os.makedirs(root)
+    os.makedirs(local)
+    payload: bytes = np.random.default_rng(0).bytes(args.file_size)
+    for i in range(args.files):
+        with open(os.path.join(root, f"f{i:04d}.bin"), "wb") as f:
+            f.write(payload)
+
+    authorizer = DummyAuthorizer()
+    authorizer.add_user("bench", "bench", root, perm="elradfmwMT")
+    handler = type("BenchHandler", (FTPHandler,), {"authorizer": authorizer})
+    server = ThreadedFTPServer(("127.0.0.1", 0), handler)
+    port: int = server.socket.getsockname()[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def clear_local() -> None:
+        shutil.rmtree(local)
+        os.makedirs(local)
+
+    def download() -> None:
+        with FtpServer() as ftp:
+            ftp.connect("127.0.0.1", port)
+            ftp.login("bench", "bench")
+            ftp.parallel_batch_download("/", local, workers=args.ftp_workers, resume=False)
+
+    try:
+        result: dict = measure(download, args.repeat, before=clear_local)
+    finally:
+        server.close_all()
+    nbytes: int = args.files * args.file_size
+    result.update({
+        "files": args.files,
+        "bytes": nbytes,
+        "bytes_per_s": nbytes / (result["p50_ms"] / 1000) if result["p50_ms"] else None,
+    })
+    return {"ftp_parallel_batch_download": result}
+
+
+def compare(current: dict, baseline: dict) -> None:
+    """Print the change of p50 latency and peak memory of each benchmark against a baseline result."""
+    print(f"{'benchmark':<30}{'p50 ms':>12}{'base':>12}{'change':>10}{'peak MB':>10}{'base':>10}")
+    for name, res in current["results"].items():
+        base: dict | None = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        change: float = (res["p50_ms"] / base["p50_ms"] - 1) * 100 if base["p50_ms"] else float("nan")
+        print(f"{name:<30}{res['p50_ms']:>12.2f}{base['p50_ms']:>12.2f}{change:>9.1f}%{res['peak_mem_mb']:>10.1f}{base['peak_mem_mb']:>10.1f}")
+
+
+def _version(package: str) -> str | None:
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="lichens hot path benchmarks")
+    parser.add_argument("--dsn", type=str, default=os.environ.get("LICHENS_BENCH_DSN"), help="sqlalchemy URL of a Postgres server to create the throwaway database on")
+    parser.add_argument("--rows", type=int, default=100_000, help="rows of the loaded frame")
+    parser.add_argument("--chunksize", type=int, default=10_000)
+    parser.add_argument("--history", type=int, default=100_000, help="rows of etl_proc_hist")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of the bulk benchmarks")
+    parser.add_argument("--calls", type=int, default=200, help="calls of the per-file benchmarks")
+    parser.add_argument("--files", type=int, default=20, help="files of the FTP benchmark")
+    parser.add_argument("--file-size", type=int, default=4 * 1024**2)
+    parser.add_argument("--ftp-workers", type=int, default=4)
+    parser.add_argument("--skip", nargs="*", default=[], choices=["db", "ftp"])
+    parser.add_argument("--output", type=str, default=None, help="write the result to a JSON file")
+    parser.add_argument("--compare", type=str, default=None, help="a previous result to compare with")
+    args = parser.parse_args()
+
+    result: dict = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "lichens": _version("lichens"),
+            "pandas": _version("pandas"),
+            "sqlalchemy": _version("sqlalchemy"),
+            "pyarrow": _version("pyarrow"),
+            "args": {k: v for k, v in vars(args).items() if k not in ("dsn", "output", "compare")},
+        },
+        "results": {},
+    }
+    args.workdir = tempfile.mkdtemp(prefix="lichens_bench_")
+    try:
+        if "db" not in args.skip:
+            if not args.dsn:
+                parser.error("--dsn or $LICHENS_BENCH_DSN is required for the database benchmarks; use --skip db to skip them")
+            result["results"].update(bench_database(args, make_frame(args.rows)))
+        if "ftp" not in args.skip:
+            result["results"].update(bench_ftp(args))
+    finally:
+        shutil.rmtree(args.workdir, ignore_errors=True)
+
+    print(json.dumps(result, indent=4))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=4)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
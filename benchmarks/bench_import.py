@@ -0,0 +1,102 @@
+"""Measure the cold start of `import lichens` and of the CLI, each in fresh interpreters.
+
+Usage:
+    python benchmarks/bench_import.py --repeat 20 --output bench_import.json
+    # compare with the result of another version
+    python benchmarks/bench_import.py --compare bench_import_old.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+CASES: dict[str, list[str]] = {
+    "python": ["-c", "pass"],
+    "import lichens": ["-c", "import lichens"],
+    "import lichens.logging": ["-c", "import lichens.logging"],
+    "from lichens import EtlManager": ["-c", "from lichens import EtlManager"],
+    "cli --help": ["-m", "lichens", "--help"],
+    "cli get-template": ["-m", "lichens", "get-template", "--dir", "{tmp}"],
+}
+
+
+def run(args: list[str], repeat: int, env: dict[str, str]) -> list[float]:
+    elapsed: list[float] = []
+    for _ in range(repeat):
+        t0: float = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, env=env, stdout=subprocess.DEVNULL)
+        elapsed.append(time.perf_counter() - t0)
+    return elapsed
+
+
+def heaviest_imports(args: list[str], top: int, env: dict[str, str]) -> list[dict]:
+    """The modules imported directly or one level down with the largest cumulative import time, by `-X importtime`."""
+    out: str = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], env=env, capture_output=True, text=True
+    ).stderr
+    modules: list[dict] = []
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth: int = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1:
+            modules.append({"module": name.strip(), "depth": depth, "cumulative_ms": int(cumulative) / 1000})
+    return sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="lichens import time")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--top", type=int, default=10, help="heaviest imports of `import lichens` and the CLI to list")
+    parser.add_argument("--output", type=str, default=None, help="write the result to a JSON file")
+    parser.add_argument("--compare", type=str, default=None, help="a previous result to compare with")
+    args = parser.parse_args()
+
+    env: dict[str, str] = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    result: dict = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, case in CASES.items():
+            ms = np.array(run([a.format(tmp=tmp) for a in case], args.repeat, env)) * 1000
+            result["results"][name] = {
+                "p50_ms": float(np.percentile(ms, 50)),
+                "p95_ms": float(np.percentile(ms, 95)),
+                "min_ms": float(ms.min()),
+            }
+    interpreter: float = result["results"]["python"]["p50_ms"]
+    for res in result["results"].values():
+        res["over_interpreter_ms"] = res["p50_ms"] - interpreter
+    result["heaviest_imports"] = {
+        "import lichens": heaviest_imports(["-c", "import lichens"], args.top, env),
+        "cli --help": heaviest_imports(["-m", "lichens", "--help"], args.top, env),
+    }
+    print(json.dumps(result, indent=4))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=4)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline: dict = json.load(f)
+        print(f"{'case':<34}{'p50 ms':>10}{'base':>10}{'change':>10}")
+        for name, res in result["results"].items():
+            base: dict | None = baseline.get("results", {}).get(name)
+            if base:
+                print(f"{name:<34}{res['p50_ms']:>10.1f}{base['p50_ms']:>10.1f}{(res['p50_ms'] / base['p50_ms'] - 1) * 100:>9.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Measure the cost of an observation of the metrics, in one thread and in concurrent threads.
+
+Usage:
+    python benchmarks/bench_metrics.py --calls 1000000 --threads 4 --repeat 5 --output bench_metrics.json
+"""
+import argparse
+import json
+import platform
+import threading
+import time
+from typing import Callable
+
+from lichens.metrics import Counter, Histogram, Registry
+
+
+def timeit(fn: Callable[[int], None], calls: int, repeat: int, threads: int = 1) -> list[float]:
+    """Seconds per call of `fn`, called `calls` times by each of `threads` threads, per repeat."""
+    elapsed: list[float] = []
+    for _ in range(repeat):
+        workers: list[threading.Thread] = [threading.Thread(target=fn, args=(calls,)) for _ in range(threads)]
+        t0: float = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed.append((time.perf_counter() - t0) / (calls * threads))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="cost of the metrics on the hot path")
+    parser.add_argument("--calls", type=int, default=1_000_000, help="calls per thread")
+    parser.add_argument("--threads", type=int, default=4, help="threads of the concurrent runs")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=str, default=None, help="write the result to a JSON file")
+    args = parser.parse_args()
+
+    registry = Registry()
+    histogram = Histogram("bench_seconds", "Durations.", ["etl", "stage"], registry=registry)
+    counter = Counter("bench_rows", "Rows.", ["etl", "table"], registry=registry)
+    held_histogram = histogram.labels("bench", "load")
+    held_counter = counter.labels("bench", "t")
+
+    def observe_held(n: int) -> None:
+        for _ in range(n):
+            held_histogram.observe(0.02)
+
+    def observe_labels(n: int) -> None:
+        for _ in range(n):
+            histogram.labels("bench", "load").observe(0.02)
+
+    def inc_held(n: int) -> None:
+        for _ in range(n):
+            held_counter.inc()
+
+    def loop(n: int) -> None:
+        for _ in range(n):
+            pass
+
+    result: dict = {"python": platform.python_version(), "calls": args.calls, "threads": args.threads}
+    # the cost of the loop itself, subtracted from the others
+    overhead: float = min(timeit(loop, args.calls, args.repeat))
+    paths = (
+        ("histogram_observe", observe_held),
+        ("histogram_labels_observe", observe_labels),
+        ("counter_inc", inc_held),
+    )
+    for name, fn in paths:
+        result[name] = {
+            "ns_per_call": round((min(timeit(fn, args.calls, args.repeat)) - overhead) * 1e9, 1),
+            "ns_per_call_concurrent": round((min(timeit(fn, args.calls, args.repeat, args.threads)) - overhead) * 1e9, 1),
+        }
+    # every observation is counted once, whatever the threads
+    expected: int = args.calls * args.repeat * (1 + args.threads)
+    count: int = sum(held_histogram.snapshot()[0])
+    assert count == 2 * expected and held_counter.value == expected, (count, held_counter.value, expected)
+    print(json.dumps(result, indent=4))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
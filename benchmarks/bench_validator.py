@@ -0,0 +1,78 @@
+"""Compare pandera validation against `FastSchema` on a synthetic frame.
+
+Usage:
+    python benchmarks/bench_validator.py --rows 1000000 --repeat 3 --output bench_validator.json
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from lichens.validator import Check, Column, DataFrameSchema, FastSchema
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "id": np.arange(rows),
+        "value": rng.uniform(0, 100, rows),
+        "grade": rng.choice(["A", "B", "C", "D"], rows),
+        "lot": np.char.add("LOT_", rng.integers(0, 10_000, rows).astype(str)).astype(object),
+    })
+
+
+def make_schema() -> DataFrameSchema:
+    return DataFrameSchema({
+        "id": Column(int, Check.ge(0), nullable=False, unique=True),
+        "value": Column(float, Check.in_range(0, 100), nullable=False),
+        "grade": Column(str, Check.isin(["A", "B", "C", "D"]), nullable=False),
+        "lot": Column(str, Check.str_startswith("LOT_"), nullable=False),
+    })
+
+
+def timeit(fn, repeat: int) -> list[float]:
+    elapsed: list[float] = []
+    for _ in range(repeat):
+        t0: float = time.perf_counter()
+        fn()
+        elapsed.append(time.perf_counter() - t0)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pandera vs FastSchema")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=str, default=None, help="write the result to a JSON file")
+    args = parser.parse_args()
+
+    df: pd.DataFrame = make_frame(args.rows)
+    schema: DataFrameSchema = make_schema()
+    fast: FastSchema = FastSchema.from_pandera(schema)
+
+    result: dict = {"rows": args.rows}
+    paths = (
+        ("pandera", lambda: schema.validate(df)),
+        # fast checks followed by the remaining pandera schema (dtypes), the drop-in replacement
+        ("fast", lambda: fast.validate(df)),
+        # the vectorized checks only
+        ("fast_checks_only", lambda: fast.report(df)),
+    )
+    for name, fn in paths:
+        elapsed: list[float] = timeit(fn, args.repeat)
+        result[name] = {
+            "best_s": min(elapsed),
+            "rows_per_s": args.rows / min(elapsed),
+        }
+    result["speedup"] = result["pandera"]["best_s"] / result["fast"]["best_s"]
+    result["speedup_checks_only"] = result["pandera"]["best_s"] / result["fast_checks_only"]["best_s"]
+    print(json.dumps(result, indent=4))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
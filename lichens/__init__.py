@@ -1,2 +1,99 @@
-import pandera as pa
-from lichens.manager import * 
\ No newline at end of file
+"""The public names are loaded on first use, so `import lichens` and the CLI do not pay for pandas, pandera
+and SQLAlchemy until they are needed."""
+import importlib
+
+# public name -> module it is loaded from
+_LAZY: dict[str, str] = {
+    "EtlManager": "lichens.manager.manager",
+    "Status": "lichens.utils.utils",
+    "DupPolicy": "lichens.utils.utils",
+    "generate_insert_sql": "lichens.utils.utils",
+    "get_now_str": "lichens.utils.utils",
+    "ExtractCache": "lichens.utils.cache",
+    "RemoteManifest": "lichens.utils.sync",
+    "RemoteSource": "lichens.utils.stream",
+    "LoadTarget": "lichens.utils.load",
+    "LocalStage": "lichens.db.staging",
+    "Writer": "lichens.db.writers",
+    "register_writer": "lichens.db.writers",
+    "WriteGovernor": "lichens.db.governor",
+    "RetryPolicy": "lichens.db.retry",
+    "LoadReport": "lichens.utils.load",
+    "read_fixed_width": "lichens.utils.mmap_reader",
+    "iter_fixed_width": "lichens.utils.mmap_reader",
+    "read_delimited": "lichens.utils.mmap_reader",
+    "iter_delimited": "lichens.utils.mmap_reader",
+    "EtlProcHist": "lichens.db.models",
+    "EtlProgMng": "lichens.db.models",
+    "DataFrameSchema": "lichens.validator",
+    "Column": "lichens.validator",
+    "Check": "lichens.validator",
+    "check_input": "lichens.validator",
+    "check_output": "lichens.validator",
+    "check_io": "lichens.validator",
+    "check_types": "lichens.validator",
+    "FastSchema": "lichens.validator",
+    "validate_chunked": "lichens.validator",
+    # the other names `from lichens.manager import *` used to export
+    "log": "lichens.manager.manager",
+    "ExceptionBase": "lichens.errors.db_errors",
+    "DatabaseConnectingFailed": "lichens.errors.db_errors",
+    "UpdateStatusFailed": "lichens.errors.db_errors",
+    "RowExistsAlreadyError": "lichens.errors.db_errors",
+    "UniqueKeyMissedError": "lichens.errors.db_errors",
+    "InsertInterruptedError": "lichens.errors.db_errors",
+    "ProgramNotFoundError": "lichens.errors.db_errors",
+    "FILES_PROCESSED": "lichens.metrics",
+    "ROWS_LOADED": "lichens.metrics",
+    "STAGE_DURATION": "lichens.metrics",
+    "JsonLinesExporter": "lichens.tracing",
+    "Span": "lichens.tracing",
+    "current_span": "lichens.tracing",
+    "span": "lichens.tracing",
+    "start_trace": "lichens.tracing",
+    "DataFrame": "pandas",
+    "Engine": "sqlalchemy",
+    "create_engine": "sqlalchemy",
+    "text": "sqlalchemy",
+    "Session": "sqlalchemy.orm",
+    "sessionmaker": "sqlalchemy.orm",
+    "CronTab": "crontab",
+    "PathLike": "os",
+    "sleep": "time",
+    "Literal": "typing",
+    "Callable": "typing",
+    "contextmanager": "contextlib",
+    "getLogger": "logging",
+}
+# public name -> module which is the value itself
+_LAZY_MODULES: dict[str, str] = {
+    "pa": "pandera",
+    "abc": "abc",
+    "os": "os",
+    "pendulum": "pendulum",
+    "shutil": "shutil",
+    "time": "time",
+}
+
+__all__: list[str] = list(_LAZY) + list(_LAZY_MODULES)
+
+
+def __getattr__(name: str):
+    module_name: str | None = _LAZY.get(name) or _LAZY_MODULES.get(name)
+    if module_name is None:
+        if name.startswith("__"):
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        try:  # subpackages, e.g., `from lichens import logging`
+            return importlib.import_module(f"{__name__}.{name}")
+        except ModuleNotFoundError as e:
+            if e.name != f"{__name__}.{name}":
+                raise
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(module_name)
+    value = module if name in _LAZY_MODULES else getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
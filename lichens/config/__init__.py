@@ -0,0 +1 @@
+from lichens.config.templates import *
\ No newline at end of file
@@ -0,0 +1,10 @@
+from typing import Any
+
+etl_prog_mng_template:dict[str, Any] = {
+        "name": 'program_name',
+        "src_folder": 'path/to/files',
+        "dst_folder":'path/to/archive',
+        "json_setting": {},
+        "last_log": {},
+        "update_by": 0
+    }
@@ -0,0 +1,118 @@
+import random
+import time
+from logging import getLogger
+from typing import Callable
+
+from sqlalchemy import Connection, text
+
+from lichens.errors.db_errors import WriteSlotTimeoutError
+
+log = getLogger()
+
+# first key of the advisory locks of the writer slots, i.e., `pg_locks.classid`; the slot number is the second
+WRITE_LOCK_NAMESPACE: int = 0x6C6377  # "lcw"
+
+
+class WriteGovernor:
+    """
+    Caps the concurrent writers of a Postgres database across processes and hosts, and optionally paces them, so
+    the aggregate load stays near what the database sustains instead of thrashing on lock waits and checkpoints.
+
+    A load takes one of `max_writers` slots, i.e., a transaction-level advisory lock `(namespace, slot)`, in its own
+    transaction and waits with backoff while all are taken. The slot is released when the transaction ends,
+    also if the process dies. With `rows_per_s` or `bytes_per_s`, each writer is paced to an equal share of the
+    limit among the slots held when it starts, so the aggregate stays approximately within it.
+    On the other databases only the pacing applies.
+
+    Args:
+        max_writers (int, optional): concurrent writers of the database. Defaults to 4.
+        rows_per_s (float, optional): rows per second of all the writers. Defaults to None, no limit.
+        bytes_per_s (float, optional): bytes of statements per second of all the writers. Defaults to None, no limit.
+        timeout (float, optional): seconds to wait for a slot before raising `WriteSlotTimeoutError`. Defaults to None, forever.
+        namespace (int, optional): first key of the advisory locks; governors of different namespaces do not share slots.
+            Defaults to WRITE_LOCK_NAMESPACE.
+
+    Example:
+    ```
+    em = EtlManager(CONNECTION_STRING, ETL_NAME, governor=WriteGovernor(max_writers=4, rows_per_s=200_000))
+    ```
+    """
+    max_backoff: float = 1.0
+
+    def __init__(
+        self,
+        max_writers: int = 4,
+        rows_per_s: float = None,
+        bytes_per_s: float = None,
+        timeout: float = None,
+        namespace: int = WRITE_LOCK_NAMESPACE,
+    ) -> None:
+        if max_writers < 1:
+            raise ValueError("max_writers must be at least 1.")
+        self.max_writers: int = max_writers
+        self.rows_per_s: float | None = rows_per_s
+        self.bytes_per_s: float | None = bytes_per_s
+        self.timeout: float | None = timeout
+        self.namespace: int = namespace
+
+    def _try_slot(self, con: Connection) -> int | None:
+        # the scan stops at the first slot locked; starting at a random one spreads the writers over the slots
+        start: int = random.randrange(self.max_writers)
+        return con.execute(
+            text(
+                "SELECT s FROM (SELECT (:start + i) % :n AS s FROM generate_series(0, :n - 1) i) slots "
+                "WHERE pg_try_advisory_xact_lock(:ns, s) LIMIT 1"
+            ),
+            {"start": start, "n": self.max_writers, "ns": self.namespace},
+        ).scalar()
+
+    def _held_slots(self, con: Connection) -> int:
+        return con.execute(
+            text("SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND classid = :ns AND objsubid = 2 AND granted"),
+            {"ns": self.namespace},
+        ).scalar()
+
+    def acquire(self, con: Connection) -> Callable[[int, int], None]:
+        """Take a writer slot in the transaction of `con`, waiting while all are taken. It is released with the transaction.
+
+        Args:
+            con (Connection): the connection of the load, in its transaction.
+
+        Raises:
+            WriteSlotTimeoutError: No slot was freed in `timeout` seconds.
+
+        Returns:
+            Callable[[int, int], None]: call it with the rows and bytes of each statement sent; it sleeps to keep the pace.
+        """
+        writers: int = 1
+        if con.dialect.name == "postgresql":
+            started: float = time.monotonic()
+            delay: float = 0.05
+            while (slot := self._try_slot(con)) is None:
+                waited: float = time.monotonic() - started
+                if self.timeout is not None and waited >= self.timeout:
+                    raise WriteSlotTimeoutError(f"All {self.max_writers} writer slots taken for {waited:.1f}s.")
+                time.sleep(delay * random.uniform(0.5, 1.5))
+                delay = min(delay * 2, self.max_backoff)
+            if self.rows_per_s or self.bytes_per_s:
+                writers = max(self._held_slots(con), 1)
+            log.debug(f"Writer slot {slot} of {self.max_writers} taken, {writers} held.")
+        return self._pacer(writers)
+
+    def _pacer(self, writers: int) -> Callable[[int, int], None]:
+        rows_per_s: float | None = self.rows_per_s / writers if self.rows_per_s else None
+        bytes_per_s: float | None = self.bytes_per_s / writers if self.bytes_per_s else None
+        started: float = time.monotonic()
+        sent: list[int] = [0, 0]
+
+        def pace(rows: int, nbytes: int) -> None:
+            sent[0] += rows
+            sent[1] += nbytes
+            due: float = max(
+                sent[0] / rows_per_s if rows_per_s else 0.0,
+                sent[1] / bytes_per_s if bytes_per_s else 0.0,
+            )
+            wait: float = due - (time.monotonic() - started)
+            if wait > 0:
+                time.sleep(wait)
+        return pace
@@ -12,10 +12,12 @@ config = context.config
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
+# Not when run in-process by lichens.db.migrate, which leaves the logging of the application alone.
+if config.config_file_name is not None and "connection" not in config.attributes:
     fileConfig(config.config_file_name)
 
-config.set_main_option('sqlalchemy.url', os.environ.get('LICHENS_SQLALCHEMY_URL'))
+if os.environ.get('LICHENS_SQLALCHEMY_URL'):
+    config.set_main_option('sqlalchemy.url', os.environ.get('LICHENS_SQLALCHEMY_URL'))
 config.set_main_option('script_location', os.path.join(os.path.dirname(os.path.realpath(__file__)), 'versions'))
 # config.set_main_option('sqlalchemy.poolclass', pool.NullPool)
 
@@ -32,7 +34,7 @@ target_metadata = Base.metadata
 
 
 def include_object(object, name, type_, *args, **kwargs):
-        return (type_ == 'table' and name in ['etl_proc_hist', 'etl_prog_mng'])
+        return (type_ == 'table' and name in ['etl_proc_hist', 'etl_prog_mng', 'etl_remote_manifest'])
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -68,6 +70,11 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    connection = config.attributes.get("connection")
+    if connection is not None:  # given by lichens.db.migrate, which holds the migration lock on it
+        _run_migrations(connection)
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -75,14 +82,18 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata,
-            render_as_batch=True, dialect_opts={"paramstyle": "named"},
-            include_schemas=True,
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+        _run_migrations(connection)
+
+
+def _run_migrations(connection) -> None:
+    context.configure(
+        connection=connection, target_metadata=target_metadata,
+        render_as_batch=True, dialect_opts={"paramstyle": "named"},
+        include_schemas=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
 
 
 if context.is_offline_mode():
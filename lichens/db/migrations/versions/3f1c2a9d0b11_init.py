@@ -0,0 +1,68 @@
+"""init
+
+Revision ID: 3f1c2a9d0b11
+Revises: 
+Create Date: 2024-01-08 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9d0b11'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA: str = 'pharmquer'
+
+
+def _has_table(name: str) -> bool:
+    # databases migrated by the former autogenerated revisions have the tables already
+    return sa.inspect(op.get_bind()).has_table(name, schema=SCHEMA)
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSchema(SCHEMA, if_not_exists=True))
+    if not _has_table('etl_prog_mng'):
+        op.create_table(
+            'etl_prog_mng',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=128), nullable=False),
+            sa.Column('src_folder', sa.String(length=256), nullable=False),
+            sa.Column('dst_folder', sa.String(length=256), nullable=False),
+            sa.Column('json_setting', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+            sa.Column('last_log', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+            sa.Column('update_by', sa.Integer(), nullable=True),
+            sa.Column('update_dtt', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('name'),
+            schema=SCHEMA,
+        )
+    if not _has_table('etl_proc_hist'):
+        op.create_table(
+            'etl_proc_hist',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('file_name', sa.String(length=256), nullable=False),
+            sa.Column('etl_id', sa.Integer(), nullable=True),
+            sa.Column('status', sa.String(length=16), nullable=False),
+            sa.Column('update_by', sa.Integer(), nullable=True),
+            sa.Column('last_log', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+            sa.Column('create_dtt', sa.DateTime(), nullable=False),
+            sa.Column('update_dtt', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['etl_id'], [f'{SCHEMA}.etl_prog_mng.id']),
+            sa.PrimaryKeyConstraint('id'),
+            schema=SCHEMA,
+        )
+        op.create_index('ix_pharmquer_etl_proc_hist_create_dtt', 'etl_proc_hist', ['create_dtt'], unique=False, schema=SCHEMA)
+        op.create_index('ix_pharmquer_etl_proc_hist_update_dtt', 'etl_proc_hist', ['update_dtt'], unique=False, schema=SCHEMA)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pharmquer_etl_proc_hist_update_dtt', table_name='etl_proc_hist', schema=SCHEMA)
+    op.drop_index('ix_pharmquer_etl_proc_hist_create_dtt', table_name='etl_proc_hist', schema=SCHEMA)
+    op.drop_table('etl_proc_hist', schema=SCHEMA)
+    op.drop_table('etl_prog_mng', schema=SCHEMA)
@@ -0,0 +1,42 @@
+"""etl_remote_manifest
+
+Revision ID: 7b2e4c1d9a20
+Revises: 3f1c2a9d0b11
+Create Date: 2024-01-22 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e4c1d9a20'
+down_revision: Union[str, None] = '3f1c2a9d0b11'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA: str = 'pharmquer'
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table('etl_remote_manifest', schema=SCHEMA):
+        return
+    op.create_table(
+        'etl_remote_manifest',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('etl_id', sa.Integer(), nullable=False),
+        sa.Column('remote_path', sa.String(length=1024), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=True),
+        sa.Column('mtime', sa.DateTime(), nullable=True),
+        sa.Column('checksum', sa.String(length=128), nullable=True),
+        sa.Column('update_dtt', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['etl_id'], [f'{SCHEMA}.etl_prog_mng.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('etl_id', 'remote_path'),
+        schema=SCHEMA,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('etl_remote_manifest', schema=SCHEMA)
@@ -0,0 +1,31 @@
+"""etl_proc_hist by etl_id and status
+
+Revision ID: c5a8e2f04b37
+Revises: 7b2e4c1d9a20
+Create Date: 2024-02-05 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a8e2f04b37'
+down_revision: Union[str, None] = '7b2e4c1d9a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA: str = 'pharmquer'
+INDEX: str = 'ix_pharmquer_etl_proc_hist_etl_id_status'
+
+
+def upgrade() -> None:
+    indexes: list[dict] = sa.inspect(op.get_bind()).get_indexes('etl_proc_hist', schema=SCHEMA)
+    if any(i['name'] == INDEX for i in indexes):
+        return
+    op.create_index(INDEX, 'etl_proc_hist', ['etl_id', 'status', 'create_dtt'], unique=False, schema=SCHEMA)
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX, table_name='etl_proc_hist', schema=SCHEMA)
@@ -0,0 +1,46 @@
+"""notify the ETL when a file is queued in etl_proc_hist
+
+Revision ID: e1d4b7a9c260
+Revises: c5a8e2f04b37
+Create Date: 2024-02-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1d4b7a9c260'
+down_revision: Union[str, None] = 'c5a8e2f04b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA: str = 'pharmquer'
+FUNCTION: str = 'notify_etl_queue'
+TRIGGER: str = 'tr_etl_proc_hist_notify_queue'
+
+
+def upgrade() -> None:
+    # the channel is lichens.db.notify.queue_channel(etl_id); the payload is the file name
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {SCHEMA}.{FUNCTION}() RETURNS trigger AS $$
+        BEGIN
+            IF (NEW.status IS NULL OR NEW.status = 'queue')
+                AND (TG_OP = 'INSERT' OR OLD.status IS DISTINCT FROM NEW.status) THEN
+                PERFORM pg_notify('lichens_etl_queue_' || NEW.etl_id, left(NEW.file_name, 7000));
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(f"DROP TRIGGER IF EXISTS {TRIGGER} ON {SCHEMA}.etl_proc_hist")
+    op.execute(f"""
+        CREATE TRIGGER {TRIGGER}
+        AFTER INSERT OR UPDATE OF status ON {SCHEMA}.etl_proc_hist
+        FOR EACH ROW EXECUTE FUNCTION {SCHEMA}.{FUNCTION}()
+    """)
+
+
+def downgrade() -> None:
+    op.execute(f"DROP TRIGGER IF EXISTS {TRIGGER} ON {SCHEMA}.etl_proc_hist")
+    op.execute(f"DROP FUNCTION IF EXISTS {SCHEMA}.{FUNCTION}()")
@@ -1,19 +1,25 @@
-from sqlalchemy import Column, ForeignKey, Integer, MetaData, String, func, DateTime
+from sqlalchemy import JSON, BigInteger, Column, ForeignKey, Index, Integer, MetaData, String, UniqueConstraint, func, DateTime
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base
 
-Base = declarative_base(metadata=MetaData(schema='pharmquer'))
+SCHEMA: str = 'pharmquer'
+# JSONB on Postgres, JSON on the embedded databases, e.g., SQLite for local runs
+JSONType = JSON().with_variant(JSONB(), 'postgresql')
+
+Base = declarative_base(metadata=MetaData(schema=SCHEMA))
 
 
 class EtlProcHist(Base):
     __tablename__ = "etl_proc_hist"
-    
+    # the queue and the status reports look files up by ETL and status
+    __table_args__ = (Index('ix_pharmquer_etl_proc_hist_etl_id_status', 'etl_id', 'status', 'create_dtt'),)
+
     id = Column(Integer, nullable=False, primary_key=True)
     file_name  = Column(String(256), nullable=False, )
     etl_id = Column(Integer, ForeignKey('etl_prog_mng.id'))
     status = Column(String(16), nullable=False,)
     update_by = Column(Integer)
-    last_log = Column(JSONB)
+    last_log = Column(JSONType)
     create_dtt = Column(DateTime, default=func.now(), nullable=False, index=True)
     update_dtt = Column(DateTime, default=func.now(), nullable=False, index=True)
 
@@ -25,7 +31,20 @@ class EtlProgMng(Base):
     name  = Column(String(128), nullable=False, unique=True)
     src_folder = Column(String(256), nullable=False,)
     dst_folder = Column(String(256), nullable=False,)
-    json_setting = Column(JSONB, nullable=False,)
-    last_log = Column(JSONB)
+    json_setting = Column(JSONType, nullable=False,)
+    last_log = Column(JSONType)
     update_by = Column(Integer)
-    update_dtt = Column(DateTime, default=func.now(), nullable=False)
\ No newline at end of file
+    update_dtt = Column(DateTime, default=func.now(), nullable=False)
+
+
+class EtlRemoteManifest(Base):
+    __tablename__ = "etl_remote_manifest"
+    __table_args__ = (UniqueConstraint('etl_id', 'remote_path'),)
+
+    id = Column(Integer, nullable=False, primary_key=True)
+    etl_id = Column(Integer, ForeignKey('etl_prog_mng.id'), nullable=False)
+    remote_path = Column(String(1024), nullable=False)
+    size = Column(BigInteger)
+    mtime = Column(DateTime)
+    checksum = Column(String(128))
+    update_dtt = Column(DateTime, default=func.now(), nullable=False)
@@ -0,0 +1,81 @@
+import select
+import time
+from logging import getLogger
+
+from sqlalchemy import Engine
+
+log = getLogger()
+
+# channel of the notifications of the files queued for an ETL, followed by its etl_id; see the revision e1d4b7a9c260
+QUEUE_CHANNEL_PREFIX: str = "lichens_etl_queue_"
+
+
+def queue_channel(etl_id: int) -> str:
+    """The channel notified when a file is queued for the ETL."""
+    return f"{QUEUE_CHANNEL_PREFIX}{int(etl_id)}"
+
+
+def _has_notifies_timeout() -> bool:
+    """Whether psycopg's `Connection.notifies()` takes `timeout` and `stop_after`, added in psycopg 3.2."""
+    import psycopg
+
+    return tuple(int(v) for v in psycopg.__version__.split(".")[:2]) >= (3, 2)
+
+
+class QueueListener:
+    """
+    LISTENs to a channel on a connection of its own, outside the pool, with psycopg2 or psycopg 3.
+
+    Args:
+        engine (Engine): engine of the Postgres database.
+        channel (str): the channel, e.g., `queue_channel(etl_id)`.
+    """
+    def __init__(self, engine: Engine, channel: str) -> None:
+        self.channel: str = channel
+        raw = engine.raw_connection()
+        self._con = raw.driver_connection
+        raw.detach()  # autocommit and LISTEN stay on this connection, which is closed rather than returned to the pool
+        self._raw = raw
+        self._con.autocommit = True
+        self._psycopg2: bool = type(self._con).__module__.startswith("psycopg2")
+        # psycopg 3.1 has no timeout in `notifies()`: collect the notifications a query on a readable socket delivers
+        self._received: list[str] | None = None if self._psycopg2 or _has_notifies_timeout() else []
+        if self._received is not None:
+            self._con.add_notify_handler(lambda n: self._received.append(n.payload))
+        cursor = self._con.cursor()
+        try:
+            cursor.execute(f'LISTEN "{channel}"')
+        finally:
+            cursor.close()
+
+    def wait(self, timeout: float) -> list[str]:
+        """Wait for notifications up to `timeout` seconds.
+
+        Returns:
+            list[str]: the payloads received, empty on timeout.
+        """
+        if not self._psycopg2 and self._received is None:  # psycopg >= 3.2
+            return [n.payload for n in self._con.notifies(timeout=timeout, stop_after=1)]
+        deadline: float = time.monotonic() + timeout
+        while True:
+            if self._psycopg2:
+                self._con.poll()
+                payloads: list[str] = [n.payload for n in self._con.notifies]
+                self._con.notifies.clear()
+            else:
+                payloads = self._received[:]
+                self._received.clear()
+            if payloads:
+                return payloads
+            remaining: float = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            if select.select([self._con.fileno()], [], [], remaining)[0] and not self._psycopg2:
+                self._con.execute("SELECT 1")  # reads the socket, calling the notify handler
+
+    def close(self) -> None:
+        try:
+            # closes the connection without the rollback of a pooled one, which fails if the connection is lost
+            self._raw.invalidate()
+        except Exception as e:
+            log.debug(f"Closing the listener of {self.channel}: {e}")
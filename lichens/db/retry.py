@@ -0,0 +1,65 @@
+import random
+from typing import NamedTuple
+
+from sqlalchemy.exc import DBAPIError
+
+# SQLSTATEs worth a retry: the statement or the connection failed, not the data
+# https://www.postgresql.org/docs/current/errcodes-appendix.html
+TRANSIENT_SQLSTATES: frozenset[str] = frozenset({
+    "40001",  # serialization_failure
+    "40P01",  # deadlock_detected
+    "55P03",  # lock_not_available, e.g., lock_timeout
+    "53300",  # too_many_connections
+    "57P01",  # admin_shutdown
+    "57P02",  # crash_shutdown
+    "57P03",  # cannot_connect_now
+})
+# the connection, and so the transaction, is lost with these
+CONNECTION_SQLSTATE_PREFIX: str = "08"
+CONNECTION_SQLSTATES: frozenset[str] = frozenset({"57P01", "57P02", "57P03"})
+
+
+def _sqlstate(e: DBAPIError) -> str | None:
+    orig = e.orig
+    return getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+
+
+def needs_new_connection(e: BaseException) -> bool:
+    """Whether the error lost the connection, and with it the transaction."""
+    if not isinstance(e, DBAPIError):
+        return False
+    if e.connection_invalidated:
+        return True
+    code: str | None = _sqlstate(e)
+    return code is not None and (code.startswith(CONNECTION_SQLSTATE_PREFIX) or code in CONNECTION_SQLSTATES)
+
+
+def is_transient(e: BaseException) -> bool:
+    """Whether the error may pass if the statement is retried, e.g., a connection reset or a deadlock,
+    rather than a permanent one, e.g., a constraint violation or a syntax error."""
+    if not isinstance(e, DBAPIError):
+        return False
+    if needs_new_connection(e):
+        return True
+    code: str | None = _sqlstate(e)
+    if code is not None:
+        return code in TRANSIENT_SQLSTATES
+    # SQLite has no SQLSTATE
+    return "database is locked" in str(e.orig)
+
+
+class RetryPolicy(NamedTuple):
+    """Retries of the chunks of a load on transient errors, with jittered exponential backoff.
+
+    Args:
+        max_attempts (int, optional): attempts of a chunk, the first one included. Defaults to 5.
+        base_delay (float, optional): seconds of the first backoff. Defaults to 0.2.
+        max_delay (float, optional): cap of the backoff in seconds. Defaults to 10.0.
+    """
+    max_attempts: int = 5
+    base_delay: float = 0.2
+    max_delay: float = 10.0
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait before the `attempt`-th retry, drawn from [0, min(max_delay, base_delay * 2**(attempt - 1))]."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
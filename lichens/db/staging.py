@@ -0,0 +1,88 @@
+import importlib.util
+import sqlite3
+from logging import getLogger
+from typing import Any, Literal
+
+import pandas as pd
+from pandas.core.frame import DataFrame
+
+log = getLogger()
+
+
+class LocalStage:
+    """
+    An embedded database in the ETL process to join and aggregate large intermediate frames at in-process speed,
+    so only the final result is loaded to Postgres. DuckDB is used when it is installed (`pip install lichens[duckdb]`),
+    SQLite otherwise.
+
+    Args:
+        path (str, optional): database file, or ":memory:". Defaults to ":memory:".
+        backend (Literal["duckdb", "sqlite"], optional): Defaults to DuckDB if installed, else SQLite.
+
+    Example:
+    ```
+    with LocalStage() as stage:
+        stage.put("detail", detail_df)
+        stage.put("lots", lots_df)
+        summary = stage.query("SELECT l.product, avg(d.value) AS mean FROM detail d JOIN lots l USING (lot_id) GROUP BY 1")
+    em.load_df(summary, "product_summary", schema="qc", if_exists="replace", unique_key=["product"])
+    ```
+    """
+    def __init__(self, path: str = ":memory:", backend: Literal["duckdb", "sqlite"] = None) -> None:
+        self.path: str = path
+        self.backend: str = backend or ("duckdb" if importlib.util.find_spec("duckdb") else "sqlite")
+        if self.backend == "duckdb":
+            import duckdb
+            self._con = duckdb.connect(path)
+        elif self.backend == "sqlite":
+            self._con = sqlite3.connect(path)
+        else:
+            raise ValueError(f"Unknown backend {self.backend}. Use 'duckdb' or 'sqlite'.")
+
+    def put(self, name: str, df: DataFrame, if_exists: Literal["replace", "append"] = "replace") -> None:
+        """Write a frame to a table of the stage.
+
+        Args:
+            name (str): table name.
+            df (DataFrame): the frame.
+            if_exists (Literal["replace", "append"], optional): replace the table or append to it. Defaults to "replace".
+        """
+        if self.backend == "duckdb":
+            self._con.register("_lichens_put", df)
+            try:
+                if if_exists == "append":
+                    self._con.execute(f"INSERT INTO {name} SELECT * FROM _lichens_put")
+                else:
+                    self._con.execute(f"CREATE OR REPLACE TABLE {name} AS SELECT * FROM _lichens_put")
+            finally:
+                self._con.unregister("_lichens_put")
+        else:
+            df.to_sql(name, self._con, if_exists=if_exists, index=False)
+        log.debug(f"Staged {len(df)} rows in {name}.")
+
+    def query(self, sql: str, params: list[Any] | dict[str, Any] = None) -> DataFrame:
+        """Run a query on the stage.
+
+        Args:
+            sql (str): the query, with `?` parameters, or `$name` on DuckDB and `:name` on SQLite.
+            params (list[Any] | dict[str, Any], optional): the parameters. Defaults to None.
+
+        Returns:
+            DataFrame: the result.
+        """
+        if self.backend == "duckdb":
+            return self._con.execute(sql, params).df()
+        return pd.read_sql_query(sql, self._con, params=params)
+
+    def execute(self, sql: str) -> None:
+        """Run a statement on the stage, e.g., `CREATE INDEX`."""
+        self._con.execute(sql)
+
+    def close(self) -> None:
+        self._con.close()
+
+    def __enter__(self) -> "LocalStage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
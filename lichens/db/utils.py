@@ -1,5 +1,5 @@
-from lichens.db.models import EtlProgMng
-from sqlalchemy import Engine
+from lichens.db.models import SCHEMA, EtlProgMng
+from sqlalchemy import Connection, Engine, create_engine, event
 from sqlalchemy.orm import Session
 
 def add_etl(orm:EtlProgMng, con:Engine)->str | None:    
@@ -15,3 +15,38 @@ def add_etl(orm:EtlProgMng, con:Engine)->str | None:
     finally:
         if sess:
             sess.close()
+
+def add_etls(orms:list[EtlProgMng], con:Engine)->list[str]:
+    """Add the ETLs in one transaction: all of them or none."""
+    with Session(con) as sess:
+        try:
+            sess.add_all(orms)
+            sess.commit()
+            return [orm.name for orm in orms]
+        except Exception as e:
+            sess.rollback()
+            raise e
+
+def get_engine(con:str | Engine)->Engine:
+    """The engine of a connection string, checking pooled connections before use, so a connection broken by
+    a network blip is replaced rather than failing the next statement.
+    SQLite has no schemas, so the system tables are read and written without one."""
+    engine:Engine = create_engine(con, pool_pre_ping=True) if isinstance(con, str) else con
+    if engine.dialect.name == "sqlite":
+        _begin_sqlite_transactions(engine)
+        engine = engine.execution_options(schema_translate_map={SCHEMA: None})
+    return engine
+
+def _begin_sqlite_transactions(engine:Engine)->None:
+    """Let SQLAlchemy begin the transactions of pysqlite, which begins none before a SAVEPOINT by itself, 
+    so releasing the savepoint of a chunk committed it. The recipe of the SQLAlchemy docs for pysqlite."""
+    if engine.dialect.driver != "pysqlite" or event.contains(engine, "begin", _begin):
+        return
+    event.listen(engine, "connect", _driver_autocommit)
+    event.listen(engine, "begin", _begin)
+
+def _driver_autocommit(dbapi_connection, connection_record)->None:
+    dbapi_connection.isolation_level = None
+
+def _begin(con:Connection)->None:
+    con.exec_driver_sql("BEGIN")
@@ -0,0 +1,166 @@
+import abc
+import hashlib
+import uuid
+from logging import getLogger
+from typing import Callable, NamedTuple
+
+from sqlalchemy import Connection, Engine, text
+
+from lichens.errors.db_errors import DialectNotSupportedError
+from lichens.tracing import span
+from lichens.utils.load import DEFAULT_CHUNKSIZE, RenderedFrame, conflict_clause, frame_digest, insert_statements
+
+log = getLogger()
+
+
+class Chunk(NamedTuple):
+    """A statement of a load, which can be executed again on another connection if it fails.
+    `digest` identifies what it writes, so a load resumes the progress of an earlier one only if it writes the same data."""
+    index: int
+    rows: int
+    nbytes: int
+    execute: Callable[[Connection], None]
+    digest: str = ""
+
+
+def statement_digest(statement: str) -> str:
+    """The `Chunk.digest` of an SQL statement."""
+    return hashlib.blake2b(statement.encode(), digest_size=16).hexdigest()
+
+
+class Writer(abc.ABC):
+    """
+    Writes the columns of a frame to a table of one SQL dialect, in the transaction of the given connection.
+    `EtlManager.load_df()` and `load_many()` pick the writer of the dialect of their engine.
+    Subclass it and decorate it with `register_writer` to load another database.
+    """
+    dialect: str = None
+    # whether a failed chunk can be rolled back alone with a SAVEPOINT and retried in the same transaction
+    savepoints: bool = True
+
+    def qualify(self, tablename: str, schema: str = None) -> str:
+        """The table name used in the statements."""
+        return f"{schema}.{tablename}" if schema else tablename
+
+    @abc.abstractmethod
+    def chunks(
+        self,
+        frame: RenderedFrame,
+        tablename: str,
+        columns: list[str],
+        table_columns: list[str] = None,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        unique_key: list[str] = None,
+        skip_on_conflict: bool = False,
+        distinct: bool = False,
+    ) -> list[Chunk]:
+        """The statements writing `columns` of the frame to `table_columns` of the table.
+
+        Args:
+            frame (RenderedFrame): the frame, with the SQL literals rendered once for the writes sharing it.
+            tablename (str): the table name from `qualify()`.
+            columns (list[str]): the columns of the frame.
+            table_columns (list[str], optional): the columns of the table. Defaults to `columns`.
+            chunksize (int, optional): rows per statement. Defaults to DEFAULT_CHUNKSIZE.
+            unique_key (list[str], optional): conflict columns; None to raise on conflicts. Defaults to None.
+            skip_on_conflict (bool, optional): skip the conflicting rows rather than update them. Defaults to False.
+            distinct (bool, optional): write identical rows once. Defaults to False.
+
+        Returns:
+            list[Chunk]: the statements in order.
+        """
+
+    def write(self, con: Connection, frame: RenderedFrame, tablename: str, columns: list[str], *args, on_chunk: Callable[[int, int], None] = None, **kwargs) -> int:
+        """Execute the `chunks()` in the transaction of `con`, without retries.
+
+        Args:
+            on_chunk (Callable[[int, int], None], optional): called with the rows and bytes of each statement sent,
+                e.g., the pacing of `WriteGovernor.acquire()`. Defaults to None.
+
+        Returns:
+            int: rows sent to the database.
+        """
+        rows: int = 0
+        for chunk in self.chunks(frame, tablename, columns, *args, **kwargs):
+            with span("load.chunk", table=tablename, chunk=chunk.index):
+                chunk.execute(con)
+            rows += chunk.rows
+            if on_chunk is not None:
+                on_chunk(chunk.rows, chunk.nbytes)
+        return rows
+
+
+WRITERS: dict[str, type[Writer]] = {}
+
+
+def register_writer(cls: type[Writer]) -> type[Writer]:
+    """Register a writer for `cls.dialect`, i.e., `engine.dialect.name`, replacing the registered one."""
+    WRITERS[cls.dialect] = cls
+    return cls
+
+
+def get_writer(con: Engine | Connection) -> Writer:
+    """The writer of the dialect of the engine.
+
+    Raises:
+        DialectNotSupportedError: No writer is registered for the dialect.
+    """
+    cls: type[Writer] | None = WRITERS.get(con.dialect.name)
+    if cls is None:
+        raise DialectNotSupportedError(f"No writer for {con.dialect.name}. Registered: {', '.join(sorted(WRITERS))}.")
+    return cls()
+
+
+class SqlWriter(Writer):
+    """Multi-row `INSERT ... VALUES` statements with `ON CONFLICT` clauses, rendered from the SQL literals of the frame."""
+
+    def chunks(self, frame, tablename, columns, table_columns=None, chunksize=DEFAULT_CHUNKSIZE, unique_key=None, skip_on_conflict=False, distinct=False) -> list[Chunk]:
+        with span("load.render", table=tablename):
+            rows: list[str] = frame.rows(columns, distinct=distinct)
+            statements: list[str] = insert_statements(tablename, table_columns or columns, rows, chunksize, unique_key, skip_on_conflict)
+        return [
+            Chunk(i, min(chunksize, len(rows) - i * chunksize), len(statement), lambda con, s=statement: con.execute(text(s)), statement_digest(statement))
+            for i, statement in enumerate(statements)
+        ]
+
+
+@register_writer
+class PostgresWriter(SqlWriter):
+    dialect: str = "postgresql"
+
+
+@register_writer
+class SqliteWriter(SqlWriter):
+    """SQLite has no schemas, so the tables are written to the main database whatever the schema."""
+    dialect: str = "sqlite"
+
+    def qualify(self, tablename: str, schema: str = None) -> str:
+        return tablename.rpartition(".")[2]
+
+
+@register_writer
+class DuckDBWriter(Writer):
+    """The frame, pandas or Arrow, is scanned by DuckDB in-process and inserted by one `INSERT ... SELECT`, without rendering it to SQL.
+    Requires `duckdb-engine`, e.g., `pip install lichens[duckdb]`."""
+    dialect: str = "duckdb"
+    savepoints: bool = False
+
+    def chunks(self, frame, tablename, columns, table_columns=None, chunksize=DEFAULT_CHUNKSIZE, unique_key=None, skip_on_conflict=False, distinct=False) -> list[Chunk]:
+        # a pandas frame or an Arrow table, which DuckDB scans in place
+        projected = frame.project(columns, distinct=distinct)
+        table_columns = table_columns or columns
+        view: str = f"_lichens_{uuid.uuid4().hex}"
+        statement: str = (
+            f"INSERT INTO {tablename} ({', '.join(table_columns)}) SELECT * FROM {view}"
+            + conflict_clause(table_columns, unique_key, skip_on_conflict)
+        )
+
+        def _execute(con: Connection) -> None:
+            raw = con.connection.driver_connection
+            raw.register(view, projected)
+            try:
+                raw.execute(statement)
+            finally:
+                raw.unregister(view)
+        digest: str = statement_digest(statement.replace(view, "") + frame_digest(projected))
+        return [Chunk(0, len(projected), frame.nbytes(columns), _execute, digest)]
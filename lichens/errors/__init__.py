@@ -1,2 +1,3 @@
 from lichens.errors.db_errors import * 
-from lichens.errors.file_errors import * 
\ No newline at end of file
+from lichens.errors.file_errors import * 
+from lichens.errors.validation_errors import * 
\ No newline at end of file
@@ -32,4 +32,16 @@ class InsertInterruptedError(ExceptionBase):
     
 class ProgramNotFoundError(ExceptionBase):
     def __repr__(self) -> str:
-        return super().__repr__()
\ No newline at end of file
+        return super().__repr__()
+
+class DialectNotSupportedError(ExceptionBase):
+    def __repr__(self) -> str:
+        return super().__repr__()
+
+class WriteSlotTimeoutError(ExceptionBase):
+    def __repr__(self) -> str:
+        return f'Timed out waiting for a writer slot. Detail: {self.msg}'
+
+class DatabaseAheadError(ExceptionBase):
+    def __repr__(self) -> str:
+        return f'The database has revisions this lichens does not ship. Detail: {self.msg}'
@@ -0,0 +1,6 @@
+from lichens.errors.db_errors import ExceptionBase
+
+
+class RecordFormatError(ExceptionBase):
+    def __repr__(self) -> str:
+        return f'Malformed record. Detail: {self.msg}'
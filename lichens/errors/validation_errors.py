@@ -0,0 +1,10 @@
+from lichens.errors.db_errors import ExceptionBase
+
+
+class ValidationFailedError(ExceptionBase):
+    def __init__(self, msg: str | None = None, failure_cases=None, *args: object) -> None:
+        super().__init__(msg, *args)
+        self.failure_cases = failure_cases
+
+    def __repr__(self) -> str:
+        return f'Data validation failed. Detail: {self.msg}'
@@ -1,5 +1,11 @@
+import atexit
+import json
 import logging
+import queue
 import string
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import IO
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -22,13 +28,117 @@ class CustomFormatter(logging.Formatter):
         logging.CRITICAL: format.substitute({"color":bold_red})
     }
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # built once, not per record
+        self._formatters: dict[int, logging.Formatter] = {
+            level: logging.Formatter(fmt) for level, fmt in self.FORMATS.items()
+        }
+
     def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt)
+        formatter = self._formatters.get(record.levelno) or self._formatters[logging.INFO]
         return formatter.format(record)
-    
+
+
+# attributes every LogRecord has; the others come from `extra=` and go to the JSON output as they are
+_RECORD_ATTRS: frozenset[str] = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format a record as one line of JSON, e.g., for log collectors. The fields of `extra=` are included.
+
+    Example:
+    ```
+    log.info("loaded", extra={"table": "sales", "rows": 1000})
+    # {"time": "2024-01-01T00:00:00.000+08:00", "level": "INFO", "logger": "root", "message": "loaded", "file": "etl.py", "line": 12, "table": "sales", "rows": 1000}
+    ```
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        out: dict = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "file": record.filename,
+            "line": record.lineno,
+        }
+        for k, v in record.__dict__.items():
+            if k not in _RECORD_ATTRS:
+                out[k] = v
+        if record.exc_info:
+            out["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(out, default=str, ensure_ascii=False)
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str = None) -> str:
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        t = self.converter(record.created)
+        tz: str = time.strftime("%z", t)
+        return f"{time.strftime('%Y-%m-%dT%H:%M:%S', t)}.{int(record.msecs):03d}{tz[:3]}:{tz[3:]}"
+
+
+class _LazyQueueHandler(QueueHandler):
+    """Enqueue the record as it is; only the message is merged here. Formatting runs in the listener thread."""
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+_listener: QueueListener | None = None
+
+
+def use_async_logging(json_format: bool = False, level: int = logging.INFO, stream: IO[str] = None) -> QueueListener:
+    """Move the console output off the calling thread. The root logger enqueues the records,
+    and a `QueueListener` thread formats and writes them. The queue is flushed at exit or by `stop_async_logging()`.
+
+    Args:
+        json_format (bool, optional): Write one JSON object per line instead of the colored text. Defaults to False.
+        level (int, optional): Level of the console output. Defaults to logging.INFO.
+        stream (IO[str], optional): Where to write. Defaults to sys.stderr.
+
+    Returns:
+        QueueListener: the running listener.
+
+    Example:
+    ```
+    from lichens.logging import logger as log, use_async_logging
+    use_async_logging(json_format=True)
+    log.info("loaded", extra={"rows": 1000})
+    ```
+    """
+    global _listener
+    stop_async_logging()
+    handler = logging.StreamHandler(stream)
+    handler.setLevel(level)
+    handler.setFormatter(JsonFormatter() if json_format else CustomFormatter())
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    for h in [h for h in logger.handlers if h is ch or isinstance(h, _LazyQueueHandler)]:
+        logger.removeHandler(h)
+    logger.addHandler(_LazyQueueHandler(q))
+    _listener = QueueListener(q, handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_async_logging() -> None:
+    """Flush the queued records and go back to the synchronous console handler."""
+    global _listener
+    if _listener is None:
+        return
+    for h in [h for h in logger.handlers if isinstance(h, _LazyQueueHandler)]:
+        logger.removeHandler(h)
+    _listener.stop()
+    _listener = None
+    if ch not in logger.handlers:
+        logger.addHandler(ch)
+
+
+atexit.register(stop_async_logging)
+
 # create console handler with a higher log level
 ch = logging.StreamHandler()
 ch.setLevel(logging.INFO)
 ch.setFormatter(CustomFormatter())
-logger.addHandler(ch)
\ No newline at end of file
+logger.addHandler(ch)
@@ -1,16 +1,30 @@
 from os import PathLike
+import hashlib
 import os
 from time import sleep
 import time
 from typing import Literal, Callable
+from contextlib import contextmanager, nullcontext
 from crontab import CronTab
 import pendulum
 import shutil
-from sqlalchemy import Engine, create_engine, text
+from sqlalchemy import Connection, Engine, func
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session, sessionmaker
 from lichens.db.models import EtlProcHist, EtlProgMng
+from lichens.db.governor import WriteGovernor
+from lichens.db.notify import QueueListener, queue_channel
+from lichens.db.retry import RetryPolicy, is_transient, needs_new_connection
+from lichens.db.utils import get_engine
+from lichens.db.writers import Chunk, Writer, get_writer
 from lichens.errors.db_errors import *
-from lichens.utils import Status, generate_insert_sql, DupPolicy
+from lichens.metrics import FILES_PROCESSED, LOAD_RETRIES, ROWS_LOADED, STAGE_DURATION
+from lichens.tracing import JsonLinesExporter, Span, current_span, span, start_trace
+from lichens.utils import Status, DupPolicy
+from lichens.utils.cache import ExtractCache
+from lichens.utils.load import DEFAULT_CHUNKSIZE, LoadReport, LoadTarget, RenderedFrame, frame_columns, order_targets, to_frame
+from lichens.utils.stream import RemoteSource
+from lichens.utils.sync import RemoteManifest
 from pandas.core.frame import DataFrame
 import abc
 from logging import getLogger
@@ -19,23 +33,59 @@ from lichens.utils.utils import get_now_str
 
 log = getLogger()
 
+# key of `etl_proc_hist.last_log` recording the committed chunks of the loads of the file
+LOAD_PROGRESS_KEY: str = "load_progress"
+
+
+def _conflict_handling(if_exists: str, unique_key: list[str] | None) -> tuple[list[str] | None, bool]:
+    """The conflict columns of a `DupPolicy`, and whether the conflicting rows are skipped rather than updated."""
+    if str(if_exists) == DupPolicy.REPLACE.name:
+        return unique_key, False
+    if str(if_exists) == DupPolicy.SKIP.name:
+        return unique_key, True
+    return None, False  # DupPolicy.RAISE_ERROR
+
+
+def _plan_key(plan: list[tuple[str, Chunk]]) -> str:
+    """Identifies the statements of a load, so the progress of another load of the same file, e.g., of another chunk of it
+    or of a corrected frame, is not resumed."""
+    identity: list = [(tablename, chunk.digest) for tablename, chunk in plan]
+    return hashlib.sha1(repr(identity).encode()).hexdigest()[:16]
+
 
 class EtlManager:
     def __init__(
         self,
         constr: str,
         name: str,
+        extract_cache: ExtractCache = None,
+        trace_path: os.PathLike = None,
+        writer: Writer = None,
+        governor: WriteGovernor = None,
+        retry: RetryPolicy = RetryPolicy(),
     ) -> None:
         """An ETL manager coworks with Pharmquer
 
         Args:
             constr (str): database connection string.
             name (str): name of ETL.
+            extract_cache (ExtractCache, optional): on-disk cache of extracted frames used by `extract()`. Defaults to None.
+            trace_path (os.PathLike, optional): append the spans of `trace_file()` to this file as OpenTelemetry JSON lines. Defaults to None.
+            writer (Writer, optional): writes the loaded frames. Defaults to the registered writer of the database, e.g., `PostgresWriter`.
+            governor (WriteGovernor, optional): caps and paces the concurrent loads to the database. Defaults to None.
+            retry (RetryPolicy, optional): retries of the chunks of a load on transient errors; None to fail at once. Defaults to RetryPolicy().
         """
         self.constr: str = constr
         self.name: str = name
+        self.extract_cache: ExtractCache = extract_cache
+        self._trace_exporter: JsonLinesExporter = JsonLinesExporter(trace_path) if trace_path else None
+        self.writer: Writer = writer
+        self.governor: WriteGovernor = governor
+        self.retry: RetryPolicy | None = retry
         self.id: int = None
         self._engine: Engine = None
+        self._listener: QueueListener = None
+        self._listen_failed: bool = False
         self._etl_setting: EtlProgMng = None
         self.src_folder: PathLike = None
         self.dst_folder: dict[str, PathLike] = {}
@@ -47,7 +97,9 @@ class EtlManager:
         self,
     ) -> None:
         try:
-            self._engine: Engine = create_engine(self.constr)
+            self._engine: Engine = get_engine(self.constr)
+            if self.writer is None:
+                self.writer = get_writer(self._engine)
             with Session(self._engine) as sess:
                 self._etl_setting = (
                     sess.query(EtlProgMng).filter(EtlProgMng.name == self.name).first()
@@ -76,6 +128,100 @@ class EtlManager:
     def reload_conf(self):
         self._fetch_config()
 
+    @contextmanager
+    def trace_file(self, filename:str):
+        """Trace the processing of a file. The stages inside the block are recorded as nested spans, 
+        and `update_status()` adds their summary to `last_log["trace"]`.
+
+        Args:
+            filename (str): the processed file name.
+
+        Example:
+        ```
+        with em.trace_file(f):
+            df = em.extract(os.path.join(em.src_folder, f), pd.read_csv)
+            with em.stage("transform"):
+                df = transform(df)
+            em.load_df(df, "my_table", chunksize=500, unique_key=["column1"])
+            em.update_status(filename=f, user_id=1, status=Status.SUCCESS, last_log={"status": "success"})
+        ```
+        """
+        with start_trace(filename, self._trace_exporter, etl=self.name) as root:
+            yield root
+
+    @contextmanager
+    def stage(self, name:str):
+        """Time a stage of this ETL in the `lichens_stage_duration_seconds` histogram, 
+        and as a span if it runs in `trace_file()`. 
+        `extract`, `load`, `update_status` and `move` are timed already, so wrap the rest, e.g., transform.
+
+        Args:
+            name (str): name of the stage.
+
+        Example:
+        ```
+        with em.stage("transform"):
+            df = transform(df)
+        ```
+        """
+        with STAGE_DURATION.labels(self.name, name).time(), span(name):
+            yield
+
+    def extract(self, fp:os.PathLike, extractor:Callable[..., DataFrame], *args, **kwargs) -> DataFrame:
+        """Extract a file with `extractor(fp, *args, **kwargs)`. 
+        If `extract_cache` is set, the parsed frame is reused when the same file is retried or rerun.
+
+        Args:
+            fp (os.PathLike): The path of source file.
+            extractor (Callable[..., DataFrame]): The function parses the file, e.g., `pd.read_csv`.
+
+        Returns:
+            DataFrame: the extracted DataFrame.
+        """
+        with self.stage("extract"):
+            if self.extract_cache is None:
+                return extractor(fp, *args, **kwargs)
+            return self.extract_cache.get_or_extract(fp, extractor, *args, **kwargs)
+
+    def extract_stream(self, source:RemoteSource, remote_path:str, extractor:Callable[..., DataFrame], *args, archive_dir:os.PathLike=None, **kwargs) -> DataFrame:
+        """Extract a remote file while it is being transferred, without landing it in `src_folder` first.
+
+        Args:
+            source (RemoteSource): the server, e.g., `FtpServer`, `AioFtpServer` or `SambaServer`.
+            remote_path (str): The remote path of the file.
+            extractor (Callable[..., DataFrame]): The function parses a sequential binary stream, e.g., `pd.read_csv`.
+            archive_dir (os.PathLike, optional): Write a copy of the file into this folder as it is transferred, 
+                which can be archived with `move()` later. Defaults to None.
+
+        Returns:
+            DataFrame: the extracted DataFrame.
+
+        Example:
+        ```
+        with FtpServer(host, user, passwd) as ftp:
+            df = em.extract_stream(ftp, "/export/sample.csv", pd.read_csv, archive_dir=em.src_folder)
+        ```
+        """
+        archive_path:os.PathLike = None
+        if archive_dir:
+            if not os.path.exists(archive_dir):
+                os.makedirs(archive_dir)
+            archive_path = os.path.join(archive_dir, os.path.basename(remote_path.replace("\\", "/")))
+        with self.stage("extract"), source.open_stream(remote_path, archive_path=archive_path) as stream:
+            df:DataFrame = extractor(stream, *args, **kwargs)
+            # drain the rest, so the archive copy is complete even if the parser stopped early
+            while archive_path and stream.read(1024 * 1024):
+                pass
+        return df
+
+    def get_remote_manifest(self) -> RemoteManifest:
+        """The manifest of remote files this ETL has pulled, for `sync_download` of `FtpServer` and `SambaServer`.
+
+        Returns:
+            RemoteManifest: the manifest.
+        """
+        return RemoteManifest(self._engine, self.id)
+
     def move(self, src:os.PathLike, status: Literal[Status.FAIL, Status.SUCCESS, Status.SKIP]) -> None:
         """Move the processed file to the destination folder according to the status.
 
@@ -93,9 +239,11 @@ class EtlManager:
             _new_fn = f"{_fn}_"+get_now_str().replace('.','')+_ext
             dst = os.path.join(dst_folder, _new_fn)
         try: 
-            shutil.move(src, dst)
+            with self.stage("move"):
+                shutil.move(src, dst)
         except Exception as e:
             raise e
+
     def get_queue_list(self,)->list[str]:
         """Get the queued files
 
@@ -121,6 +269,68 @@ class EtlManager:
         finally:
             sess.close()
         
+    def wait_for_work(self, timeout:float=None, poll_interval:float=30.0)->list[str]:
+        """Block until files are queued for this ETL and return them, e.g., in a worker loop instead of a cron poll.
+        On Postgres it wakes on the NOTIFY of the `etl_proc_hist` trigger (`lichens migrate` installs it) as soon as 
+        a file is queued by any service, and checks the queue every `poll_interval` seconds as well, 
+        in case a notification is lost with the listening connection. On the other databases it polls.
+
+        Args:
+            timeout (float, optional): seconds to wait. Defaults to None, until there is work.
+            poll_interval (float, optional): seconds between the checks of the queue without a notification. Defaults to 30.0.
+
+        Returns:
+            list[str]: the queued file names, as `get_queue_list()`; empty on timeout.
+
+        Example:
+        ```
+        while True:
+            for f in em.wait_for_work(timeout=300):
+                process(f)
+        ```
+        """
+        deadline:float | None = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            # listen before the check, so a file queued in between is not missed
+            listener:QueueListener | None = self._listen()
+            queued:list[str] = self.get_queue_list() or []
+            remaining:float | None = deadline - time.monotonic() if deadline is not None else None
+            if queued or (remaining is not None and remaining <= 0):
+                return queued
+            wait:float = min(poll_interval, remaining) if remaining is not None else poll_interval
+            if listener is None:
+                sleep(wait)
+                continue
+            try:
+                payloads:list[str] = listener.wait(wait)
+                if payloads:
+                    log.debug(f"Notified of {', '.join(payloads)}.")
+            except Exception as e:
+                log.warning(f"Listening to {listener.channel} failed: {str(e).strip().splitlines()[0]}. Poll until it is restored.")
+                self._close_listener()
+                sleep(wait)  # poll rather than reconnect at once, which spins while the listener keeps failing
+
+    def _listen(self)->QueueListener | None:
+        """The listener of the queue of this ETL, created on first use; None if the database cannot notify."""
+        if self._listener is None and self._engine.dialect.name == "postgresql":
+            try:
+                self._listener = QueueListener(self._engine, queue_channel(self.id))
+                self._listen_failed = False
+            except Exception as e:
+                # warn once until it is restored, not at every poll
+                (log.debug if self._listen_failed else log.warning)(f"Cannot listen to the queue of {self.name}: {e}. Poll instead.")
+                self._listen_failed = True
+        return self._listener
+
+    def _close_listener(self)->None:
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+
+    def close(self)->None:
+        """Release the connection listening to the queue of `wait_for_work()`."""
+        self._close_listener()
+
     def update_status(
         self,
         filename: str,
@@ -133,26 +343,37 @@ class EtlManager:
             filename (str): processed filename.
             user_id (int): the user who upload or process the file. 
             status (Literal[&#39;fail&#39;, &#39;skip&#39;, &#39;success&#39;, &#39;processing&#39;]): The current status.
-            last_log (dict[str, str]): log in json. Recommended&Default={ "status": "processing", "filename":"sample.csv", "update_dtt": pendulum.now()}.
+            last_log (dict[str, str]): log in json. Recommended&Default={ "status": "processing", "filename":"sample.csv", "update_dtt": pendulum.now().isoformat()}.
+                In `trace_file()`, the summary of the spans is added as "trace", with the values recorded by the stages,
+                e.g., "memory_report" of `compact_df()`. 
+                Unless the status is SUCCESS, the progress of an interrupted `load_df(commit_every=...)` is kept.
         """
         if not last_log:
             last_log = {
                 "status": status,
                 "filename": filename,
-                "update_dtt": pendulum.now(),
+                "update_dtt": pendulum.now().isoformat(),
             }
-        with Session(self._engine) as s:
+        current:Span | None = current_span()
+        if current is not None:
+            last_log = {**last_log, **current.trace.records, "trace": current.trace.summary()}
+        with self.stage("update_status"), Session(self._engine) as s:
             try:
-                print()
+                if str(status) != Status.SUCCESS.name and LOAD_PROGRESS_KEY not in last_log:
+                    # keep the progress of an interrupted load, so the retry of the file resumes it
+                    progress:dict | None = self._load_progress(s, filename)
+                    if progress:
+                        last_log = {**last_log, LOAD_PROGRESS_KEY: progress}
                 s.query(EtlProgMng).filter(
                     EtlProgMng.id == self._etl_setting.id
-                ).update({EtlProgMng.last_log: last_log})
+                ).update({EtlProgMng.last_log: last_log, EtlProgMng.update_dtt: func.now()})
 
                 updated_rows:int = s.query(EtlProcHist)\
                     .filter(EtlProcHist.file_name == filename)\
                     .update({
                         EtlProcHist.status: status,
                         EtlProcHist.last_log: last_log,
+                        EtlProcHist.update_dtt: func.now(),
                     })
                 if updated_rows==0:
                     log.warning(f"{filename} not registed. Insert new when processed.")
@@ -168,6 +389,8 @@ class EtlManager:
                 else: 
                     log.info(f"{filename} done with status={status}. Log updated.")
                 s.commit()
+                if str(status) != Status.PROCESSING.name:
+                    FILES_PROCESSED.labels(self.name, str(status)).inc()
             except Exception as e:
                 s.rollback()
                 raise UpdateStatusFailed(f"""File: {filename}. Errors: {e}""")
@@ -182,44 +405,248 @@ class EtlManager:
         ] = DupPolicy.RAISE_ERROR.name,
         chunksize:int=None,
         unique_key:list[str]=None,
-    )->None:
+        commit_every:int=None,
+        commit_interval:float=None,
+        checkpoint:str=None,
+    )->LoadReport:
         """Load a DataFrame to the target table. 
 
         Args:
             df (DataFrame): the transformed pd.DataFrame, which has identical schema to the target table. 
+                A pyarrow.Table or a polars.DataFrame is loaded from its Arrow buffers, without a conversion to pandas.
             tablename (str): targer table name. If the schema is NOT default, then is MUST BE ADDED.
             schema (str): schema name
             if_exists (Literal[ &#39;replace&#39;, , &#39;skip&#39;, , &#39;raise_error&#39;, ], optional): . Defaults to "replace".
+            chunksize (int, optional): rows per INSERT statement. Defaults to DEFAULT_CHUNKSIZE.
+            unique_key (list[str], optional): conflict columns of the table.
+            commit_every (int, optional): commit after this many chunks. See `load_many()`. Defaults to None, one transaction.
+            commit_interval (float, optional): commit after this many seconds. See `load_many()`. Defaults to None.
+            checkpoint (str, optional): the file whose `last_log` records the progress. See `load_many()`.
+
+        Returns:
+            LoadReport: rows written, chunks, and the retries after transient errors.
         """
-        try:
-            sess:Session = Session(self._engine)
-        except Exception as e:
-            raise e
-        
-        if if_exists!=DupPolicy.SKIP.name and not unique_key:
-            raise UniqueKeyMissedError(f"Please specify the unique key from {str(tuple(df.columns))}")
-        
-        if schema:
-            tablename = f"{schema}.{tablename}"
+        if str(if_exists)!=DupPolicy.SKIP.name and not unique_key:
+            raise UniqueKeyMissedError(f"Please specify the unique key from {str(tuple(frame_columns(to_frame(df))))}")
+        return self.load_many(
+            [LoadTarget(tablename, df=df, schema=schema, if_exists=if_exists, unique_key=unique_key)],
+            chunksize=chunksize or DEFAULT_CHUNKSIZE,
+            commit_every=commit_every,
+            commit_interval=commit_interval,
+            checkpoint=checkpoint,
+        )
+
+    def load_many(
+        self,
+        targets: list[LoadTarget],
+        df: DataFrame = None,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        commit_every: int = None,
+        commit_interval: float = None,
+        checkpoint: str = None,
+    ) -> LoadReport:
+        """Load a frame, or several, to multiple tables in one transaction on one connection, e.g., the header and
+        the detail tables of one file, with the `writer` of the database. Referenced tables are written first,
+        and each column of a frame is rendered to SQL once for all the targets projecting it.
+        A chunk failing on a transient error, e.g., a deadlock, is rolled back alone and retried with the `retry` policy.
+        If the connection is lost, the chunks of the transaction are replayed on a fresh pooled connection.
+
+        A large load can commit every `commit_every` chunks or `commit_interval` seconds instead, so it does not hold
+        its locks and a writer slot for minutes, and a lost connection replays the chunks since the last commit only.
+        The committed chunks are recorded in `last_log["load_progress"]` of the `checkpoint` file in the same commit.
+        If the load fails, loading the same frame for the file again skips them. 
+        The record is removed when the load completes.
 
-        def _do_insert(unique_key_:list[str]=None, skip_on_conflict_:bool=False):
-            _sql: list[str] | str = generate_insert_sql(df, tablename, chunksize, unique_key_, skip_on_conflict_)
-            _sql = _sql if isinstance(_sql, list) else [_sql, ]
-            return list(map(sess.execute, [text(a) for a in _sql]))
-        
-        try:
-            if if_exists == DupPolicy.REPLACE.name:
-                _ = _do_insert(unique_key, True)
-            elif if_exists == DupPolicy.SKIP.name:
-                _ = _do_insert(unique_key, False)
-            else: #  if_exists == DupPolicy.RAISE_ERROR.name
-                _ = _do_insert(None, False)
-            sess.commit()
-        except Exception as e:
-            sess.rollback()
-            raise InsertInterruptedError(e)
-        finally:
-            sess.close()
+        Args:
+            targets (list[LoadTarget]): the tables and the columns of the frame written to each.
+            df (DataFrame, optional): the frame shared by the targets without their own, or a pyarrow.Table
+                or a polars.DataFrame, as in `load_df()`. Defaults to None.
+            chunksize (int, optional): rows per INSERT statement. Defaults to DEFAULT_CHUNKSIZE.
+            commit_every (int, optional): commit after this many chunks. Defaults to None, one transaction.
+            commit_interval (float, optional): commit after this many seconds. Defaults to None.
+            checkpoint (str, optional): `etl_proc_hist.file_name` of the loaded file, which records the progress of
+                a load committing periodically. Defaults to the file of `trace_file()`; without one, the progress is not recorded.
+
+        Returns:
+            LoadReport: rows written per table, chunks, and the retries after transient errors.
+
+        Example:
+        ```
+        em.load_many([
+            LoadTarget("lot_header", columns=["lot_id", "product", "started_at"], schema="qc", if_exists=DupPolicy.SKIP.name, unique_key=["lot_id"]),
+            LoadTarget("lot_detail", columns=["lot_id", "seq", "value"], schema="qc", if_exists=DupPolicy.REPLACE.name, unique_key=["lot_id", "seq"]),
+        ], df=df)
+        ```
+        """
+        frames: list[DataFrame] = []
+        # the Arrow table of each Polars frame, by the frame, so a frame shared by targets is rendered once
+        converted: dict[int, DataFrame] = {}
+        for t in targets:
+            frame: DataFrame = t.df if t.df is not None else df
+            if frame is None:
+                raise ValueError(f"No frame for {t.qualified_name}. Pass `df` or `LoadTarget.df`.")
+            if str(t.if_exists) != DupPolicy.SKIP.name and not t.unique_key:
+                raise UniqueKeyMissedError(f"Please specify the unique key of {t.qualified_name}")
+            if id(frame) not in converted:
+                converted[id(frame)] = to_frame(frame)
+            frames.append(converted[id(frame)])
+        tablenames: list[str] = [self.writer.qualify(t.tablename, t.schema) for t in targets]
+        rendered: dict[int, RenderedFrame] = {}
+        report: LoadReport = LoadReport()
+        started: float = time.perf_counter()
+        periodic: bool = bool(commit_every or commit_interval)
+        if periodic and checkpoint is None and (current := current_span()) is not None:
+            checkpoint = current.trace.name
+        with self.stage("load"):
+            sess: Session = Session(self._engine)
+            try:
+                con: Connection = sess.connection()
+                plan: list[tuple[str, Chunk]] = []
+                for i in order_targets(tablenames, con):
+                    t, frame, tablename = targets[i], frames[i], tablenames[i]
+                    columns: list[str] = list(t.columns) if t.columns is not None else frame_columns(frame)
+                    if id(frame) not in rendered:
+                        rendered[id(frame)] = RenderedFrame(frame)
+                    plan.extend((tablename, chunk) for chunk in self.writer.chunks(
+                        rendered[id(frame)],
+                        tablename,
+                        columns,
+                        [t.columns[c] for c in columns] if isinstance(t.columns, dict) else columns,
+                        chunksize,
+                        *_conflict_handling(t.if_exists, t.unique_key),
+                        distinct=t.distinct and t.columns is not None,
+                    ))
+
+                key: str | None = _plan_key(plan) if periodic else None
+                # the chunks committed already, by this load or by a failed one of the same file
+                committed: int = 0
+                if periodic and checkpoint is not None:
+                    progress: dict | None = self._load_progress(sess, checkpoint)
+                    if progress is None:
+                        log.warning(f"{checkpoint} not registered. The progress of the load is not recorded.")
+                        checkpoint = None
+                    elif 0 < progress.get(key, 0) < len(plan):
+                        committed = report.resumed_chunks = progress[key]
+                        log.info(f"Resume the load of {checkpoint} after {committed} of {len(plan)} chunks.")
+                # the plan is rendered before taking a writer slot, so the slot is held only while writing
+                pace: Callable[[int, int], None] | None = self._acquire_slot(con)
+                last_commit: float = time.monotonic()
+                position: int = committed
+                attempts: dict[int, int] = {}
+                # the chunk whose failure lost the transaction, until a new one is begun, and whether with the connection
+                failed_at: int | None = None
+                reconnect: bool = False
+                while position < len(plan):
+                    tablename, chunk = plan[position]
+                    try:
+                        if failed_at is not None:
+                            if reconnect:  # replay the chunks of the lost transaction on a fresh pooled connection
+                                sess.close()
+                                sess = Session(self._engine)
+                            else:
+                                sess.rollback()
+                            con, pace = self._begin_load(sess)
+                            if reconnect:
+                                report.reconnects += 1
+                            failed_at, reconnect = None, False
+                        with span("load.chunk", table=tablename, chunk=chunk.index), self._savepoint(con):
+                            chunk.execute(con)
+                    except DBAPIError as e:
+                        # a failed reconnect is another attempt of the chunk which lost the connection
+                        failed: int = position if failed_at is None else failed_at
+                        attempts[failed] = attempts.get(failed, 0) + 1
+                        lost: bool = reconnect or needs_new_connection(e)
+                        if self.retry is None or not (lost or is_transient(e)) or attempts[failed] >= self.retry.max_attempts:
+                            raise
+                        reason: str = "connection" if lost else "statement"
+                        failed_table, failed_chunk = plan[failed]
+                        error: str = f"{failed_table}[{failed_chunk.index}] {reason}: {str(e.orig).strip().splitlines()[0]}"
+                        report.retries += 1
+                        report.errors.append(error)
+                        LOAD_RETRIES.labels(self.name, reason).inc()
+                        log.warning(f"Retry {attempts[failed]} of {error}")
+                        time.sleep(self.retry.backoff(attempts[failed]))
+                        if not lost and self.writer.savepoints:  # rolled back to the savepoint of the chunk
+                            continue
+                        if failed_at is None:
+                            report.replayed_chunks += position - committed
+                            position = committed
+                        failed_at, reconnect = failed, lost
+                        continue
+                    position += 1
+                    if pace is not None:
+                        pace(chunk.rows, chunk.nbytes)
+                    if periodic and position < len(plan) and (
+                        (commit_every and position - committed >= commit_every)
+                        or (commit_interval and time.monotonic() - last_commit >= commit_interval)
+                    ):
+                        with span("load.commit", chunk=position):
+                            if checkpoint is not None:
+                                self._save_progress(sess, checkpoint, key, position)
+                            sess.commit()
+                        committed = position
+                        last_commit = time.monotonic()
+                        report.commits += 1
+                        con, pace = self._begin_load(sess)
+                if periodic and checkpoint is not None:
+                    self._save_progress(sess, checkpoint, key, None)
+                sess.commit()
+                report.commits += 1
+            except Exception as e:
+                sess.rollback()
+                raise InsertInterruptedError(e)
+            finally:
+                sess.close()
+        for tablename, chunk in plan[report.resumed_chunks:]:
+            report.rows[tablename] = report.rows.get(tablename, 0) + chunk.rows
+        report.chunks = len(plan) - report.resumed_chunks
+        report.elapsed_s = round(time.perf_counter() - started, 3)
+        for tablename, rows_ in report.rows.items():
+            ROWS_LOADED.labels(self.name, tablename).inc(rows_)
+        log.info(f"Loaded {', '.join(f'{k}={v}' for k, v in report.rows.items())} rows" + (f" with {report.retries} retries." if report.retries else "."))
+        return report
+
+    def _load_progress(self, sess: Session, filename: str) -> dict[str, int] | None:
+        """`last_log["load_progress"]` of the file, i.e., the committed chunks per load; None if it is not registered."""
+        row = sess.query(EtlProcHist.last_log).filter(
+            EtlProcHist.etl_id == self.id, EtlProcHist.file_name == filename
+        ).first()
+        if row is None:
+            return None
+        return (row.last_log or {}).get(LOAD_PROGRESS_KEY) or {}
+
+    def _save_progress(self, sess: Session, filename: str, key: str, chunks: int | None) -> None:
+        """Record the committed chunks of the load `key` of the file in its transaction; None removes the record."""
+        last_log: dict = sess.query(EtlProcHist.last_log).filter(
+            EtlProcHist.etl_id == self.id, EtlProcHist.file_name == filename
+        ).scalar() or {}
+        progress: dict[str, int] = {k: v for k, v in (last_log.get(LOAD_PROGRESS_KEY) or {}).items() if k != key}
+        if chunks is not None:
+            progress[key] = chunks
+        last_log = {k: v for k, v in last_log.items() if k != LOAD_PROGRESS_KEY}
+        if progress:
+            last_log[LOAD_PROGRESS_KEY] = progress
+        sess.query(EtlProcHist).filter(
+            EtlProcHist.etl_id == self.id, EtlProcHist.file_name == filename
+        ).update({EtlProcHist.last_log: last_log}, synchronize_session=False)
+
+    def _begin_load(self, sess: Session) -> tuple[Connection, Callable[[int, int], None] | None]:
+        """The connection of a load transaction, holding a writer slot if the `governor` is set."""
+        con: Connection = sess.connection()
+        return con, self._acquire_slot(con)
+
+    def _acquire_slot(self, con: Connection) -> Callable[[int, int], None] | None:
+        """Take a writer slot in the transaction of `con` if the `governor` is set. See `WriteGovernor.acquire()`."""
+        if self.governor is None:
+            return None
+        with span("load.wait_slot"):
+            return self.governor.acquire(con)
+
+    def _savepoint(self, con: Connection):
+        """A SAVEPOINT per chunk, so a chunk failing on a transient error is retried alone."""
+        if self.retry is not None and self.writer.savepoints:
+            return con.begin_nested()
+        return nullcontext()
 
     def run_as_schtask(self, func:Callable, crontab:str, times_:int=-1, *args, **kwargs)->None:
         """
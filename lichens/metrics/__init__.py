@@ -0,0 +1 @@
+from lichens.metrics.metrics import *
\ No newline at end of file
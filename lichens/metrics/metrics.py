@@ -0,0 +1,300 @@
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Iterator, Sequence
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+CONTENT_TYPE: str = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0,
+)
+
+
+class Registry:
+    """A collection of metrics exposed together."""
+    def __init__(self) -> None:
+        self._metrics: dict[str, "_Metric"] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def register(self, metric: "_Metric") -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is registered already.")
+            self._metrics[metric.name] = metric
+
+    def collect(self) -> list["_Metric"]:
+        with self._lock:
+            return list(self._metrics.values())
+
+
+REGISTRY = Registry()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_: str = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: Registry = REGISTRY) -> None:
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labelnames: tuple[str, ...] = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lookup: dict[tuple, object] = {}  # label values as given -> child
+        self._lock: threading.Lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Get the child of the label values. Keep the returned child to skip the lookup on the hot path."""
+        child = self._lookup.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}.")
+            with self._lock:
+                child = self._children.setdefault(tuple(str(v) for v in values), self._new_child())
+                self._lookup[values] = child
+        return child
+
+    def _labels_text(self, values: tuple[str, ...], extra: str = "") -> str:
+        pairs: list[str] = [f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def expose(self) -> str:
+        lines: list[str] = [f"# TYPE {self.name} {self.type_}", f"# HELP {self.name} {_escape(self.documentation)}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Shards:
+    """
+    Values of a child kept per thread: each thread updates its own shard without a lock, and the shards are summed at collection.
+    The shards of the finished threads are folded into one.
+    """
+    __slots__ = ("_initial", "_local", "_shards", "_retired", "_lock")
+
+    def __init__(self, initial: tuple[float, ...]) -> None:
+        self._initial: tuple[float, ...] = initial
+        self._local: threading.local = threading.local()
+        self._shards: list[tuple[threading.Thread, list[float]]] = []
+        self._retired: list[float] = list(initial)
+        self._lock: threading.Lock = threading.Lock()
+
+    def _shard(self) -> list[float]:
+        """The shard of the current thread, on its first update."""
+        shard: list[float] = list(self._initial)
+        with self._lock:
+            self._shards.append((threading.current_thread(), shard))
+        self._local.shard = shard
+        return shard
+
+    def _merged(self) -> list[float]:
+        with self._lock:
+            alive: list[tuple[threading.Thread, list[float]]] = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                else:
+                    self._retired = [a + b for a, b in zip(self._retired, shard)]
+            self._shards = alive
+            total: list[float] = list(self._retired)
+            for _, shard in alive:
+                # a copy of the list is atomic, so counts and sum of a histogram shard agree
+                total = [a + b for a, b in zip(total, shard[:])]
+        return total
+
+
+class _CounterChild(_Shards):
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        super().__init__((0,))
+
+    @property
+    def value(self) -> float:
+        return self._merged()[0]
+
+    def inc(self, amount: float = 1) -> None:
+        try:
+            self._local.shard[0] += amount
+        except AttributeError:
+            self._shard()[0] += amount
+
+
+class Counter(_Metric):
+    """
+    A monotonically increasing counter.
+
+    Example:
+    ```
+    FILES = Counter("myetl_files", "Files processed.", ["status"])
+    FILES.labels("success").inc()
+    ```
+    """
+    type_: str = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self) -> Iterator[str]:
+        for values, child in list(self._children.items()):
+            yield f"{self.name}_total{self._labels_text(values)} {_format_value(child.value)}"
+
+
+class _Timer:
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: "_HistogramChild") -> None:
+        self._child = child
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._child.observe(time.perf_counter() - self._start)
+
+
+class _HistogramChild(_Shards):
+    __slots__ = ("upper_bounds",)
+
+    def __init__(self, upper_bounds: tuple[float, ...]) -> None:
+        self.upper_bounds: tuple[float, ...] = upper_bounds
+        # counts of the buckets, the last one is +Inf, followed by the sum
+        super().__init__((0,) * (len(upper_bounds) + 1) + (0.0,))
+
+    def observe(self, value: float) -> None:
+        try:
+            shard: list[float] = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        shard[bisect_left(self.upper_bounds, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self) -> tuple[list[int], float]:
+        """The counts of the buckets and the sum of the observations."""
+        merged: list[float] = self._merged()
+        return merged[:-1], merged[-1]
+
+    def time(self) -> _Timer:
+        """Observe the duration of a `with` block in seconds."""
+        return _Timer(self)
+
+
+class Histogram(_Metric):
+    """
+    A histogram of observations in cumulative buckets, e.g., durations in seconds.
+
+    Example:
+    ```
+    DURATION = Histogram("myetl_step_seconds", "Duration of steps.", ["step"])
+    with DURATION.labels("parse").time():
+        parse()
+    ```
+    """
+    type_: str = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Registry = REGISTRY) -> None:
+        self.upper_bounds: tuple[float, ...] = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self) -> _Timer:
+        return self.labels().time()
+
+    def _samples(self) -> Iterator[str]:
+        for values, child in list(self._children.items()):
+            counts, total = child.snapshot()
+            cumulative: int = 0
+            for bound, count in zip(self.upper_bounds + (math.inf,), counts):
+                cumulative += count
+                le: str = 'le="' + _format_value(bound) + '"'
+                yield f"{self.name}_bucket{self._labels_text(values, le)} {cumulative}"
+            yield f"{self.name}_count{self._labels_text(values)} {cumulative}"
+            yield f"{self.name}_sum{self._labels_text(values)} {_format_value(total)}"
+
+
+def generate_latest(registry: Registry = REGISTRY) -> str:
+    """Render all the metrics of the registry in the OpenMetrics text format."""
+    return "\n".join([m.expose() for m in registry.collect()] + ["# EOF\n"])
+
+
+def write_textfile(path: os.PathLike, registry: Registry = REGISTRY) -> None:
+    """Write the metrics to a file atomically, e.g., for the node-exporter textfile collector."""
+    tmp: str = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(generate_latest(registry))
+    os.replace(tmp, path)
+
+
+def start_http_server(port: int, addr: str = "0.0.0.0", registry: Registry = REGISTRY) -> "ThreadingHTTPServer":
+    """Serve the metrics at `http://addr:port/metrics` in a daemon thread.
+
+    Args:
+        port (int): port to listen.
+        addr (str, optional): address to bind. Defaults to "0.0.0.0".
+        registry (Registry, optional): the registry to expose. Defaults to the global one.
+
+    Returns:
+        ThreadingHTTPServer: the server. Call `shutdown()` to stop it.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body: bytes = generate_latest(registry).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer((addr, port), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+FILES_PROCESSED = Counter("lichens_files_processed", "Files processed by ETL and status.", ["etl", "status"])
+ROWS_LOADED = Counter("lichens_rows_loaded", "Rows loaded by ETL and target table.", ["etl", "table"])
+BYTES_TRANSFERRED = Counter("lichens_bytes_transferred", "Bytes transferred by protocol and direction.", ["protocol", "direction"])
+LOAD_RETRIES = Counter("lichens_load_retries", "Chunks retried after transient database errors by ETL and reason, i.e., statement or connection.", ["etl", "reason"])
+STAGE_DURATION = Histogram(
+    "lichens_stage_duration_seconds",
+    "Duration of ETL stages, e.g., extract, transform, load, update_status and move, in seconds.",
+    ["etl", "stage"],
+)
@@ -1 +1,3 @@
-from lichens.tools.tools import *
\ No newline at end of file
+from lichens.tools.tools import *
+from lichens.tools.profiler import *
+from lichens.tools.reports import *
\ No newline at end of file
@@ -0,0 +1,244 @@
+import cProfile
+import importlib
+import io
+import os
+import pstats
+import runpy
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from logging import getLogger
+from typing import Any, Callable
+
+import pendulum
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+from lichens.db.models import EtlProgMng
+from lichens.db.utils import get_engine
+from lichens.errors.db_errors import ProgramNotFoundError
+
+log = getLogger()
+
+# frames of the profiler itself and of runpy are left out of the stacks and the summary
+_HIDDEN_FILES: tuple[str, ...] = (__file__, runpy.__file__, "<frozen runpy>")
+
+
+class StackSampler:
+    """
+    Sample the stack of a thread every `interval` seconds and count the collapsed stacks,
+    i.e., `frame;frame;frame count` lines read by flamegraph.pl, speedscope and inferno.
+
+    Args:
+        thread_id (int): the sampled thread, e.g., `threading.get_ident()`.
+        interval (float, optional): seconds between samples. Defaults to 0.005.
+        stop_code (CodeType, optional): frames from this code object up are not recorded. Defaults to None.
+    """
+    def __init__(self, thread_id: int, interval: float = 0.005, stop_code=None) -> None:
+        self.thread_id: int = thread_id
+        self.interval: float = interval
+        self.stop_code = stop_code
+        self.stacks: Counter[str] = Counter()
+        self._stopped: threading.Event = threading.Event()
+        self._thread: threading.Thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names: list[str] = []
+            while frame is not None and frame.f_code is not self.stop_code:
+                code = frame.f_code
+                if code.co_filename not in _HIDDEN_FILES:
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def __enter__(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def write(self, path: os.PathLike) -> None:
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def resolve_target(target: str, args: list[str] = None) -> Callable[[], Any]:
+    """Make a callable of a profiling target.
+
+    Args:
+        target (str): a script `path/to/etl.py`, a module `package.etl` run as `__main__`,
+            or a function `package.etl:main` called with `args`.
+        args (list[str], optional): `sys.argv[1:]` of the script or module, or the positional arguments of the function. Defaults to None.
+
+    Returns:
+        Callable[[], Any]: runs the target once.
+    """
+    args = list(args or [])
+    if ":" in target and not os.path.exists(target):
+        module_name, func_name = target.split(":", 1)
+        func = importlib.import_module(module_name)
+        for attr in func_name.split("."):
+            func = getattr(func, attr)
+        return lambda: func(*args)
+
+    def _run_main() -> None:
+        argv: list[str] = sys.argv
+        sys.argv = [target, *args]
+        try:
+            if target.endswith(".py") or os.path.exists(target):
+                runpy.run_path(target, run_name="__main__")
+            else:
+                runpy.run_module(target, run_name="__main__", alter_sys=True)
+        finally:
+            sys.argv = argv
+    return _run_main
+
+
+@contextmanager
+def one_schtask_cycle():
+    """Make `EtlManager.run_as_schtask`, and so `@em.scheduled`, run the function once without waiting for the schedule."""
+    from lichens.manager.manager import EtlManager
+
+    original = EtlManager.run_as_schtask
+
+    def _once(self, func: Callable, crontab: str, times_: int = -1, *args, **kwargs) -> None:
+        log.info(f"Profiling one cycle of {getattr(func, '__name__', func)} scheduled at '{crontab}'.")
+        func(*args, **kwargs)
+
+    EtlManager.run_as_schtask = _once
+    try:
+        yield
+    finally:
+        EtlManager.run_as_schtask = original
+
+
+def profile_run(
+    func: Callable[[], Any],
+    output_dir: os.PathLike = ".",
+    name: str = "profile",
+    interval: float = 0.005,
+    memory: bool = True,
+    top: int = 30,
+) -> dict[str, Any]:
+    """Run `func` once under cProfile, a stack sampler and, optionally, tracemalloc, and write the reports:
+    `<name>.txt` (functions ranked by cumulative time and the top allocating lines),
+    `<name>.prof` (pstats, e.g., for snakeviz) and `<name>.folded` (collapsed stacks for flame graphs).
+
+    Args:
+        func (Callable[[], Any]): the run, e.g., from `resolve_target()`.
+        output_dir (os.PathLike, optional): where to write the reports. Defaults to ".".
+        name (str, optional): file name of the reports. Defaults to "profile".
+        interval (float, optional): seconds between stack samples. Defaults to 0.005.
+        memory (bool, optional): track allocations with tracemalloc, which slows the run down. Defaults to True.
+        top (int, optional): number of ranked functions and allocating lines in the report. Defaults to 30.
+
+    Returns:
+        dict[str, Any]: the summary, e.g., for `attach_profile()`.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    profiler = cProfile.Profile()
+    error: BaseException | None = None
+
+    def _invoke() -> None:
+        profiler.enable()
+        try:
+            func()
+        finally:
+            profiler.disable()
+
+    if memory:
+        tracemalloc.start()
+    started: float = time.perf_counter()
+    cpu_started: float = time.process_time()
+    with StackSampler(threading.get_ident(), interval, stop_code=_invoke.__code__) as sampler:
+        try:
+            _invoke()
+        except SystemExit as e:  # scripts ending with sys.exit()
+            if e.code not in (None, 0):
+                error = e
+        except Exception as e:
+            error = e
+    wall: float = time.perf_counter() - started
+    cpu: float = time.process_time() - cpu_started
+    peak: int = 0
+    allocations: list[tracemalloc.Statistic] = []
+    if memory:
+        _, peak = tracemalloc.get_traced_memory()
+        allocations = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+        ).statistics("lineno")[:top]
+        tracemalloc.stop()
+
+    paths: dict[str, str] = {ext: os.path.join(output_dir, f"{name}.{ext}") for ext in ("txt", "prof", "folded")}
+    stats = pstats.Stats(profiler)
+    stats.dump_stats(paths["prof"])
+    sampler.write(paths["folded"])
+    ranked = io.StringIO()
+    pstats.Stats(profiler, stream=ranked).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    with open(paths["txt"], "w") as f:
+        f.write(f"wall {wall:.3f}s, cpu {cpu:.3f}s, peak traced memory {peak / 1024**2:.1f} MB, {sum(sampler.stacks.values())} stack samples\n")
+        if error is not None:
+            f.write(f"The run raised {type(error).__name__}: {error}\n")
+        f.write(ranked.getvalue())
+        if memory:
+            f.write(f"\nTop {top} allocating lines\n")
+            for s in allocations:
+                f.write(f"{s.size / 1024**2:10.2f} MB {s.count:10d} blocks  {s.traceback}\n")
+
+    functions = sorted(
+        ((k, v) for k, v in stats.stats.items() if k[0] not in _HIDDEN_FILES and k[2] != "<built-in method builtins.exec>"),
+        key=lambda kv: kv[1][3], reverse=True,
+    )[:10]
+    summary: dict[str, Any] = {
+        "profiled_at": pendulum.now().isoformat(),
+        "wall_s": round(wall, 3),
+        "cpu_s": round(cpu, 3),
+        "peak_mem_mb": round(peak / 1024**2, 1) if memory else None,
+        "error": f"{type(error).__name__}: {error}" if error is not None else None,
+        "top_cumulative": [
+            {
+                "function": f"{os.path.basename(file)}:{line}({fn})",
+                "ncalls": nc,
+                "tottime": round(tt, 4),
+                "cumtime": round(ct, 4),
+            }
+            for (file, line, fn), (_, nc, tt, ct, _) in functions
+        ],
+        "top_allocations": [
+            {"line": str(s.traceback), "size_mb": round(s.size / 1024**2, 2), "count": s.count} for s in allocations[:10]
+        ],
+        "reports": paths,
+    }
+    log.info(f"Profile written to {paths['txt']}. wall {wall:.3f}s, cpu {cpu:.3f}s.")
+    return summary
+
+
+def attach_profile(con: str | Engine, etl_name: str, summary: dict[str, Any]) -> None:
+    """Add the profile summary to `etl_prog_mng.last_log` of the ETL as "profile".
+
+    Args:
+        con (str | Engine): connection string or an sqlalchemy.Engine.
+        etl_name (str): name of the ETL.
+        summary (dict[str, Any]): from `profile_run()`.
+    """
+    if isinstance(con, str):
+        con = get_engine(con)
+    with Session(con) as sess:
+        try:
+            etl: EtlProgMng | None = sess.query(EtlProgMng).filter(EtlProgMng.name == etl_name).first()
+            if etl is None:
+                raise ProgramNotFoundError(f"Name={etl_name} not found.")
+            etl.last_log = {**(etl.last_log or {}), "profile": summary}
+            sess.commit()
+        except Exception as e:
+            sess.rollback()
+            raise e
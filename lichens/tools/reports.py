@@ -0,0 +1,186 @@
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import Engine, and_, func, select
+from sqlalchemy.orm import Session
+
+from lichens.db.models import EtlProcHist, EtlProgMng
+from lichens.db.utils import get_engine
+from lichens.errors.db_errors import DialectNotSupportedError
+
+FINAL_STATUSES: tuple[str, ...] = ("success", "fail", "skip")
+QUEUED_STATUSES: tuple[str, ...] = ("queue", "processing")
+DEFAULT_WINDOWS: tuple[timedelta, ...] = (timedelta(hours=1), timedelta(hours=24), timedelta(days=7))
+
+
+def _window_name(window: timedelta) -> str:
+    hours: float = window.total_seconds() / 3600
+    return f"{hours / 24:g}d" if hours >= 24 and hours % 24 == 0 else f"{hours:g}h"
+
+
+def _postgres(con: str | Engine, report: str) -> Engine:
+    """The engine of `con`; the reports subtract timestamps and intervals the way of Postgres only."""
+    engine: Engine = get_engine(con) if isinstance(con, str) else con
+    if engine.dialect.name != "postgresql":
+        raise DialectNotSupportedError(f"The {report} report needs Postgres, not {engine.dialect.name}.")
+    return engine
+
+
+def _processing_seconds():
+    """Seconds of a file from queued to its last status, or the traced total if `trace_file()` recorded one."""
+    h = EtlProcHist
+    return func.coalesce(
+        h.last_log["trace"]["total_ms"].as_float() / 1000,
+        func.extract("epoch", h.update_dtt - h.create_dtt),
+    )
+
+
+def status_report(con: str | Engine, etl_name: str = None, windows: tuple[timedelta, ...] = DEFAULT_WINDOWS, slowest: int = 5, recent: timedelta = timedelta(days=1)) -> list[dict[str, Any]]:
+    """Per ETL: files by status, failure rate, oldest queued file, files finished in the recent windows and the slowest recent files.
+    Two aggregated queries whatever the number of ETLs: one for the counts, one for the slowest files.
+
+    Args:
+        con (str | Engine): connection string or an sqlalchemy.Engine.
+        etl_name (str, optional): only this ETL. Defaults to None.
+        windows (tuple[timedelta, ...], optional): windows of the throughput. Defaults to 1 hour, 24 hours and 7 days.
+        slowest (int, optional): number of the slowest files. Defaults to 5.
+        recent (timedelta, optional): the slowest files are the ones finished in this window. Defaults to 1 day.
+
+    Returns:
+        list[dict[str, Any]]: one report per ETL.
+
+    Raises:
+        DialectNotSupportedError: the database is not Postgres.
+    """
+    con = _postgres(con, "status")
+    h, m = EtlProcHist, EtlProgMng
+    now = func.now()
+    throughput = [
+        func.count().filter(and_(h.status.in_(FINAL_STATUSES), h.update_dtt >= now - w)).label(f"done_{i}")
+        for i, w in enumerate(windows)
+    ]
+    counts = (
+        select(
+            m.id,
+            m.name,
+            h.status,
+            func.count(h.id).label("files"),
+            func.extract("epoch", now - func.min(h.create_dtt)).label("oldest_s"),
+            *throughput,
+        )
+        .select_from(m)
+        .outerjoin(h, h.etl_id == m.id)
+        .group_by(m.id, m.name, h.status)
+        .order_by(m.name)
+    )
+    ranked = (
+        select(
+            h.etl_id,
+            h.file_name,
+            h.status,
+            h.update_dtt,
+            _processing_seconds().label("seconds"),
+            func.row_number().over(partition_by=h.etl_id, order_by=_processing_seconds().desc()).label("rank"),
+        )
+        .where(h.status.in_(FINAL_STATUSES), h.update_dtt >= now - recent)
+    )
+    if etl_name:
+        counts = counts.where(m.name == etl_name)
+        ranked = ranked.where(h.etl_id == select(m.id).where(m.name == etl_name).scalar_subquery())
+    ranked = ranked.subquery()
+    slowest_files = select(ranked).where(ranked.c.rank <= slowest).order_by(ranked.c.etl_id, ranked.c.rank)
+
+    with Session(con) as sess:
+        count_rows = sess.execute(counts).all()
+        slowest_rows = sess.execute(slowest_files).all()
+
+    reports: dict[int, dict[str, Any]] = {}
+    for row in count_rows:
+        r: dict[str, Any] = reports.setdefault(row.id, {
+            "etl": row.name,
+            "files": {},
+            "total": 0,
+            "fail_rate": None,
+            "oldest_queued_s": None,
+            "finished": {_window_name(w): 0 for w in windows},
+            "slowest": [],
+        })
+        if row.status is None:  # no file yet
+            continue
+        r["files"][row.status] = row.files
+        r["total"] += row.files
+        if row.status == "queue":
+            r["oldest_queued_s"] = round(float(row.oldest_s), 1)
+        for i, w in enumerate(windows):
+            r["finished"][_window_name(w)] += getattr(row, f"done_{i}")
+    for r in reports.values():
+        final: int = sum(r["files"].get(s, 0) for s in FINAL_STATUSES)
+        r["fail_rate"] = round(r["files"].get("fail", 0) / final, 4) if final else None
+    for row in slowest_rows:
+        if row.etl_id in reports:
+            reports[row.etl_id]["slowest"].append({
+                "file_name": row.file_name,
+                "status": row.status,
+                "seconds": round(float(row.seconds), 3) if row.seconds is not None else None,
+                "finished_at": row.update_dtt.isoformat(),
+            })
+    return list(reports.values())
+
+
+def queue_report(con: str | Engine, etl_name: str = None, oldest: int = 10) -> list[dict[str, Any]]:
+    """Per ETL: queued and processing files, the age of the oldest one, and the oldest queued files.
+    One aggregated query whatever the number of ETLs.
+
+    Args:
+        con (str | Engine): connection string or an sqlalchemy.Engine.
+        etl_name (str, optional): only this ETL. Defaults to None.
+        oldest (int, optional): number of the oldest queued files listed. Defaults to 10.
+
+    Returns:
+        list[dict[str, Any]]: one report per ETL.
+
+    Raises:
+        DialectNotSupportedError: the database is not Postgres.
+    """
+    con = _postgres(con, "queue")
+    h, m = EtlProcHist, EtlProgMng
+    queued = (
+        select(
+            h.etl_id,
+            h.file_name,
+            h.status,
+            h.create_dtt,
+            func.extract("epoch", func.now() - h.create_dtt).label("age_s"),
+            func.count().over(partition_by=[h.etl_id, h.status]).label("files"),
+            func.row_number().over(partition_by=[h.etl_id, h.status], order_by=h.create_dtt).label("rank"),
+        )
+        .where(h.status.in_(QUEUED_STATUSES))
+        .subquery()
+    )
+    stmt = (
+        select(m.name, queued)
+        .select_from(m)
+        .outerjoin(queued, and_(queued.c.etl_id == m.id, queued.c.rank <= oldest))
+        .order_by(m.name, queued.c.status, queued.c.rank)
+    )
+    if etl_name:
+        stmt = stmt.where(m.name == etl_name)
+    with Session(con) as sess:
+        rows = sess.execute(stmt).all()
+
+    reports: dict[str, dict[str, Any]] = {}
+    for row in rows:
+        r: dict[str, Any] = reports.setdefault(row.name, {
+            "etl": row.name,
+            **{s: 0 for s in QUEUED_STATUSES},
+            "oldest_queued_s": None,
+            "oldest_files": [],
+        })
+        if row.status is None:
+            continue
+        r[row.status] = row.files
+        if row.status == "queue":
+            if row.rank == 1:
+                r["oldest_queued_s"] = round(float(row.age_s), 1)
+            r["oldest_files"].append({"file_name": row.file_name, "queued_at": row.create_dtt.isoformat(), "age_s": round(float(row.age_s), 1)})
+    return list(reports.values())
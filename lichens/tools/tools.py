@@ -1,10 +1,12 @@
+import json
 import os
 import pendulum 
 from lichens.db.models import EtlProgMng, EtlProcHist
-from lichens.db.utils import add_etl as _add_etl
-from sqlalchemy import Engine, create_engine
+from lichens.db.utils import add_etl as _add_etl, add_etls as _add_etls, get_engine
+from sqlalchemy import Engine
 from sqlalchemy.orm import Session
 from typing import Any
+from lichens.config.templates import etl_prog_mng_template
 
 def add_etl(name:str, src_folder:os.PathLike, dst_folder:os.PathLike, json_setting:dict, update_by:int, con:str | Engine)->str:
     """_summary_
@@ -21,7 +23,7 @@ def add_etl(name:str, src_folder:os.PathLike, dst_folder:os.PathLike, json_setti
         str: _description_
     """
     if isinstance(con, str):
-        con = create_engine(con)
+        con = get_engine(con)
 
     orm_dict:dict = {
         "name":name,
@@ -34,6 +36,35 @@ def add_etl(name:str, src_folder:os.PathLike, dst_folder:os.PathLike, json_setti
     etl_name:str = _add_etl(orm=EtlProgMng(**orm_dict), con=con)
     return etl_name
 
+def add_etls_from_dir(dir:os.PathLike, con:str | Engine)->list[str]:
+    """Add the ETL program settings of every `*.json` in the directory in one transaction,
+    so a bad file or a duplicated name adds none of them. Use `get_template()` for a blank setting.
+
+    Args:
+        dir (os.PathLike): directory of the JSON settings.
+        con (str | Engine): connection strings or an sqlalchemy.Engine
+
+    Raises:
+        FileNotFoundError: No JSON in the directory.
+        ValueError: A file is not a valid setting.
+
+    Returns:
+        list[str]: names of the added programs.
+    """
+    if isinstance(con, str):
+        con = get_engine(con)
+    paths:list[str] = sorted(os.path.join(dir, f) for f in os.listdir(dir) if f.endswith('.json'))
+    if not paths:
+        raise FileNotFoundError(f"No JSON setting in {dir}.")
+    orms:list[EtlProgMng] = []
+    for path in paths:
+        try:
+            with open(path, 'r') as f:
+                orms.append(EtlProgMng(**json.load(f)))
+        except (json.JSONDecodeError, TypeError) as e:
+            raise ValueError(f"{path}: {e}") from e
+    return _add_etls(orms=orms, con=con)
+
 def add_file(file_name:str, etl_id:int, update_by:int, con:str | Engine):
     """Regist the file to queue.
 
@@ -47,7 +78,7 @@ def add_file(file_name:str, etl_id:int, update_by:int, con:str | Engine):
         e: Fail to add. 
     """
     if isinstance(con, str):
-        con = create_engine(con)
+        con = get_engine(con)
     orm_dict:dict[str, Any] = {
         "file_name":file_name,
         "etl_id": etl_id,
@@ -62,12 +93,3 @@ def add_file(file_name:str, etl_id:int, update_by:int, con:str | Engine):
         except Exception as e:
             sess.rollback()
             raise e
-
-etl_prog_mng_template:dict[str, Any] = {
-        "name": 'program_name',
-        "src_folder": 'path/to/files',
-        "dst_folder":'path/to/archive',
-        "json_setting": {},
-        "last_log": {},
-        "update_by": 0
-    }
\ No newline at end of file
@@ -0,0 +1 @@
+from lichens.tracing.tracing import *
\ No newline at end of file
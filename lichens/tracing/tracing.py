@@ -0,0 +1,218 @@
+import json
+import os
+import secrets
+import threading
+import time
+from contextvars import ContextVar, Token
+from typing import Any
+
+_current: ContextVar["Span | None"] = ContextVar("lichens_current_span", default=None)
+
+
+class JsonLinesExporter:
+    """
+    Append finished spans to a file, one OpenTelemetry (OTLP/JSON) span object per line,
+    which can be replayed into a collector or read with `pd.read_json(path, lines=True)`.
+
+    Args:
+        path (os.PathLike): the output file.
+        service_name (str, optional): `service.name` of the spans. Defaults to "lichens".
+    """
+    def __init__(self, path: os.PathLike, service_name: str = "lichens") -> None:
+        self.path: os.PathLike = path
+        self.service_name: str = service_name
+        self._lock: threading.Lock = threading.Lock()
+
+    def export(self, spans: list["Span"]) -> None:
+        lines: str = "".join(json.dumps(s.to_otlp(self.service_name), default=str) + "\n" for s in spans)
+        with self._lock, open(self.path, "a") as f:
+            f.write(lines)
+
+
+class Trace:
+    """The spans of one unit of work, e.g., a file. Created by `start_trace()`."""
+    def __init__(self, name: str, exporter: JsonLinesExporter = None) -> None:
+        self.name: str = name
+        self.trace_id: str = secrets.token_hex(16)
+        self.exporter: JsonLinesExporter = exporter
+        self.spans: list[Span] = []
+        self.records: dict[str, Any] = {}
+        self._root: Span | None = None
+        self._lock: threading.Lock = threading.Lock()
+
+    def _finish(self, span: "Span") -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self) -> dict[str, Any]:
+        """Compact summary of the finished spans, e.g., for `last_log`.
+
+        Returns:
+            dict[str, Any]: `trace_id`, `total_ms` of the root span (or up to now if it is running),
+                `stages` as span name -> summed milliseconds, and `counts` of the names seen more than once.
+        """
+        with self._lock:
+            spans: list[Span] = list(self.spans)
+        stages: dict[str, float] = {}
+        counts: dict[str, int] = {}
+        root_ms: float | None = None
+        for s in spans:
+            if s.parent_id is None:
+                root_ms = s.duration_ms
+                continue
+            stages[s.name] = stages.get(s.name, 0.0) + s.duration_ms
+            counts[s.name] = counts.get(s.name, 0) + 1
+        if root_ms is None and self._root is not None:
+            root_ms = (time.time_ns() - self._root.start_ns) / 1e6
+        return {
+            "trace_id": self.trace_id,
+            "total_ms": round(root_ms or 0.0, 1),
+            "stages": {k: round(v, 1) for k, v in stages.items()},
+            "counts": {k: v for k, v in counts.items() if v > 1},
+        }
+
+
+class Span:
+    """
+    A timed operation in a trace. Use it as a context manager; the span of the enclosing `with` block is the parent.
+
+    Attributes:
+        name (str): name of the operation, e.g., "extract" or "load.chunk".
+        attributes (dict[str, Any]): attached values, e.g., rows of a chunk.
+        error (str): the exception raised in the span, if any.
+    """
+    __slots__ = ("trace", "name", "span_id", "parent_id", "attributes", "start_ns", "end_ns", "error", "_token")
+
+    def __init__(self, trace: Trace, name: str, parent: "Span | None" = None, attributes: dict[str, Any] = None) -> None:
+        self.trace: Trace = trace
+        self.name: str = name
+        self.span_id: str = secrets.token_hex(8)
+        self.parent_id: str | None = parent.span_id if parent is not None else None
+        self.attributes: dict[str, Any] = attributes or {}
+        self.start_ns: int = 0
+        self.end_ns: int = 0
+        self.error: str | None = None
+        self._token: Token | None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.time_ns()
+        _current.reset(self._token)
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.trace._finish(self)
+        if self.parent_id is None and self.trace.exporter is not None:
+            self.trace.exporter.export(self.trace.spans)
+
+    def to_otlp(self, service_name: str = "lichens") -> dict[str, Any]:
+        """The span as an OTLP/JSON span object."""
+        return {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": k, "value": _otlp_value(v)}
+                for k, v in {"service.name": service_name, **self.attributes}.items()
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+
+
+def _otlp_value(v: Any) -> dict[str, Any]:
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    return {"stringValue": str(v)}
+
+
+class _NoopSpan:
+    """Returned by `span()` outside a trace, so untraced code pays only a context variable lookup."""
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def start_trace(name: str, exporter: JsonLinesExporter = None, **attributes) -> Span:
+    """Start a trace with its root span. Spans opened by `span()` inside the `with` block are nested in it.
+
+    Args:
+        name (str): name of the root span, e.g., the file name.
+        exporter (JsonLinesExporter, optional): export the spans when the root span ends. Defaults to None.
+
+    Returns:
+        Span: the root span. Its `trace.summary()` is the compact summary.
+
+    Example:
+    ```
+    with start_trace("sample.csv") as root:
+        with span("extract"):
+            df = pd.read_csv(fp)
+    print(root.trace.summary())
+    ```
+    """
+    trace = Trace(name, exporter)
+    root = Span(trace, name, None, attributes)
+    trace._root = root
+    return root
+
+
+def span(name: str, **attributes) -> Span | _NoopSpan:
+    """Open a child span of the current span. Outside a trace it does nothing.
+
+    Args:
+        name (str): name of the operation.
+
+    Returns:
+        Span | _NoopSpan: use it as a context manager.
+    """
+    parent: Span | None = _current.get()
+    if parent is None:
+        return _NOOP
+    return Span(parent.trace, name, parent, attributes)
+
+
+def record(key: str, value: Any) -> None:
+    """Keep a value on the current trace, e.g., a report of a stage, which `EtlManager.update_status()`
+    adds to `last_log[key]`. Outside a trace it does nothing.
+
+    Args:
+        key (str): key in `last_log`. A later value of the same key replaces the earlier one.
+        value (Any): a JSON-serializable value.
+    """
+    current: Span | None = _current.get()
+    if current is not None:
+        with current.trace._lock:
+            current.trace.records[key] = value
+
+
+def current_span() -> Span | None:
+    """The innermost running span, or None outside a trace."""
+    return _current.get()
@@ -0,0 +1,210 @@
+import hashlib
+import os
+from logging import getLogger
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame
+
+log = getLogger()
+
+
+class ExtractCache:
+    """
+    An on-disk cache of extracted DataFrames stored as Parquet files.
+
+    Entries are keyed by the content hash of the source file together with the extractor name,
+    its arguments and version, so a retry or a rerun of the same file skips parsing the raw CSV/Excel again.
+    The cache is bounded by `max_bytes` and evicts the least recently used entries first.
+
+    Args:
+        cache_dir (os.PathLike): The directory to keep the cached Parquet files.
+        max_bytes (int, optional): The maximum total size of the cache in bytes. Defaults to 2 GiB.
+        extractor_version (str, optional): Bump it when the extractor changes to invalidate the old entries. Defaults to "0".
+
+    Example:
+    ```
+    cache = ExtractCache("/tmp/lichens-cache", max_bytes=512 * 1024**2, extractor_version="1")
+    em = EtlManager(constr=CONNECTION_STRING, name=ETL_NAME, extract_cache=cache)
+    df = em.extract(os.path.join(em.src_folder, f), pd.read_csv)
+    ```
+    """
+    suffix: str = ".parquet"
+    block_size: int = 1024 * 1024
+
+    def __init__(self, cache_dir: os.PathLike, max_bytes: int = 2 * 1024**3, extractor_version: str = "0") -> None:
+        self.cache_dir: os.PathLike = cache_dir
+        self.max_bytes: int = max_bytes
+        self.extractor_version: str = extractor_version
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+    def key(self, fp: os.PathLike, extractor_name: str = "", arguments: str = "") -> str:
+        """Compute the cache key of a file.
+
+        Args:
+            fp (os.PathLike): The path of source file.
+            extractor_name (str, optional): The qualified name of the extractor with its module. Defaults to "".
+            arguments (str, optional): The extra arguments of the extractor from `arguments_key()`. Defaults to "".
+
+        Returns:
+            str: hex digest of the file content, extractor name, arguments and version.
+        """
+        h = hashlib.blake2b(digest_size=20)
+        with open(fp, "rb") as f:
+            while True:
+                block: bytes = f.read(self.block_size)
+                if not block:
+                    break
+                h.update(block)
+        h.update(f"|{extractor_name}|{arguments}|{self.extractor_version}".encode())
+        return h.hexdigest()
+
+    def _path(self, key: str) -> os.PathLike:
+        return os.path.join(self.cache_dir, key + self.suffix)
+
+    def get(self, key: str) -> DataFrame | None:
+        """Load the cached DataFrame. Returns None when missed.
+
+        Args:
+            key (str): key from `ExtractCache.key()`
+
+        Returns:
+            DataFrame | None: the cached DataFrame.
+        """
+        path: os.PathLike = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            df: DataFrame = pd.read_parquet(path)
+        except Exception as e:
+            log.warning(f"Broken cache entry {path} is dropped. Detail: {e}")
+            self._remove(path)
+            return None
+        os.utime(path)  # mark as recently used
+        return df
+
+    def put(self, key: str, df: DataFrame) -> bool:
+        """Store the DataFrame and evict the least recently used entries if the cache is full.
+
+        Args:
+            key (str): key from `ExtractCache.key()`
+            df (DataFrame): the extracted DataFrame.
+
+        Returns:
+            bool: True if cached. Frames which cannot be written in Parquet are not cached.
+        """
+        path: os.PathLike = self._path(key)
+        tmp: os.PathLike = f"{path}.{os.getpid()}.tmp"
+        try:
+            df.to_parquet(tmp)
+            os.replace(tmp, path)
+        except Exception as e:
+            log.warning(f"Failed to cache the extracted frame. Detail: {e}")
+            self._remove(tmp)
+            return False
+        self.evict()
+        return True
+
+    def get_or_extract(self, fp: os.PathLike, extractor: Callable[..., DataFrame], *args, **kwargs) -> DataFrame:
+        """Return the cached frame of `fp`, or run `extractor(fp, *args, **kwargs)` and cache its result.
+
+        Args:
+            fp (os.PathLike): The path of source file.
+            extractor (Callable[..., DataFrame]): The function parses the file, e.g., `pd.read_csv`.
+
+        Arguments which cannot be keyed stably, e.g., a converter function, bypass the cache.
+
+        Returns:
+            DataFrame: the extracted DataFrame.
+        """
+        arguments: str | None = arguments_key(args, kwargs)
+        if arguments is None:
+            log.debug(f"Arguments of the extractor cannot be keyed; {os.path.basename(fp)} is not cached.")
+            return extractor(fp, *args, **kwargs)
+        key: str = self.key(fp, _extractor_name(extractor), arguments)
+        df: DataFrame | None = self.get(key)
+        if df is not None:
+            log.info(f"{os.path.basename(fp)} loaded from extract cache.")
+            return df
+        df = extractor(fp, *args, **kwargs)
+        self.put(key, df)
+        return df
+
+    def _entries(self) -> list[os.DirEntry]:
+        with os.scandir(self.cache_dir) as it:
+            return [e for e in it if e.is_file() and e.name.endswith(self.suffix)]
+
+    def size(self) -> int:
+        """Total size of the cached entries in bytes."""
+        return sum(e.stat().st_size for e in self._entries())
+
+    def evict(self) -> int:
+        """Remove the least recently used entries until the cache fits `max_bytes`.
+
+        Returns:
+            int: number of evicted entries.
+        """
+        entries: list[os.DirEntry] = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+        total: int = sum(e.stat().st_size for e in entries)
+        evicted: int = 0
+        for e in entries:
+            if total <= self.max_bytes:
+                break
+            total -= e.stat().st_size
+            self._remove(e.path)
+            evicted += 1
+        return evicted
+
+    def clear(self) -> None:
+        """Remove all the cached entries."""
+        for e in self._entries():
+            self._remove(e.path)
+
+    @staticmethod
+    def _remove(path: os.PathLike) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def arguments_key(args: tuple, kwargs: dict) -> str | None:
+    """A stable representation of the extractor arguments, the same in every process.
+
+    Args:
+        args (tuple): positional arguments.
+        kwargs (dict): keyword arguments, sorted by name.
+
+    Returns:
+        str | None: the representation, or None if an argument is not a plain value.
+    """
+    try:
+        return _stable_repr((tuple(args), dict(kwargs)))
+    except TypeError:
+        return None
+
+
+def _extractor_name(extractor: Callable[..., DataFrame]) -> str:
+    """The module and qualified name of the extractor, so the `extract` functions of two ETLs sharing a cache differ."""
+    qualname: str | None = getattr(extractor, "__qualname__", None)
+    if qualname is None:
+        return repr(extractor)
+    return f"{getattr(extractor, '__module__', None)}.{qualname}"
+
+
+def _stable_repr(value) -> str:
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}({','.join(_stable_repr(v) for v in value)})"
+    if isinstance(value, (set, frozenset)):
+        return f"set({','.join(sorted(_stable_repr(v) for v in value))})"
+    if isinstance(value, dict):
+        return f"dict({','.join(sorted(f'{_stable_repr(k)}:{_stable_repr(v)}' for k, v in value.items()))})"
+    if isinstance(value, type):  # e.g., dtype={"id": str}
+        return f"type({value.__module__}.{value.__qualname__})"
+    if isinstance(value, np.dtype):
+        return f"dtype({value.str})"
+    raise TypeError(f"{type(value).__name__} cannot be keyed")
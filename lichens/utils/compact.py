@@ -0,0 +1,95 @@
+from logging import getLogger
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype, is_integer_dtype, is_object_dtype
+from pandas.core.frame import DataFrame
+
+from lichens.tracing import record
+
+log = getLogger()
+
+
+def memory_usage(df: DataFrame) -> int:
+    """Deep memory usage of a DataFrame in bytes, including the index."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _arrow_string_dtype() -> Any:
+    try:
+        return pd.StringDtype("pyarrow")
+    except ImportError:
+        return None
+
+
+def compact_df(
+    df: DataFrame,
+    category_ratio: float = 0.5,
+    arrow_strings: bool = True,
+    downcast_floats: bool = False,
+) -> DataFrame:
+    """
+    Reduce the memory footprint of a DataFrame before loading it. Use it as a pipeline stage, e.g.,
+    `extract(fp).pipe(transform).pipe(compact_df).pipe(load)`.
+
+    - Integer columns are downcast to the smallest integer type holding their values.
+    - String columns whose distinct-to-total ratio is at most `category_ratio` become categoricals.
+    - The other string columns become Arrow strings when pyarrow is installed and they hold no missing values.
+    - Float columns are downcast to float32 only with `downcast_floats=True` and only if every value is
+      exactly representable. Note the float32 values may be rendered with fewer digits by `generate_insert_sql`.
+
+    The values rendered to the database are unchanged. The input frame is never modified. The memory report is logged,
+    kept in `attrs["memory_report"]` of the returned frame and, in `EtlManager.trace_file()`, added to `last_log`
+    by `update_status()`.
+
+    Args:
+        df (DataFrame): the DataFrame to compact.
+        category_ratio (float, optional): The max ratio of distinct values to rows for a categorical. Defaults to 0.5.
+        arrow_strings (bool, optional): Convert string columns to Arrow strings. Defaults to True.
+        downcast_floats (bool, optional): Downcast float64 to float32 when lossless. Defaults to False.
+
+    Returns:
+        DataFrame: the compacted DataFrame.
+    """
+    before: int = memory_usage(df)
+    arrow_dtype = _arrow_string_dtype() if arrow_strings else None
+    converted: dict[str, pd.Series] = {}
+    changes: dict[str, str] = {}
+
+    for col in df.columns:
+        s: pd.Series = df[col]
+        new: pd.Series | None = None
+        if is_integer_dtype(s.dtype) and not isinstance(s.dtype, pd.api.extensions.ExtensionDtype):
+            new = pd.to_numeric(s, downcast="integer")
+        elif downcast_floats and s.dtype == np.float64:
+            s32: pd.Series = s.astype(np.float32)
+            if ((s32.astype(np.float64) == s) | s.isna()).all():
+                new = s32
+        elif is_object_dtype(s.dtype) and len(s) and infer_dtype(s, skipna=True) == "string":
+            if s.nunique(dropna=True) <= category_ratio * len(s):
+                new = s.astype("category")
+            elif arrow_dtype is not None and not s.isna().any():
+                new = s.astype(arrow_dtype)
+        if new is not None and new.dtype != s.dtype:
+            converted[col] = new
+            changes[str(col)] = f"{s.dtype}->{new.dtype}"
+
+    df = df.copy(deep=False)  # the report is set on the returned frame only, even if nothing is converted
+    for col, new in converted.items():
+        df[col] = new
+    after: int = memory_usage(df)
+    report: dict[str, Any] = {
+        "before_bytes": before,
+        "after_bytes": after,
+        "ratio": round(after / before, 4) if before else 1.0,
+        "columns": changes,
+    }
+    df.attrs["memory_report"] = report
+    record("memory_report", report)
+    log.info(
+        f"Memory usage: {before / 1024**2:.2f} MB -> {after / 1024**2:.2f} MB "
+        f"({report['ratio']:.1%}). Converted: {changes}"
+    )
+    return df
+
@@ -1,14 +1,28 @@
-from ftplib import FTP
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from ftplib import FTP, error_perm
 from fnmatch import fnmatch
-from glob import glob
+from logging import getLogger
 import os 
+import posixpath
+import queue
+import socket
+import threading
 import asyncio
+from typing import AsyncIterator, Callable
 import aioftp
 
+from lichens.utils.stream import RemoteSource, StreamCancelled
+from lichens.utils.sync import RemoteEntry, RemoteManifest, file_checksum
+from lichens.utils.transfer import TransferReport, local_files
 
-class FtpServer(FTP):
+log = getLogger()
+
+
+class FtpServer(FTP, RemoteSource):
     """
     A subclass of FTP with additional methods for batch uploading and downloading.
+    Remote files can also be read as streams with `open_stream()`.
 
     Args:
         host (str, optional): The FTP server hostname or IP address. Defaults to an empty string.
@@ -19,9 +33,15 @@ class FtpServer(FTP):
         source_address (tuple[str, int] or None, optional): The source address for the connection. Defaults to None.
         encoding (str, optional): The encoding to be used for data transfers. Defaults to "utf-8".
     """
-    def __init__(self, host: str = "", user: str = "", passwd: str = "", acct: str = "", timeout: float = ..., source_address: tuple[str, int] | None = None, *, encoding: str = "utf-8") -> None:
+    _protocol: str = "ftp"
+    def __init__(self, host: str = "", user: str = "", passwd: str = "", acct: str = "", timeout: float = None, source_address: tuple[str, int] | None = None, *, encoding: str = "utf-8") -> None:
+        self._credentials: tuple[str, str, str] = (user, passwd, acct)
         super().__init__(host, user, passwd, acct, timeout, source_address, encoding=encoding)
 
+    def login(self, user: str = "", passwd: str = "", acct: str = "") -> str:
+        self._credentials = (user, passwd, acct)
+        return super().login(user, passwd, acct)
+
     def batch_upload(self, src: os.PathLike, dst: os.PathLike, filter_regex: str = None, *args, **kwargs):
         """Upload all the files matched the regex to the ftp folder. 
 
@@ -30,16 +50,15 @@ class FtpServer(FTP):
             dst (os.PathLike): Destination directory on the FTP server.
             filter_regex (str): Regular expression to filter files. Defaults to None.
         """
-        os.chdir(src)  # Change to the source directory
-        files_to_upload = glob(filter_regex) if filter_regex else glob('*')
+        files_to_upload = local_files(src, filter_regex)
         
         for file in files_to_upload:
             local_file_path = os.path.join(src, file)
-            remote_file_path = os.path.join(dst, file)
+            remote_file_path = posixpath.join(dst, file)
             
             with open(local_file_path, 'rb') as local_file:
                 self.storbinary(f"STOR {remote_file_path}", local_file)
-        print("Batch upload completed.")
+        log.info("Batch upload completed.")
 
     def batch_download(self, src: os.PathLike, dst: os.PathLike, filter_regex: str = None, *args, **kwargs):
         """Download all the files matched the regex to the local folder.
@@ -49,74 +68,437 @@ class FtpServer(FTP):
             dst (os.PathLike): Destination directory to save downloaded files.
             filter_regex (str, optional): Regular expression to filter files. Defaults to None.
         """
-        os.chdir(dst)  # Change to the destination directory
-        files_to_download = self.nlst(src)  # Get the list of files in the source directory
+        files_to_download = [posixpath.basename(a) for a in self.nlst(src)]  # Get the list of files in the source directory
         
         for file in files_to_download:
             if filter_regex and not fnmatch(file, filter_regex):
                 continue  # Skip files that don't match the filter
             
             local_file_path = os.path.join(dst, file)
-            remote_file_path = os.path.join(src, file)
+            remote_file_path = posixpath.join(src, file)
             
             with open(local_file_path, 'wb') as local_file:
                 self.retrbinary(f"RETR {remote_file_path}", local_file.write)
-        print("Batch download completed.")
+        log.info("Batch download completed.")
+
+    def new_session(self) -> FTP:
+        """Open another logged-in session to the same server with the same settings.
+
+        Returns:
+            FTP: the new session.
+        """
+        ftp = FTP(timeout=self.timeout, encoding=self.encoding)
+        ftp.connect(self.host, self.port, source_address=self.source_address)
+        ftp.login(*self._credentials)
+        ftp.set_pasv(self.passiveserver)
+        return ftp
+
+    def _transfer_to(self, remote_path: str) -> Callable[[Callable[[bytes], None]], None]:
+        # sockets of the session, shut down by `abort()` to wake a transfer blocked in a read, e.g., with timeout=None
+        sockets: list[socket.socket] = []
+        aborted: threading.Event = threading.Event()
+
+        def _shutdown(sock: socket.socket) -> None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+        def _transfer(write: Callable[[bytes], None]) -> None:
+            ftp: FTP = self.new_session()
+            ntransfercmd = ftp.ntransfercmd
 
+            def _ntransfercmd(*args, **kwargs):
+                conn, size = ntransfercmd(*args, **kwargs)
+                sockets.append(conn)
+                if aborted.is_set():
+                    _shutdown(conn)
+                return conn, size
+            ftp.ntransfercmd = _ntransfercmd
+            sockets.append(ftp.sock)
+            try:
+                if aborted.is_set():
+                    raise StreamCancelled(remote_path)
+                ftp.retrbinary(f"RETR {remote_path}", write)
+            finally:
+                _close(ftp)
+
+        def _abort() -> None:
+            aborted.set()
+            for sock in list(sockets):
+                _shutdown(sock)
+        _transfer.abort = _abort
+        return _transfer
+
+    def _run_pooled(self, jobs: list[tuple[str, str]], transfer, workers: int, retries: int, direction: str) -> TransferReport:
+        report = TransferReport(self._protocol, direction)
+        if not jobs:
+            return report.finish()
+        workers = max(1, min(workers, len(jobs)))
+        sessions: queue.Queue[FTP | None] = queue.Queue()
+        for _ in range(workers):
+            sessions.put(None)  # opened lazily by the first job taking it
+
+        def _job(src_path: str, dst_path: str) -> None:
+            ftp: FTP | None = sessions.get()
+            try:
+                for attempt in range(retries + 1):
+                    try:
+                        if ftp is None:
+                            ftp = self.new_session()
+                        report.add(transfer(ftp, src_path, dst_path), files=1)
+                        return
+                    except Exception as e:
+                        _close(ftp)
+                        ftp = None
+                        if attempt == retries:
+                            log.error(f"Failed to transfer {src_path}. Detail: {e}")
+                            report.fail(src_path, e)
+            finally:
+                sessions.put(ftp)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda job: _job(*job), jobs))
+        while not sessions.empty():
+            _close(sessions.get())
+        return report.finish()
+
+    def parallel_batch_download(self, src: str, dst: os.PathLike, filter_regex: str = None, workers: int = 4, resume: bool = True, retries: int = 1) -> TransferReport:
+        """Download all the files matched the filter over a pool of `workers` logged-in sessions.
+        The process working directory is not changed. Partial local files are resumed with `REST`.
+
+        Args:
+            src (str): Source directory on the FTP server.
+            dst (os.PathLike): Destination directory to save downloaded files.
+            filter_regex (str, optional): Pattern to filter files. Defaults to None.
+            workers (int, optional): Number of FTP sessions. Defaults to 4.
+            resume (bool, optional): Continue partial downloads instead of starting over. Defaults to True.
+            retries (int, optional): Retries of a file on a fresh session. Defaults to 1.
 
-class AioFtpServer(aioftp.ClientSession):
+        Returns:
+            TransferReport: files, bytes, failures and throughput.
+        """
+        files: list[str] = [posixpath.basename(a) for a in self.nlst(src)]
+        jobs: list[tuple[str, str]] = [
+            (posixpath.join(src, f), os.path.join(dst, f))
+            for f in files if not filter_regex or fnmatch(f, filter_regex)
+        ]
+
+        report: TransferReport = self._run_pooled(
+            jobs, lambda ftp, remote_path, local_path: _retrieve(ftp, remote_path, local_path, resume), workers, retries, "download"
+        )
+        log.info(f"Parallel batch download completed. {report}")
+        return report
+
+    def stat_files(self, src: str) -> list[RemoteEntry]:
+        """List the files in a remote directory with their size and modification time.
+        Uses `MLSD`, or `NLST` with `SIZE`/`MDTM` if the server does not support it.
+
+        Args:
+            src (str): Source directory on the FTP server.
+
+        Returns:
+            list[RemoteEntry]: the files.
+        """
+        try:
+            return [
+                RemoteEntry(posixpath.join(src, name), int(facts["size"]) if "size" in facts else None, _parse_ftp_time(facts.get("modify")))
+                for name, facts in self.mlsd(src, facts=["type", "size", "modify"])
+                if facts.get("type", "file") == "file"
+            ]
+        except error_perm:
+            pass
+        self.voidcmd("TYPE I")
+        entries: list[RemoteEntry] = []
+        for name in self.nlst(src):
+            path: str = posixpath.join(src, posixpath.basename(name))
+            try:
+                size: int | None = self.size(path)
+            except error_perm:  # directories
+                continue
+            try:
+                mtime: datetime | None = _parse_ftp_time(self.voidcmd(f"MDTM {path}").split()[-1])
+            except error_perm:
+                mtime = None
+            entries.append(RemoteEntry(path, size, mtime))
+        return entries
+
+    def sync_download(self, src: str, dst: os.PathLike, manifest: RemoteManifest, filter_regex: str = None, workers: int = 4, checksum: bool = False, retries: int = 1) -> TransferReport:
+        """Download only the files which are new or changed since the last sync, then record them in the manifest.
+
+        Args:
+            src (str): Source directory on the FTP server.
+            dst (os.PathLike): Destination directory to save downloaded files.
+            manifest (RemoteManifest): The manifest of the ETL, e.g., `em.get_remote_manifest()`.
+            filter_regex (str, optional): Pattern to filter files. Defaults to None.
+            workers (int, optional): Number of FTP sessions. Defaults to 4.
+            checksum (bool, optional): Record the checksum of the downloaded files. Defaults to False.
+            retries (int, optional): Retries of a file on a fresh session. Defaults to 1.
+
+        Returns:
+            TransferReport: files, bytes, failures and throughput of the transferred files.
+        """
+        entries: list[RemoteEntry] = [
+            e for e in self.stat_files(src) if not filter_regex or fnmatch(posixpath.basename(e.path), filter_regex)
+        ]
+        todo: list[RemoteEntry] = manifest.changed(entries)
+        local: dict[str, str] = {e.path: os.path.join(dst, posixpath.basename(e.path)) for e in todo}
+        report: TransferReport = self._run_pooled(
+            list(local.items()), lambda ftp, remote_path, local_path: _retrieve(ftp, remote_path, local_path, False), workers, retries, "download"
+        )
+        manifest.record(
+            e._replace(checksum=file_checksum(local[e.path]) if checksum else None)
+            for e in todo if e.path not in report.failed
+        )
+        log.info(f"Sync download completed. {len(entries) - len(todo)} unchanged, {report}")
+        return report
+
+    def parallel_batch_upload(self, src: os.PathLike, dst: str, filter_regex: str = None, workers: int = 4, resume: bool = True, retries: int = 1) -> TransferReport:
+        """Upload all the files matched the filter over a pool of `workers` logged-in sessions.
+        The process working directory is not changed. Partial remote files are resumed with `REST`.
+
+        Args:
+            src (os.PathLike): Source directory containing files to upload.
+            dst (str): Destination directory on the FTP server.
+            filter_regex (str, optional): Pattern to filter files. Defaults to None.
+            workers (int, optional): Number of FTP sessions. Defaults to 4.
+            resume (bool, optional): Continue partial uploads instead of starting over. Defaults to True.
+            retries (int, optional): Retries of a file on a fresh session. Defaults to 1.
+
+        Returns:
+            TransferReport: files, bytes, failures and throughput.
+        """
+        jobs: list[tuple[str, str]] = [
+            (os.path.join(src, f), posixpath.join(dst, f)) for f in local_files(src, filter_regex)
+        ]
+
+        def _upload(ftp: FTP, local_path: str, remote_path: str) -> int:
+            offset: int = 0
+            if resume:
+                ftp.voidcmd("TYPE I")
+                try:
+                    offset = ftp.size(remote_path) or 0
+                except error_perm:  # not exists
+                    offset = 0
+                local_size: int = os.path.getsize(local_path)
+                if offset == local_size:
+                    return 0
+                if offset > local_size:
+                    offset = 0
+            with open(local_path, "rb") as local_file:
+                local_file.seek(offset)
+                ftp.storbinary(f"STOR {remote_path}", local_file, rest=offset or None)
+                return local_file.tell() - offset
+
+        report: TransferReport = self._run_pooled(jobs, _upload, workers, retries, "upload")
+        log.info(f"Parallel batch upload completed. {report}")
+        return report
+
+
+def _retrieve(ftp: FTP, remote_path: str, local_path: str, resume: bool) -> int:
+    offset: int = os.path.getsize(local_path) if resume and os.path.exists(local_path) else 0
+    if offset:
+        ftp.voidcmd("TYPE I")
+        remote_size: int | None = ftp.size(remote_path)
+        if remote_size == offset:
+            return 0
+        if remote_size is None or offset > remote_size:
+            offset = 0
+    received: list[int] = [0]
+    with open(local_path, "ab" if offset else "wb") as local_file:
+        def _write(block: bytes) -> None:
+            local_file.write(block)
+            received[0] += len(block)
+        ftp.retrbinary(f"RETR {remote_path}", _write, rest=offset or None)
+    return received[0]
+
+
+def _parse_ftp_time(value: str | None) -> datetime | None:
+    """Parse the `YYYYMMDDHHMMSS[.sss]` time of MLSD/MDTM in UTC."""
+    if not value:
+        return None
+    return datetime.strptime(value[:14], "%Y%m%d%H%M%S")
+
+
+def _close(ftp: FTP | None) -> None:
+    if ftp is None:
+        return
+    try:
+        ftp.quit()
+    except Exception:
+        ftp.close()
+
+
+class AioFtpServer(aioftp.Client, RemoteSource):
     """
-    A subclass of aioftp.ClientSession with additional methods for batch uploading and downloading asynchronously.
+    A subclass of aioftp.Client with additional methods for batch uploading and downloading asynchronously.
+    `async with` connects and logs in; the batch methods fan out over extra sessions to the same server.
+    Remote files can also be read as streams with `open_stream()` from synchronous code.
 
     Args:
         host (str, optional): The FTP server hostname or IP address. Defaults to an empty string.
-        user (str, optional): The username for FTP authentication. Defaults to an empty string.
-        passwd (str, optional): The password for FTP authentication. Defaults to an empty string.
+        user (str, optional): The username for FTP authentication. Defaults to "anonymous".
+        passwd (str, optional): The password for FTP authentication. Defaults to "anon@".
         acct (str, optional): An optional account string. Defaults to an empty string.
         timeout (float, optional): Timeout for FTP operations. Defaults to None.
         source_address (tuple[str, int] or None, optional): The source address for the connection. Defaults to None.
         encoding (str, optional): The encoding to be used for data transfers. Defaults to "utf-8".
+        port (int, optional): The FTP server port. Defaults to 21.
     """
-    def __init__(self, host: str = "", user: str = "", passwd: str = "", acct: str = "", timeout: float = ..., source_address: tuple[str, int] | None = None, *, encoding: str = "utf-8") -> None:
-        super().__init__(host, user, passwd, acct, timeout, source_address, encoding=encoding)
+    _protocol: str = "ftp"
+    def __init__(self, host: str = "", user: str = "anonymous", passwd: str = "anon@", acct: str = "", timeout: float = None, source_address: tuple[str, int] | None = None, *, encoding: str = "utf-8", port: int = aioftp.DEFAULT_PORT) -> None:
+        self._client_kwargs: dict = {"socket_timeout": timeout, "encoding": encoding}
+        if source_address:
+            self._client_kwargs["local_addr"] = source_address
+        super().__init__(**self._client_kwargs)
+        self.host: str = host
+        self.port: int = port
+        self._credentials: tuple[str, str, str] = (user, passwd, acct)
 
-    async def aio_batch_upload(self, src: os.PathLike, dst: os.PathLike, filter_regex: str = None, *args, **kwargs):
-        """Upload all the files matched the regex to the ftp folder asynchronously.
+    async def __aenter__(self) -> "AioFtpServer":
+        await self.connect(self.host, self.port)
+        await self.login(*self._credentials)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        try:
+            await self.quit()
+        except Exception:
+            self.close()
+
+    async def new_session(self) -> aioftp.Client:
+        """Open another logged-in session to the same server with the same settings.
+
+        Returns:
+            aioftp.Client: the new session.
+        """
+        client = aioftp.Client(**self._client_kwargs)
+        await client.connect(self.host, self.port)
+        await client.login(*self._credentials)
+        return client
+
+    def _transfer_to(self, remote_path: str) -> Callable[[Callable[[bytes], None]], None]:
+        async def _download(write: Callable[[bytes], None]) -> None:
+            client: aioftp.Client = await self.new_session()
+            try:
+                async with client.download_stream(remote_path) as stream:
+                    async for block in stream.iter_by_block(aioftp.DEFAULT_BLOCK_SIZE):
+                        write(block)
+            finally:
+                await _aio_close(client)
+        return lambda write: asyncio.run(_download(write))
+
+    async def _run_pooled(self, jobs: AsyncIterator[tuple[str, str]], transfer, sessions: int, concurrency: int, retries: int, direction: str) -> TransferReport:
+        report = TransferReport(self._protocol, direction)
+        semaphore = asyncio.Semaphore(concurrency or sessions)
+        pool: asyncio.Queue[aioftp.Client | None] = asyncio.Queue()
+        for _ in range(sessions):
+            pool.put_nowait(None)  # opened lazily by the first job taking it
+
+        async def _job(src_path: str, dst_path: str) -> None:
+            async with semaphore:
+                client: aioftp.Client | None = await pool.get()
+                try:
+                    for attempt in range(retries + 1):
+                        try:
+                            if client is None:
+                                client = await self.new_session()
+                            report.add(await transfer(client, src_path, dst_path), files=1)
+                            return
+                        except Exception as e:
+                            if client is not None:
+                                client.close()
+                            client = None
+                            if attempt == retries:
+                                log.error(f"Failed to transfer {src_path}. Detail: {e}")
+                                report.fail(src_path, e)
+                            else:
+                                await asyncio.sleep(0.1 * 2**attempt)
+                finally:
+                    pool.put_nowait(client)
+
+        tasks: list[asyncio.Task] = []
+        async for src_path, dst_path in jobs:
+            tasks.append(asyncio.ensure_future(_job(src_path, dst_path)))
+        await asyncio.gather(*tasks)
+        while not pool.empty():
+            client = pool.get_nowait()
+            if client is not None:
+                await _aio_close(client)
+        return report.finish()
+
+    async def aio_batch_upload(self, src: os.PathLike, dst: os.PathLike, filter_regex: str = None, sessions: int = 4, concurrency: int = None, retries: int = 2, *args, **kwargs) -> TransferReport:
+        """Upload all the files matched the regex to the ftp folder asynchronously over several sessions.
 
         Args:
             src (os.PathLike): Source directory containing files to upload.
             dst (os.PathLike): Destination directory on the FTP server.
             filter_regex (str): Regular expression to filter files. Defaults to None.
+            sessions (int, optional): Number of FTP sessions. Defaults to 4.
+            concurrency (int, optional): Max files in flight. Defaults to `sessions`.
+            retries (int, optional): Retries of a file on a fresh session. Defaults to 2.
+
+        Returns:
+            TransferReport: files, bytes, failures and throughput.
         """
-        os.chdir(src)  # Change to the source directory
-        files_to_upload = glob(filter_regex) if filter_regex else glob('*')
+        async def _jobs() -> AsyncIterator[tuple[str, str]]:
+            for file in local_files(src, filter_regex):
+                yield os.path.join(src, file), posixpath.join(dst, file)
 
-        async with self:
-            for file in files_to_upload:
-                local_file_path = os.path.join(src, file)
-                remote_file_path = os.path.join(dst, file)
+        async def _upload(client: aioftp.Client, local_path: str, remote_path: str) -> int:
+            sent: int = 0
+            with open(local_path, "rb") as local_file:
+                async with client.upload_stream(remote_path) as stream:
+                    while block := local_file.read(aioftp.DEFAULT_BLOCK_SIZE):
+                        await stream.write(block)
+                        sent += len(block)
+            return sent
 
-                await self.upload(local_file_path, remote_file_path)
-        print("Asynchronous batch upload completed.")
+        async with self:
+            report: TransferReport = await self._run_pooled(_jobs(), _upload, sessions, concurrency, retries, "upload")
+        log.info(f"Asynchronous batch upload completed. {report}")
+        return report
 
-    async def aio_batch_download(self, src: os.PathLike, dst: os.PathLike, filter_regex: str = None, *args, **kwargs):
-        """Download all the files matched the regex to the local folder asynchronously.
+    async def aio_batch_download(self, src: os.PathLike, dst: os.PathLike, filter_regex: str = None, sessions: int = 4, concurrency: int = None, retries: int = 2, *args, **kwargs) -> TransferReport:
+        """Download all the files matched the regex to the local folder asynchronously over several sessions.
+        The listing is streamed, so transfers start while the remote directory is still being listed.
 
         Args:
             src (os.PathLike): Source directory on the FTP server.
             dst (os.PathLike): Destination directory to save downloaded files.
             filter_regex (str, optional): Regular expression to filter files. Defaults to None.
+            sessions (int, optional): Number of FTP sessions. Defaults to 4.
+            concurrency (int, optional): Max files in flight. Defaults to `sessions`.
+            retries (int, optional): Retries of a file on a fresh session. Defaults to 2.
+
+        Returns:
+            TransferReport: files, bytes, failures and throughput.
         """
-        os.chdir(dst)  # Change to the destination directory
-        files_to_download = await self.list(src)  # Get the list of files in the source directory
+        async def _jobs() -> AsyncIterator[tuple[str, str]]:
+            async for path, info in self.list(src):
+                if info.get("type") != "file":
+                    continue
+                if filter_regex and not fnmatch(path.name, filter_regex):
+                    continue  # Skip files that don't match the filter
+                yield posixpath.join(src, path.name), os.path.join(dst, path.name)
+
+        async def _download(client: aioftp.Client, remote_path: str, local_path: str) -> int:
+            received: int = 0
+            with open(local_path, "wb") as local_file:
+                async with client.download_stream(remote_path) as stream:
+                    async for block in stream.iter_by_block(aioftp.DEFAULT_BLOCK_SIZE):
+                        local_file.write(block)
+                        received += len(block)
+            return received
 
         async with self:
-            for file in files_to_download:
-                if filter_regex and not fnmatch(file, filter_regex):
-                    continue  # Skip files that don't match the filter
+            report: TransferReport = await self._run_pooled(_jobs(), _download, sessions, concurrency, retries, "download")
+        log.info(f"Asynchronous batch download completed. {report}")
+        return report
 
-                local_file_path = os.path.join(dst, file)
-                remote_file_path = os.path.join(src, file)
 
-                await self.download(remote_file_path, local_file_path)
-        print("Asynchronous batch download completed.")
\ No newline at end of file
+async def _aio_close(client: aioftp.Client) -> None:
+    try:
+        await client.quit()
+    except Exception:
+        client.close()
@@ -0,0 +1,306 @@
+import datetime
+import hashlib
+import json
+import math
+from decimal import Decimal
+from logging import getLogger
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Connection, inspect
+
+from lichens.utils.utils import DupPolicy
+
+if TYPE_CHECKING:
+    import polars as pl
+    import pyarrow as pa
+    from pandas.core.frame import DataFrame
+
+log = getLogger()
+
+DEFAULT_CHUNKSIZE: int = 1000
+
+
+class LoadTarget(NamedTuple):
+    """A table written by `EtlManager.load_many()`.
+
+    Args:
+        tablename (str): target table name, `schema.table` or with `schema`.
+        columns (list[str] | dict[str, str], optional): the projection of the frame written to the table,
+            or a mapping of frame columns to table columns. Defaults to all the columns.
+        df (DataFrame | pa.Table | pl.DataFrame, optional): the frame of this target. Defaults to the frame shared by the targets.
+        schema (str, optional): schema name. Defaults to None.
+        if_exists (str, optional): `DupPolicy` on conflicts with `unique_key`. Defaults to DupPolicy.RAISE_ERROR.
+        unique_key (list[str], optional): conflict columns of the table. Defaults to None.
+        distinct (bool, optional): write identical rows of the projection once, e.g., the header of a detail file. Defaults to True.
+    """
+    tablename: str
+    columns: list[str] | dict[str, str] | None = None
+    df: "DataFrame | pa.Table | pl.DataFrame | None" = None
+    schema: str | None = None
+    if_exists: str = DupPolicy.RAISE_ERROR.name
+    unique_key: list[str] | None = None
+    distinct: bool = True
+
+    @property
+    def qualified_name(self) -> str:
+        return f"{self.schema}.{self.tablename}" if self.schema else self.tablename
+
+
+class LoadReport:
+    """What a load wrote and what it cost, returned by `EtlManager.load_df()` and `load_many()`."""
+    def __init__(self) -> None:
+        self.rows: dict[str, int] = {}
+        self.chunks: int = 0
+        # transactions committed, and the chunks committed by a previous, failed load of the file and skipped
+        self.commits: int = 0
+        self.resumed_chunks: int = 0
+        # chunks executed again after transient errors, and the connections replaced on the way
+        self.retries: int = 0
+        self.reconnects: int = 0
+        self.replayed_chunks: int = 0
+        self.errors: list[str] = []
+        self.elapsed_s: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(vars(self))
+
+    def __repr__(self) -> str:
+        return f"LoadReport({', '.join(f'{k}={v!r}' for k, v in vars(self).items())})"
+
+
+def sql_literal(value: Any) -> str:
+    """Render a value as an SQL literal: NULL for None, NaN, NaT and pd.NA, quoted text for strings, dates and JSON."""
+    if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        return repr(value) if math.isfinite(value) else ("'Infinity'" if value > 0 else "'-Infinity'")
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime.date, datetime.time)):  # datetime and pd.Timestamp included
+        text_: str = value.isoformat()
+    elif isinstance(value, (dict, list)):
+        text_ = json.dumps(value, default=str)
+    else:
+        text_ = str(value)
+    # `\:` keeps sqlalchemy.text() from reading `:name` in the data as a bind parameter
+    return "'" + text_.replace("'", "''").replace(":", "\\:") + "'"
+
+
+def to_frame(df: "DataFrame | pa.Table | pa.RecordBatch | pl.DataFrame") -> "DataFrame | pa.Table":
+    """A loadable frame: a pandas frame as it is, the Arrow tables and record batches and the Polars frames
+    as a `pyarrow.Table` sharing their buffers, without a conversion to pandas.
+
+    Raises:
+        TypeError: not a pandas, Arrow or Polars frame.
+    """
+    import pandas as pd
+    if isinstance(df, pd.DataFrame):
+        return df
+    if type(df).__module__.partition(".")[0] == "polars":
+        return df.to_arrow()
+    try:
+        import pyarrow as pa
+    except ImportError:
+        pa = None
+    if pa is not None and isinstance(df, pa.Table):
+        return df
+    if pa is not None and isinstance(df, pa.RecordBatch):
+        return pa.Table.from_batches([df])
+    raise TypeError(f"Cannot load a {type(df).__name__}. Pass a pandas DataFrame, a pyarrow.Table or a polars.DataFrame.")
+
+
+def frame_columns(frame: "DataFrame | pa.Table") -> list[str]:
+    """The column names of a frame of `to_frame()`."""
+    names = getattr(frame, "column_names", None)  # pyarrow.Table
+    return list(names if names is not None else frame.columns)
+
+
+def frame_digest(frame: "DataFrame | pa.Table") -> str:
+    """A digest of the column names and values of a frame of `to_frame()`, e.g., to tell whether a load writes the same data."""
+    h = hashlib.blake2b(digest_size=16)
+    if hasattr(frame, "column_names"):  # pyarrow.Table: its buffers, with the offset and length of each sliced array
+        h.update(str(frame.schema).encode())
+        for batch in frame.to_batches():
+            for col in batch.columns:
+                h.update(f"{col.offset}:{len(col)}".encode())
+                for buffer in col.buffers():
+                    if buffer is not None:
+                        h.update(buffer)
+        return h.hexdigest()
+    h.update(repr([(str(c), str(t)) for c, t in frame.dtypes.items()]).encode())
+    try:
+        h.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    except TypeError:  # unhashable values, e.g., lists
+        h.update(repr(frame.to_numpy().tolist()).encode())
+    return h.hexdigest()
+
+
+def _quote(text_: "pa.ChunkedArray") -> "pa.ChunkedArray":
+    """Quote large_string values as `sql_literal()` does."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    escaped = pc.replace_substring(pc.replace_substring(text_, "'", "''"), ":", "\\:")
+    quote = pa.scalar("'", pa.large_string())
+    return pc.binary_join_element_wise(quote, escaped, quote, pa.scalar("", pa.large_string()))
+
+
+def _render_arrow(col: "pa.ChunkedArray") -> list[str]:
+    """The SQL literals of an Arrow column, as `sql_literal()` renders them, formatted by Arrow compute kernels
+    straight from the column buffers. The types without a kernel here go through `sql_literal()`."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    kind = col.type
+    if pa.types.is_dictionary(kind):
+        col = col.cast(kind.value_type)
+        kind = kind.value_type
+    if pa.types.is_integer(kind) or pa.types.is_decimal(kind):
+        rendered = pc.cast(col, pa.large_string())
+    elif pa.types.is_boolean(kind):
+        rendered = pc.if_else(col, "TRUE", "FALSE")
+    elif pa.types.is_floating(kind) and pc.all(pc.is_finite(col)).as_py() is not False:
+        # NaN is NULL, as in pandas
+        rendered = pc.cast(pc.if_else(pc.is_nan(col), None, col), pa.large_string())
+    elif pa.types.is_string(kind) or pa.types.is_large_string(kind) or str(kind) == "string_view":
+        rendered = _quote(col.cast(pa.large_string()))
+    elif pa.types.is_timestamp(kind) or pa.types.is_date(kind) or pa.types.is_time(kind):
+        # microseconds, as the databases and `datetime.isoformat()`
+        if pa.types.is_timestamp(kind) and kind.unit == "ns":
+            col = col.cast(pa.timestamp("us", kind.tz), safe=False)
+        elif pa.types.is_time64(kind) and kind.unit == "ns":
+            col = col.cast(pa.time64("us"), safe=False)
+        rendered = _quote(pc.cast(col, pa.large_string()))
+    else:
+        return [sql_literal(v) for v in col.to_pylist()]
+    # through numpy: an order of magnitude faster than to_pylist()
+    return pc.fill_null(rendered, "NULL").to_numpy().tolist()
+
+
+class RenderedFrame:
+    """
+    The SQL literals of a frame, rendered once per column and shared by the statements of every target projecting it.
+
+    Args:
+        df (DataFrame | pa.Table): the frame, from `to_frame()`.
+    """
+    def __init__(self, df: "DataFrame | pa.Table") -> None:
+        self.df: "DataFrame | pa.Table" = df
+        self.arrow: bool = hasattr(df, "column_names")
+        self._columns: dict[str, list[str]] = {}
+
+    def project(self, columns: list[str], distinct: bool = False) -> "DataFrame | pa.Table":
+        """The frame of the columns, sharing the data of the frame if it is an Arrow table, with identical rows once if `distinct`."""
+        if self.arrow:
+            projected = self.df.select(columns)
+            return projected.group_by(columns).aggregate([]) if distinct else projected
+        return self.df[columns].drop_duplicates() if distinct else self.df[columns]
+
+    def nbytes(self, columns: list[str]) -> int:
+        """Bytes of the data of the columns."""
+        if self.arrow:
+            return self.df.select(columns).nbytes
+        return int(self.df[columns].memory_usage(index=False).sum())
+
+    def column(self, name: str) -> list[str]:
+        rendered: list[str] | None = self._columns.get(name)
+        if rendered is None and self.arrow:
+            rendered = self._columns[name] = _render_arrow(self.df.column(name))
+        elif rendered is None:
+            col = self.df[name]
+            kind: str = col.dtype.kind
+            # numpy ints and bools cannot be missing, the nullable Int64 and boolean of pandas can
+            masked: bool = not isinstance(col.dtype, np.dtype)
+            if kind in "iu" and not masked:
+                rendered = col.astype(str).tolist()
+            elif kind in "iu":
+                text_: np.ndarray = col.to_numpy(dtype=col.dtype.numpy_dtype, na_value=0).astype(str)
+                rendered = np.where(col.isna().to_numpy(), "NULL", text_).tolist()
+            elif kind == "b" and not masked:
+                rendered = ["TRUE" if v else "FALSE" for v in col.tolist()]
+            elif kind == "f" and not masked and col.notna().all() and bool(abs(col).lt(math.inf).all()):
+                rendered = [repr(v) for v in col.tolist()]
+            else:
+                rendered = [sql_literal(v) for v in col.tolist()]
+            self._columns[name] = rendered
+        return rendered
+
+    def rows(self, columns: list[str], distinct: bool = False) -> list[str]:
+        """`(v1, v2, ...)` of each row of the projection, the first of identical ones only if `distinct`."""
+        rows: list[str] = [f"({', '.join(values)})" for values in zip(*(self.column(c) for c in columns))]
+        return list(dict.fromkeys(rows)) if distinct else rows
+
+
+def conflict_clause(columns: list[str], unique_key: list[str] = None, skip_on_conflict: bool = False) -> str:
+    """` ON CONFLICT ...` of an INSERT: skip or update the rows conflicting on `unique_key`, or nothing without a key."""
+    if not unique_key:
+        return ""
+    updated: list[str] = [c for c in columns if c not in unique_key]
+    if skip_on_conflict or not updated:
+        return f" ON CONFLICT ({', '.join(unique_key)}) DO NOTHING"
+    return f" ON CONFLICT ({', '.join(unique_key)}) DO UPDATE SET " + ", ".join(f"{c} = EXCLUDED.{c}" for c in updated)
+
+
+def insert_statements(
+    tablename: str,
+    columns: list[str],
+    rows: list[str],
+    chunksize: int,
+    unique_key: list[str] = None,
+    skip_on_conflict: bool = False,
+) -> list[str]:
+    """INSERT statements of `chunksize` rendered rows each, with the conflict handling of `conflict_clause()`."""
+    head: str = f"INSERT INTO {tablename} ({', '.join(columns)}) VALUES "
+    tail: str = conflict_clause(columns, unique_key, skip_on_conflict)
+    return [head + ", ".join(rows[i : i + chunksize]) + tail for i in range(0, len(rows), chunksize)]
+
+
+def order_targets(tablenames: list[str], con: Connection) -> list[int]:
+    """Order the tables so referenced tables are written before the tables with foreign keys to them.
+    Tables without a dependency between them keep the given order.
+
+    Args:
+        tablenames (list[str]): the tables, `table` or `schema.table`, a table possibly more than once.
+        con (Connection): the connection the foreign keys are read from.
+
+    Returns:
+        list[int]: the indexes of `tablenames` in dependency order, or in the given order if the foreign keys form a cycle.
+    """
+    given: list[int] = list(range(len(tablenames)))
+    if len(set(tablenames)) < 2:
+        return given
+    inspector = inspect(con)
+    names: list[tuple[str, str]] = []
+    for tablename in tablenames:
+        schema, _, table = tablename.rpartition(".")
+        names.append((schema or inspector.default_schema_name, table))
+    depends: list[set[tuple[str, str]]] = []
+    for schema, table in names:
+        foreign_keys: list[dict] = []
+        # has_table() also makes SQLite reload a schema changed by another connection, which PRAGMA foreign_key_list does not
+        if inspector.has_table(table, schema=schema):
+            try:
+                foreign_keys = inspector.get_foreign_keys(table, schema=schema)
+            except NotImplementedError:
+                pass
+        refs: set[tuple[str, str]] = {(fk["referred_schema"] or schema, fk["referred_table"]) for fk in foreign_keys}
+        depends.append((refs & set(names)) - {(schema, table)})
+
+    ordered: list[int] = []
+    written: set[tuple[str, str]] = set()
+    pending: list[int] = list(given)
+    while pending:
+        ready: int | None = next((i for i in pending if depends[i] <= written), None)
+        if ready is None:
+            log.warning(f"Foreign keys between {', '.join(dict.fromkeys(tablenames))} form a cycle. Write them in the given order.")
+            return given
+        ordered.append(ready)
+        pending.remove(ready)
+        # a table is written once all its targets are
+        if all(names[i] != names[ready] for i in pending):
+            written.add(names[ready])
+    return ordered
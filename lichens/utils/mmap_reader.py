@@ -0,0 +1,282 @@
+import mmap
+import os
+from contextlib import contextmanager
+from logging import getLogger
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame
+
+from lichens.errors.file_errors import RecordFormatError
+
+log = getLogger()
+
+DEFAULT_CHUNK_ROWS: int = 500_000
+# bytes scanned for record boundaries at a time, bounding the temporary masks of a multi-GB file
+SCAN_BLOCK: int = 64 * 1024**2
+NEWLINE: int = ord("\n")
+CARRIAGE_RETURN: int = ord("\r")
+BLANK: tuple[int, ...] = (ord(" "), ord("\t"), 0)
+
+
+@contextmanager
+def _mapped(fp: os.PathLike) -> Iterator[np.ndarray]:
+    """The bytes of a file as a read-only uint8 array over a memory map, shared with the page cache."""
+    with open(fp, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield np.empty(0, dtype=np.uint8)
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        except (AttributeError, OSError):  # not on Windows
+            pass
+        try:
+            yield np.frombuffer(mm, dtype=np.uint8)
+        finally:
+            try:
+                mm.close()
+            except BufferError:  # an array still views the map; it is closed when the array is freed
+                pass
+
+
+def _records(buf: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """The offsets and the lengths, without the line break, of the non-empty lines."""
+    ends: list[np.ndarray] = [
+        np.flatnonzero(buf[i : i + SCAN_BLOCK] == NEWLINE) + i for i in range(0, len(buf), SCAN_BLOCK)
+    ]
+    end: np.ndarray = np.concatenate(ends) if ends else np.empty(0, dtype=np.intp)
+    if len(buf) and buf[-1] != NEWLINE:
+        end = np.append(end, len(buf))
+    start: np.ndarray = np.concatenate(([0], end[:-1] + 1)).astype(np.intp) if len(end) else end
+    length: np.ndarray = end - start
+    crlf: np.ndarray = length > 0
+    crlf[crlf] = buf[end[crlf] - 1] == CARRIAGE_RETURN
+    length[crlf] -= 1
+    keep: np.ndarray = length > 0
+    return start[keep], length[keep]
+
+
+def _gather(buf: np.ndarray, begin: np.ndarray, width: np.ndarray, size: int) -> np.ndarray:
+    """`size` bytes of each field as rows of a 2D array, padded with NUL past the `width` of the field."""
+    offsets: np.ndarray = np.arange(size)
+    index: np.ndarray = begin[:, None] + offsets
+    np.minimum(index, len(buf) - 1, out=index)
+    block: np.ndarray = buf[index]
+    block[offsets >= width[:, None]] = 0
+    return block
+
+
+def _strided(buf: np.ndarray, start: np.ndarray, length: np.ndarray) -> np.ndarray | None:
+    """The records as a 2D view of the map without a copy, if they have one length at a fixed stride, else None."""
+    if len(start) < 2 or length.min() != length.max():
+        return None
+    stride: int = int(start[1] - start[0])
+    if not np.array_equal(np.diff(start), np.full(len(start) - 1, stride)):
+        return None
+    return np.lib.stride_tricks.as_strided(buf[start[0] :], shape=(len(start), int(length[0])), strides=(stride, 1), writeable=False)
+
+
+def _convert(block: np.ndarray, dtype: str | None, encoding: str) -> np.ndarray | pd.api.extensions.ExtensionArray:
+    """Parse the fields, the rows of `block`, to a column. A blank field is missing: None, NaN, NaT or <NA>."""
+    width: int = block.shape[1]
+    if width == 0:
+        return np.full(len(block), None, dtype=object)
+    raw: np.ndarray = np.ascontiguousarray(block).view(f"S{width}").ravel()
+    kind: str = np.dtype(dtype).kind if dtype not in (None, str, "str", object, "object") else "O"
+    blank: np.ndarray = np.isin(block, BLANK).all(axis=1) if kind != "O" else None
+    if kind in "iu":
+        values: np.ndarray = np.where(blank, b"0", raw).astype(dtype)
+        # nullable integers only if needed, as pandas
+        return pd.arrays.IntegerArray(values, blank) if blank.any() else values
+    if kind == "f":
+        return np.where(blank, b"nan", raw).astype(dtype)
+    if kind == "M":
+        return np.where(blank, b"NaT", raw).astype(dtype)
+    if kind == "b":
+        flags: np.ndarray = np.isin(np.char.lower(np.char.strip(raw)), (b"1", b"true", b"t", b"y", b"yes"))
+        return pd.arrays.BooleanArray(flags, blank) if blank.any() else flags
+    if kind in "OUS":
+        # faster than np.char.decode and np.char.strip
+        return np.array([v.decode(encoding).strip() or None for v in raw.tolist()], dtype=object)
+    raise ValueError(f"Unsupported dtype {dtype}.")
+
+
+def iter_fixed_width(
+    fp: os.PathLike,
+    colspecs: list[tuple[int, int]],
+    names: list[str],
+    dtypes: dict[str, str] = None,
+    skiprows: int = 0,
+    encoding: str = "utf-8",
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[DataFrame]:
+    """
+    Parse a fixed-width text file by chunks of rows, e.g., a multi-GB instrument export, to load each chunk
+    before the next is parsed. The file is memory-mapped, the line breaks are found by vectorized byte scans and
+    each column is sliced out of the records and parsed by NumPy, without Python objects per field except for text.
+    If the records have one length, the columns are sliced from a view of the map without copying the records.
+
+    Args:
+        fp (os.PathLike): The path of the file.
+        colspecs (list[tuple[int, int]]): half-open `[start, end)` byte offsets of each field in a record, as `pd.read_fwf`.
+        names (list[str]): the column names.
+        dtypes (dict[str, str], optional): numpy dtypes of the columns, e.g., "int64", "float64", "datetime64[s]" or "bool";
+            the others are text. Defaults to None, all text.
+        skiprows (int, optional): lines to skip, e.g., a header. Defaults to 0.
+        encoding (str, optional): encoding of the text fields. Defaults to "utf-8".
+        chunk_rows (int, optional): rows of each chunk. Defaults to DEFAULT_CHUNK_ROWS.
+
+    Yields:
+        Iterator[DataFrame]: the chunks of rows, blank lines skipped. A blank field is missing.
+
+    Example:
+    ```
+    spec = dict(colspecs=[(0, 10), (10, 14), (14, 26)], names=["lot_id", "seq", "value"], dtypes={"seq": "int32", "value": "float64"})
+    for chunk in iter_fixed_width(os.path.join(em.src_folder, f), **spec):
+        em.load_df(chunk, "lot_detail", schema="qc", if_exists="replace", chunksize=5000, unique_key=["lot_id", "seq"])
+    ```
+    """
+    if not names:
+        raise ValueError("No columns. Pass `colspecs` and `names`.")
+    if len(colspecs) != len(names):
+        raise ValueError(f"{len(colspecs)} colspecs for {len(names)} names.")
+    dtypes = dtypes or {}
+    with _mapped(fp) as buf:
+        start, length = _records(buf)
+        start, length = start[skiprows:], length[skiprows:]
+        for i in range(0, len(start), chunk_rows):
+            s, n = start[i : i + chunk_rows], length[i : i + chunk_rows]
+            records: np.ndarray | None = _strided(buf, s, n)
+            columns: dict[str, np.ndarray] = {}
+            for (lo, hi), name in zip(colspecs, names):
+                if records is not None and hi <= records.shape[1]:
+                    block: np.ndarray = records[:, lo:hi]
+                else:  # shorter records, e.g., with the trailing blanks trimmed, are padded
+                    block = _gather(buf, s + lo, np.clip(n - lo, 0, hi - lo), hi - lo)
+                columns[name] = _convert(block, dtypes.get(name), encoding)
+            del records, block
+            yield pd.DataFrame(columns, copy=False)
+        del buf
+
+
+def read_fixed_width(
+    fp: os.PathLike,
+    colspecs: list[tuple[int, int]],
+    names: list[str],
+    dtypes: dict[str, str] = None,
+    skiprows: int = 0,
+    encoding: str = "utf-8",
+) -> DataFrame:
+    """Parse a whole fixed-width text file as `iter_fixed_width()`, e.g., as the extractor of `EtlManager.extract()`.
+
+    Example:
+    ```
+    df = em.extract(os.path.join(em.src_folder, f), read_fixed_width, colspecs=[(0, 10), (10, 14)], names=["lot_id", "seq"])
+    ```
+    """
+    return _concat(iter_fixed_width(fp, colspecs, names, dtypes, skiprows, encoding), names)
+
+
+def iter_delimited(
+    fp: os.PathLike,
+    sep: str = ",",
+    names: list[str] = None,
+    header: bool = True,
+    dtypes: dict[str, str] = None,
+    skiprows: int = 0,
+    encoding: str = "utf-8",
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[DataFrame]:
+    """
+    Parse a delimited text file by chunks of rows, as `iter_fixed_width()`: the separators are found by
+    vectorized byte scans and the fields are parsed by NumPy. For unquoted exports only, e.g., of instruments;
+    use `pd.read_csv` for files with quoted fields.
+
+    Args:
+        fp (os.PathLike): The path of the file.
+        sep (str, optional): a one-byte separator. Defaults to ",".
+        names (list[str], optional): the column names. Defaults to the header.
+        header (bool, optional): whether the first line, after `skiprows`, is a header. Defaults to True.
+        dtypes (dict[str, str], optional): numpy dtypes of the columns, as `iter_fixed_width()`. Defaults to None, all text.
+        skiprows (int, optional): lines to skip before the header. Defaults to 0.
+        encoding (str, optional): encoding of the file. Defaults to "utf-8".
+        chunk_rows (int, optional): rows of each chunk. Defaults to DEFAULT_CHUNK_ROWS.
+
+    Raises:
+        RecordFormatError: a record has another number of fields, or a quoted field.
+
+    Yields:
+        Iterator[DataFrame]: the chunks of rows, blank lines skipped. An empty field is missing.
+    """
+    separator: bytes = sep.encode(encoding)
+    if len(separator) != 1:
+        raise ValueError(f"The separator must be one byte, not {sep!r}.")
+    dtypes = dtypes or {}
+    with _mapped(fp) as buf:
+        start, length = _records(buf)
+        start, length = start[skiprows:], length[skiprows:]
+        line: int = skiprows
+        if header and len(start):
+            first: list[str] = bytes(buf[start[0] : start[0] + length[0]]).decode(encoding).split(sep)
+            names = names or [n.strip() for n in first]
+            start, length, line = start[1:], length[1:], line + 1
+        if not names:
+            raise ValueError("No header. Pass `names`.")
+        for i in range(0, len(start), chunk_rows):
+            s, n = start[i : i + chunk_rows], length[i : i + chunk_rows]
+            segment: np.ndarray = buf[s[0] : s[-1] + n[-1]]
+            if (segment == ord('"')).any():
+                raise RecordFormatError(f"Quoted fields in {fp} after line {line + i}. Use pd.read_csv.")
+            found: np.ndarray = np.flatnonzero(segment == separator[0]) + s[0]
+            # separators per record, which must be one fewer than the columns
+            counts: np.ndarray = np.diff(np.searchsorted(found, np.append(s, s[-1] + n[-1])))
+            wrong: np.ndarray = np.flatnonzero(counts != len(names) - 1)
+            if len(wrong):
+                raise RecordFormatError(
+                    f"Line {line + i + wrong[0] + 1} of {fp} has {counts[wrong[0]] + 1} fields, not {len(names)}."
+                )
+            bounds: np.ndarray = np.column_stack((s - 1, found.reshape(len(s), len(names) - 1), s + n))
+            columns: dict[str, np.ndarray] = {}
+            for j, name in enumerate(names):
+                begin: np.ndarray = bounds[:, j] + 1
+                width: np.ndarray = bounds[:, j + 1] - begin
+                columns[name] = _convert(_gather(buf, begin, width, int(width.max())), dtypes.get(name), encoding)
+            del segment
+            yield pd.DataFrame(columns, copy=False)
+        del buf
+
+
+def read_delimited(
+    fp: os.PathLike,
+    sep: str = ",",
+    names: list[str] = None,
+    header: bool = True,
+    dtypes: dict[str, str] = None,
+    skiprows: int = 0,
+    encoding: str = "utf-8",
+) -> DataFrame:
+    """Parse a whole delimited text file as `iter_delimited()`, e.g., as the extractor of `EtlManager.extract()`.
+    A file with a header only gives an empty frame of its columns."""
+    df: DataFrame = _concat(iter_delimited(fp, sep, names, header, dtypes, skiprows, encoding), names or [])
+    if df.columns.empty and header and not names:
+        df = pd.DataFrame(columns=_header_names(fp, sep, skiprows, encoding))
+    return df
+
+
+def _header_names(fp: os.PathLike, sep: str, skiprows: int, encoding: str) -> list[str]:
+    """The header of a delimited file without records, read line by line, blank lines skipped as `_records()`."""
+    with open(fp, "rb") as f:
+        lines: Iterator[bytes] = (line.rstrip(b"\n").removesuffix(b"\r") for line in f)
+        for i, line in enumerate(line for line in lines if line):
+            if i == skiprows:
+                return [n.strip() for n in line.decode(encoding).split(sep)]
+    return []
+
+
+def _concat(chunks: Iterator[DataFrame], names: list[str]) -> DataFrame:
+    frames: list[DataFrame] = list(chunks)
+    if not frames:
+        return pd.DataFrame(columns=names)
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True, copy=False)
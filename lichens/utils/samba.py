@@ -1,138 +1,264 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from logging import getLogger
+import ntpath
 import os
+import uuid
+from typing import Callable, Iterator
 from smbprotocol.connection import Connection
-from smbprotocol.open import FilePipePrinterAccessMask
-from smbprotocol.header import NtStatus
-from smbprotocol.file_info import FileInformationClass, FileNamesInformation
-import glob
+from smbprotocol.exceptions import NoMoreFiles
+from smbprotocol.open import (
+    CreateDisposition,
+    CreateOptions,
+    DirectoryAccessMask,
+    FileAttributes,
+    FilePipePrinterAccessMask,
+    ImpersonationLevel,
+    Open,
+    QueryDirectoryFlags,
+    ShareAccess,
+)
+from smbprotocol.file_info import FileInformationClass
+from smbprotocol.session import Session
+from smbprotocol.tree import TreeConnect
 from fnmatch import fnmatch
 
-class SambaServer:
+from lichens.utils.stream import RemoteSource
+from lichens.utils.sync import RemoteEntry, RemoteManifest, file_checksum
+from lichens.utils.transfer import TransferReport, local_files
+
+log = getLogger()
+
+class SambaServer(RemoteSource):
     """
     A class for interacting with a Samba server for file transfers.
+    Remote files can also be read as streams with `open_stream()`.
 
     Args:
         server_name (str): The name or IP address of the Samba server.
         share_name (str): The name of the shared folder on the Samba server.
         username (str): The username for authentication.
         password (str): The password for authentication.
+        block_size (int, optional): Bytes of each read/write request. Defaults to 1 MiB.
+        inflight (int, optional): Reads/writes pipelined per file. Defaults to 4.
+        port (int, optional): The SMB port. Defaults to 445.
 
     Attributes:
         server_name (str): The name or IP address of the Samba server.
         share_name (str): The name of the shared folder on the Samba server.
         username (str): The username for authentication.
         password (str): The password for authentication.
-        connection (smbprotocol.connection.Connection): The SMB protocol connection.
+        connection (smbprotocol.connection.Connection): The SMB protocol connection, set by `connect()`.
+        tree (smbprotocol.tree.TreeConnect): The connected share, set by `connect()`.
     """
+    _protocol: str = "smb"
 
-    def __init__(self, server_name: str, share_name: str, username: str, password: str):
+    def __init__(self, server_name: str, share_name: str, username: str, password: str, block_size: int = 1024 * 1024, inflight: int = 4, port: int = 445):
         self.server_name = server_name
         self.share_name = share_name
         self.username = username
         self.password = password
-        self.connection:Connection = Connection()
+        self.block_size = block_size
+        self.inflight = inflight
+        self.port = port
+        self.connection:Connection = None
+        self.tree:TreeConnect = None
 
     def connect(self):
         """
         Connect to the Samba server.
         """
-        self.connection.connect(server_name=self.server_name, share_name=self.share_name, username=self.username, password=self.password)
+        self.connection = Connection(uuid.uuid4(), self.server_name, self.port)
+        self.connection.connect()
+        session = Session(self.connection, username=self.username, password=self.password)
+        session.connect()
+        self.tree = TreeConnect(session, rf"\\{self.server_name}\{self.share_name}")
+        self.tree.connect()
 
     def disconnect(self):
         """
         Disconnect from the Samba server.
         """
-        self.connection.disconnect()
+        self.connection.disconnect(True)
+
+    @contextmanager
+    def _open(self, path: str, write: bool = False, directory: bool = False) -> Iterator[Open]:
+        handle = Open(self.tree, path.replace("/", "\\").lstrip("\\"))
+        if directory:
+            handle.create(
+                ImpersonationLevel.Impersonation,
+                DirectoryAccessMask.FILE_LIST_DIRECTORY,
+                FileAttributes.FILE_ATTRIBUTE_DIRECTORY,
+                ShareAccess.FILE_SHARE_READ | ShareAccess.FILE_SHARE_WRITE,
+                CreateDisposition.FILE_OPEN,
+                CreateOptions.FILE_DIRECTORY_FILE,
+            )
+        else:
+            handle.create(
+                ImpersonationLevel.Impersonation,
+                (FilePipePrinterAccessMask.FILE_WRITE_DATA | FilePipePrinterAccessMask.FILE_WRITE_ATTRIBUTES) if write
+                else (FilePipePrinterAccessMask.FILE_READ_DATA | FilePipePrinterAccessMask.FILE_READ_ATTRIBUTES),
+                FileAttributes.FILE_ATTRIBUTE_NORMAL,
+                ShareAccess.FILE_SHARE_READ,
+                CreateDisposition.FILE_OVERWRITE_IF if write else CreateDisposition.FILE_OPEN,
+                CreateOptions.FILE_NON_DIRECTORY_FILE,
+            )
+        try:
+            yield handle
+        finally:
+            handle.close()
 
-    def upload_file(self, local_path: os.PathLike, remote_path: str):
+    def _block_size(self, write: bool) -> int:
+        limit: int = self.connection.max_write_size if write else self.connection.max_read_size
+        return min(self.block_size, limit) if limit else self.block_size
+
+    def upload_file(self, local_path: os.PathLike, remote_path: str) -> int:
         """
-        Upload a single file to the Samba server.
+        Upload a single file to the Samba server in chunks of `block_size`, with up to `inflight` writes pipelined.
+        Memory stays within `block_size * inflight` no matter how large the file is.
 
         Args:
             local_path (os.PathLike): The local path of the file to upload.
             remote_path (str): The remote path on the Samba server to save the file.
+
+        Returns:
+            int: number of bytes uploaded.
         """
-        with open(local_path, 'rb') as local_file:
-            with self.connection.create_file(
-                    remote_path,
-                    access_mask=FilePipePrinterAccessMask.FILE_WRITE_DATA,
-                    disposition=FilePipePrinterAccessMask.FILE_OVERWRITE_IF,
-            ) as file_handle:
-                file_handle.write(local_file.read())
-        print(f"File '{local_path}' uploaded to '{remote_path}'.")
+        sent: int = 0
+        block_size: int = self._block_size(write=True)
+        with open(local_path, 'rb', buffering=0) as local_file:
+            with self._open(remote_path, write=True) as file_handle, ThreadPoolExecutor(max_workers=self.inflight) as pool:
+                pending: deque[Future] = deque()
+                while True:
+                    block: bytes = local_file.read(block_size)
+                    if not block:
+                        break
+                    if len(pending) >= self.inflight:
+                        pending.popleft().result()
+                    pending.append(pool.submit(file_handle.write, block, sent))
+                    sent += len(block)
+                for future in pending:
+                    future.result()
+        log.debug(f"File '{local_path}' uploaded to '{remote_path}'.")
+        return sent
 
-    def download_file(self, remote_path: str, local_path: os.PathLike):
+    def _read_blocks(self, remote_path: str) -> Iterator[bytes]:
+        block_size: int = self._block_size(write=False)
+        with self._open(remote_path) as file_handle, ThreadPoolExecutor(max_workers=self.inflight) as pool:
+            size: int = file_handle.end_of_file
+            offsets: Iterator[int] = iter(range(0, size, block_size))
+            pending: deque[Future] = deque(
+                pool.submit(file_handle.read, offset, min(block_size, size - offset)) for offset in islice(offsets, self.inflight)
+            )
+            while pending:
+                block: bytes = pending.popleft().result()
+                offset: int | None = next(offsets, None)
+                if offset is not None:
+                    pending.append(pool.submit(file_handle.read, offset, min(block_size, size - offset)))
+                yield block
+
+    def _transfer_to(self, remote_path: str) -> Callable[[Callable[[bytes], None]], None]:
+        def _transfer(write: Callable[[bytes], None]) -> None:
+            for block in self._read_blocks(remote_path):
+                write(block)
+        return _transfer
+
+    def download_file(self, remote_path: str, local_path: os.PathLike) -> int:
         """
-        Download a single file from the Samba server.
+        Download a single file from the Samba server in chunks of `block_size`, with up to `inflight` reads pipelined.
+        Memory stays within `block_size * inflight` no matter how large the file is.
 
         Args:
             remote_path (str): The remote path on the Samba server to download.
             local_path (os.PathLike): The local path to save the downloaded file.
+
+        Returns:
+            int: number of bytes downloaded.
         """
-        with self.connection.open_file(
-                remote_path,
-                access_mask=FilePipePrinterAccessMask.FILE_READ_DATA,
-        ) as file_handle:
-            with open(local_path, 'wb') as local_file:
-                local_file.write(file_handle.read())
-        print(f"File '{remote_path}' downloaded to '{local_path}'.")
+        received: int = 0
+        with open(local_path, 'wb') as local_file:
+            for block in self._read_blocks(remote_path):
+                local_file.write(block)
+                received += len(block)
+        log.debug(f"File '{remote_path}' downloaded to '{local_path}'.")
+        return received
+
+    def _run_batch(self, jobs: list[tuple[str, str]], transfer: Callable[[str, str], int], max_files: int, direction: str) -> TransferReport:
+        report = TransferReport(self._protocol, direction)
+
+        def _job(src_path: str, dst_path: str) -> None:
+            try:
+                report.add(transfer(src_path, dst_path), files=1)
+            except Exception as e:
+                log.error(f"Failed to transfer {src_path}. Detail: {e}")
+                report.fail(src_path, e)
 
-    def batch_upload(self, src: os.PathLike, dst: str, filter_regex: str = None, *args, **kwargs):
+        with ThreadPoolExecutor(max_workers=max(1, max_files)) as pool:
+            list(pool.map(lambda job: _job(*job), jobs))
+        return report.finish()
+
+    def batch_upload(self, src: os.PathLike, dst: str, filter_regex: str = None, max_files: int = 4, *args, **kwargs) -> TransferReport:
         """
         Upload all files from the source directory to the destination directory on the Samba server.
+        Up to `max_files` files are transferred concurrently over the same SMB session.
 
         Args:
             src (os.PathLike): The local source directory containing files to upload.
             dst (str): The remote destination directory on the Samba server.
             filter_regex (str, optional): A regular expression to filter files. Defaults to None.
+            max_files (int, optional): Number of files transferred concurrently. Defaults to 4.
             *args: Additional positional arguments.
             **kwargs: Additional keyword arguments.
-        """
-        os.chdir(src)
-        files_to_upload = glob(filter_regex) if filter_regex else glob('*')
-
-        for file in files_to_upload:
-            local_file_path = os.path.join(src, file)
-            remote_file_path = os.path.join(dst, file)
 
-            with open(local_file_path, 'rb') as local_file:
-                with self.connection.create_file(
-                        remote_file_path,
-                        access_mask=FilePipePrinterAccessMask.FILE_WRITE_DATA,
-                        disposition=FilePipePrinterAccessMask.FILE_OVERWRITE_IF,
-                ) as file_handle:
-                    file_handle.write(local_file.read())
-        print("Batch upload completed.")
+        Returns:
+            TransferReport: files, bytes, failures and throughput.
+        """
+        jobs: list[tuple[str, str]] = [
+            (os.path.join(src, file), ntpath.join(dst, file)) for file in local_files(src, filter_regex)
+        ]
+        report: TransferReport = self._run_batch(jobs, self.upload_file, max_files, "upload")
+        log.info(f"Batch upload completed. {report}")
+        return report
 
-    def batch_download(self, src: str, dst: os.PathLike, filter_regex: str = None, *args, **kwargs):
+    def batch_download(self, src: str, dst: os.PathLike, filter_regex: str = None, max_files: int = 4, *args, **kwargs) -> TransferReport:
         """
         Download all files from the source directory on the Samba server to the local destination directory.
+        Up to `max_files` files are transferred concurrently over the same SMB session.
 
         Args:
             src (str): The remote source directory on the Samba server.
             dst (os.PathLike): The local destination directory to save downloaded files.
             filter_regex (str, optional): A regular expression to filter files. Defaults to None.
+            max_files (int, optional): Number of files transferred concurrently. Defaults to 4.
             *args: Additional positional arguments.
             **kwargs: Additional keyword arguments.
-        """
-        os.chdir(dst)
-        files_to_download = self.list_files(src)
 
-        for file in files_to_download:
-            if filter_regex and not fnmatch(file, filter_regex):
-                continue
-
-            remote_file_path = os.path.join(src, file)
-            local_file_path = os.path.join(dst, file)
-
-            with self.connection.open_file(
-                    remote_file_path,
-                    access_mask=FilePipePrinterAccessMask.FILE_READ_DATA,
-            ) as file_handle:
-                with open(local_file_path, 'wb') as local_file:
-                    local_file.write(file_handle.read())
-        print("Batch download completed.")
+        Returns:
+            TransferReport: files, bytes, failures and throughput.
+        """
+        jobs: list[tuple[str, str]] = [
+            (ntpath.join(src, file), os.path.join(dst, file))
+            for file in self.list_files(src) if not filter_regex or fnmatch(file, filter_regex)
+        ]
+        report: TransferReport = self._run_batch(jobs, self.download_file, max_files, "download")
+        log.info(f"Batch download completed. {report}")
+        return report
 
-    
+    def _query_directory(self, src: str, file_information_class: int) -> Iterator:
+        with self._open(src, directory=True) as dir_handle:
+            flags = QueryDirectoryFlags.SMB2_RESTART_SCANS
+            while True:
+                try:
+                    entries = dir_handle.query_directory("*", file_information_class, flags=flags)
+                except NoMoreFiles:
+                    break
+                flags = 0
+                for entry in entries:
+                    name: str = entry["file_name"].get_value().decode("utf-16-le")
+                    if name not in (".", ".."):
+                        yield name, entry
 
     def list_files(self, src: str):
         """
@@ -144,17 +270,52 @@ class SambaServer:
         Returns:
             list: A list of filenames in the specified directory.
         """
-        files = []
-        with self.connection.create_file(
-                src,
-                access_mask=FilePipePrinterAccessMask.FILE_READ_DATA,
-                file_info=FileNamesInformation,
-        ) as file_handle:
-            while True:
-                data = file_handle.read()
-                if not data:
-                    break
-                files.extend(entry.file_name for entry in data)
-                if NtStatus.STATUS_NO_MORE_FILES in file_handle.status:
-                    break
-        return files
+        return [name for name, _ in self._query_directory(src, FileInformationClass.FILE_NAMES_INFORMATION)]
+
+    def stat_files(self, src: str) -> list[RemoteEntry]:
+        """
+        List files in the specified directory on the Samba server with their size and modification time.
+
+        Args:
+            src (str): The remote directory path on the Samba server.
+
+        Returns:
+            list[RemoteEntry]: the files, directories excluded.
+        """
+        return [
+            RemoteEntry(
+                ntpath.join(src, name),
+                entry["end_of_file"].get_value(),
+                entry["last_write_time"].get_value().replace(tzinfo=None),
+            )
+            for name, entry in self._query_directory(src, FileInformationClass.FILE_DIRECTORY_INFORMATION)
+            if not entry["file_attributes"].get_value() & FileAttributes.FILE_ATTRIBUTE_DIRECTORY
+        ]
+
+    def sync_download(self, src: str, dst: os.PathLike, manifest: RemoteManifest, filter_regex: str = None, max_files: int = 4, checksum: bool = False) -> TransferReport:
+        """
+        Download only the files which are new or changed since the last sync, then record them in the manifest.
+
+        Args:
+            src (str): The remote source directory on the Samba server.
+            dst (os.PathLike): The local destination directory to save downloaded files.
+            manifest (RemoteManifest): The manifest of the ETL, e.g., `em.get_remote_manifest()`.
+            filter_regex (str, optional): A regular expression to filter files. Defaults to None.
+            max_files (int, optional): Number of files transferred concurrently. Defaults to 4.
+            checksum (bool, optional): Record the checksum of the downloaded files. Defaults to False.
+
+        Returns:
+            TransferReport: files, bytes, failures and throughput of the transferred files.
+        """
+        entries: list[RemoteEntry] = [
+            e for e in self.stat_files(src) if not filter_regex or fnmatch(ntpath.basename(e.path), filter_regex)
+        ]
+        todo: list[RemoteEntry] = manifest.changed(entries)
+        local: dict[str, str] = {e.path: os.path.join(dst, ntpath.basename(e.path)) for e in todo}
+        report: TransferReport = self._run_batch(list(local.items()), self.download_file, max_files, "download")
+        manifest.record(
+            e._replace(checksum=file_checksum(local[e.path]) if checksum else None)
+            for e in todo if e.path not in report.failed
+        )
+        log.info(f"Sync download completed. {len(entries) - len(todo)} unchanged, {report}")
+        return report
@@ -0,0 +1,145 @@
+import abc
+import io
+import os
+import queue
+import threading
+from logging import getLogger
+from typing import Callable
+
+from lichens.metrics import BYTES_TRANSFERRED
+
+log = getLogger()
+
+_EOF = object()
+
+
+class StreamCancelled(Exception):
+    """Raised in the transfer thread when the reader closed the stream early."""
+
+
+class RemoteStream(io.RawIOBase):
+    """
+    A readable stream of a remote file, fed block by block by a transfer running in a background thread.
+    At most `max_blocks` blocks are buffered, so the reader parses while the transfer is still running
+    and memory stays bounded. If `archive_path` is given, a copy is written there as the blocks arrive.
+
+    Args:
+        transfer (Callable[[Callable[[bytes], None]], None]): runs the transfer and calls the given writer with each block.
+        archive_path (os.PathLike, optional): where to write the archive copy. Defaults to None.
+        max_blocks (int, optional): number of blocks buffered. Defaults to 16.
+        name (str, optional): name of the stream, e.g., the remote path. Defaults to "".
+        protocol (str, optional): count the transferred bytes in `lichens_bytes_transferred` under this protocol. Defaults to None.
+        abort (Callable[[], None], optional): called from another thread to stop the transfer blocked on the network
+            when the stream is closed early, e.g., shut down its sockets. Defaults to None.
+        close_timeout (float, optional): seconds `close()` waits for the transfer to stop; it is left to finish in the background afterwards. Defaults to 5.0.
+    """
+    def __init__(self, transfer: Callable[[Callable[[bytes], None]], None], archive_path: os.PathLike = None, max_blocks: int = 16, name: str = "", protocol: str = None, abort: Callable[[], None] = None, close_timeout: float = 5.0) -> None:
+        super().__init__()
+        self.name: str = name
+        self._abort: Callable[[], None] | None = abort
+        self.close_timeout: float = close_timeout
+        self._counter = BYTES_TRANSFERRED.labels(protocol, "download") if protocol else None
+        self.archive_path: os.PathLike = archive_path
+        self.bytes: int = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_blocks)
+        self._buffer: memoryview = memoryview(b"")
+        self._cancelled: threading.Event = threading.Event()
+        self._error: BaseException | None = None
+        self._eof: bool = False
+        self._archive = open(f"{archive_path}.part", "wb") if archive_path else None
+        self._thread: threading.Thread = threading.Thread(target=self._run, args=(transfer,), daemon=True)
+        self._thread.start()
+
+    def _feed(self, block: bytes) -> None:
+        if self._counter is not None:
+            self._counter.inc(len(block))
+        if self._archive is not None:
+            self._archive.write(block)
+        while True:
+            if self._cancelled.is_set():
+                raise StreamCancelled(self.name)
+            try:
+                self._queue.put(block, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _run(self, transfer: Callable[[Callable[[bytes], None]], None]) -> None:
+        try:
+            transfer(self._feed)
+        except BaseException as e:
+            self._error = e
+        finally:
+            if self._archive is not None:
+                self._archive.close()
+                if self._error is None:
+                    os.replace(f"{self.archive_path}.part", self.archive_path)
+                else:
+                    os.remove(f"{self.archive_path}.part")
+            while not self._cancelled.is_set():
+                try:
+                    self._queue.put(_EOF, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if not len(self._buffer):
+            if self._eof:
+                return 0
+            block = self._queue.get()
+            if block is _EOF:
+                self._eof = True
+                if self._error is not None:
+                    raise IOError(f"Transfer of {self.name} failed. Detail: {self._error}") from self._error
+                return 0
+            self._buffer = memoryview(block)
+        n: int = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        self.bytes += n
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._cancelled.set()
+            if self._abort is not None and self._thread.is_alive():
+                try:
+                    self._abort()
+                except Exception as e:
+                    log.debug(f"Aborting the transfer of {self.name}: {e}")
+            self._thread.join(self.close_timeout)
+            if self._thread.is_alive():
+                log.warning(f"Transfer of {self.name} did not stop in {self.close_timeout}s after the stream was closed. Left to finish in the background.")
+        super().close()
+
+
+class RemoteSource(abc.ABC):
+    """A server which can expose a remote file as a readable stream, e.g., `FtpServer`, `AioFtpServer` and `SambaServer`."""
+    _protocol: str = None  # label of the transferred bytes in the metrics
+
+    @abc.abstractmethod
+    def _transfer_to(self, remote_path: str) -> Callable[[Callable[[bytes], None]], None]:
+        """Return a function which transfers `remote_path` and calls the given writer with each block.
+        The function may have an `abort()` attribute, which stops the transfer from another thread, see `RemoteStream`.
+        """
+
+    def open_stream(self, remote_path: str, archive_path: os.PathLike = None, buffer_size: int = 1024 * 1024, max_blocks: int = 16) -> io.BufferedReader:
+        """Open a remote file as a readable binary stream. The transfer runs in the background while the stream is read.
+        The stream is not seekable, so use it with sequential parsers, e.g., `pd.read_csv`.
+
+        Args:
+            remote_path (str): The remote path of the file.
+            archive_path (os.PathLike, optional): Write a copy of the file here as it is transferred. Defaults to None.
+            buffer_size (int, optional): Read buffer size. Defaults to 1 MiB.
+            max_blocks (int, optional): Number of transferred blocks buffered. Defaults to 16.
+
+        Returns:
+            io.BufferedReader: the stream.
+        """
+        transfer = self._transfer_to(remote_path)
+        raw = RemoteStream(transfer, archive_path=archive_path, max_blocks=max_blocks, name=remote_path, protocol=self._protocol, abort=getattr(transfer, "abort", None))
+        return io.BufferedReader(raw, buffer_size)
@@ -0,0 +1,127 @@
+import hashlib
+import os
+from datetime import datetime
+from typing import Iterable, NamedTuple
+
+from sqlalchemy import Engine, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from lichens.db.models import EtlRemoteManifest
+from lichens.db.utils import get_engine
+
+
+class RemoteEntry(NamedTuple):
+    """A file on the remote server as seen by the listing."""
+    path: str
+    size: int | None
+    mtime: datetime | None
+    checksum: str | None = None
+
+
+class RemoteManifest:
+    """
+    The remote files an ETL has pulled, persisted in `etl_remote_manifest`, so a sync run transfers only
+    the new or changed files. A file is changed if its size, mtime or, when both sides have one, checksum differs.
+
+    Args:
+        con (str | Engine): connection string or an sqlalchemy.Engine of the lichens database.
+        etl_id (int): the ETL the manifest belongs to.
+
+    Example:
+    ```
+    manifest = em.get_remote_manifest()
+    with FtpServer(host, user, passwd) as ftp:
+        ftp.sync_download("/export", em.src_folder, manifest, filter_regex="*.csv")
+    ```
+    """
+    batch_size: int = 5000
+
+    def __init__(self, con: str | Engine, etl_id: int) -> None:
+        self._engine: Engine = get_engine(con)
+        self.etl_id: int = etl_id
+
+    def load(self) -> dict[str, RemoteEntry]:
+        """All the recorded entries of the ETL in one query.
+
+        Returns:
+            dict[str, RemoteEntry]: remote path -> entry.
+        """
+        m = EtlRemoteManifest
+        with Session(self._engine) as sess:
+            rows = sess.execute(
+                select(m.remote_path, m.size, m.mtime, m.checksum).where(m.etl_id == self.etl_id)
+            ).all()
+        return {r.remote_path: RemoteEntry(*r) for r in rows}
+
+    def changed(self, entries: Iterable[RemoteEntry]) -> list[RemoteEntry]:
+        """Filter the listed entries down to the new or changed ones.
+
+        Args:
+            entries (Iterable[RemoteEntry]): entries from the remote listing.
+
+        Returns:
+            list[RemoteEntry]: entries to transfer.
+        """
+        known: dict[str, RemoteEntry] = self.load()
+        result: list[RemoteEntry] = []
+        for e in entries:
+            old: RemoteEntry | None = known.get(e.path)
+            if (
+                old is None
+                or old.size != e.size
+                or old.mtime != e.mtime
+                or (old.checksum and e.checksum and old.checksum != e.checksum)
+            ):
+                result.append(e)
+        return result
+
+    def record(self, entries: Iterable[RemoteEntry]) -> int:
+        """Upsert the transferred entries in one statement.
+
+        Args:
+            entries (Iterable[RemoteEntry]): the transferred entries.
+
+        Returns:
+            int: number of recorded entries.
+        """
+        rows: list[dict] = [
+            {
+                "etl_id": self.etl_id,
+                "remote_path": e.path,
+                "size": e.size,
+                "mtime": e.mtime,
+                "checksum": e.checksum,
+            }
+            for e in entries
+        ]
+        if not rows:
+            return 0
+        with Session(self._engine) as sess:
+            try:
+                for i in range(0, len(rows), self.batch_size):
+                    stmt = insert(EtlRemoteManifest).values(rows[i : i + self.batch_size])
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[EtlRemoteManifest.etl_id, EtlRemoteManifest.remote_path],
+                        set_={
+                            "size": stmt.excluded.size,
+                            "mtime": stmt.excluded.mtime,
+                            "checksum": stmt.excluded.checksum,
+                            "update_dtt": func.now(),
+                        },
+                    )
+                    sess.execute(stmt)
+                sess.commit()
+            except Exception as e:
+                sess.rollback()
+                raise e
+        return len(rows)
+
+
+def file_checksum(fp: os.PathLike, block_size: int = 1024 * 1024) -> str:
+    """blake2b hex digest of a local file."""
+    h = hashlib.blake2b()
+    with open(fp, "rb") as f:
+        while block := f.read(block_size):
+            h.update(block)
+    return h.hexdigest()
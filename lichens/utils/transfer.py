@@ -0,0 +1,78 @@
+import os
+import threading
+import time
+from glob import escape, glob
+from typing import Any
+
+from lichens.metrics import BYTES_TRANSFERRED
+
+
+class TransferReport:
+    """
+    Throughput report of a batch transfer. `add()` is thread-safe so a pool of sessions can share one report.
+    If `protocol` and `direction` are given, the bytes are counted in `lichens_bytes_transferred` too.
+
+    Args:
+        protocol (str, optional): e.g., "ftp" or "smb". Defaults to None.
+        direction (str, optional): "upload" or "download". Defaults to None.
+
+    Attributes:
+        files (int): number of transferred files.
+        bytes (int): number of transferred bytes.
+        failed (dict[str, str]): failed file -> error message.
+        elapsed (float): seconds from creation to `finish()`.
+    """
+    def __init__(self, protocol: str = None, direction: str = None) -> None:
+        self.files: int = 0
+        self.bytes: int = 0
+        self.failed: dict[str, str] = {}
+        self.elapsed: float = 0.0
+        self._started: float = time.perf_counter()
+        self._lock: threading.Lock = threading.Lock()
+        self._counter = BYTES_TRANSFERRED.labels(protocol, direction) if protocol and direction else None
+
+    def add(self, nbytes: int = 0, files: int = 0) -> None:
+        with self._lock:
+            self.bytes += nbytes
+            self.files += files
+        if self._counter is not None:
+            self._counter.inc(nbytes)
+
+    def fail(self, file: str, error: Exception | str) -> None:
+        with self._lock:
+            self.failed[file] = str(error)
+
+    def finish(self) -> "TransferReport":
+        self.elapsed = time.perf_counter() - self._started
+        return self
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second."""
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "files": self.files,
+            "bytes": self.bytes,
+            "failed": self.failed,
+            "elapsed": round(self.elapsed, 3),
+            "throughput": round(self.throughput, 1),
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"{self.files} file(s), {self.bytes / 1024**2:.2f} MB in {self.elapsed:.2f}s "
+            f"({self.throughput / 1024**2:.2f} MB/s), {len(self.failed)} failed"
+        )
+
+    def __repr__(self) -> str:
+        return f"TransferReport({self.as_dict()})"
+
+
+def local_files(src: os.PathLike, pattern: str = None) -> list[str]:
+    """Names of the files in a local directory matching the glob pattern, without changing the working directory."""
+    return sorted(
+        os.path.basename(a) for a in glob(os.path.join(escape(str(src)), pattern or '*'))
+        if os.path.isfile(a)
+    )
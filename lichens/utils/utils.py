@@ -1,8 +1,11 @@
 from enum import Enum, auto
 from types import DynamicClassAttribute
-from pandas.core.frame import DataFrame
+from typing import TYPE_CHECKING
 import pendulum
 
+if TYPE_CHECKING:  # only for the annotations, so `import lichens.utils` does not load pandas
+    from pandas.core.frame import DataFrame
+
 
 class EnumBase(Enum):
     def __str__(self):
@@ -28,7 +31,7 @@ class DupPolicy(EnumBase):
 
 
 def generate_insert_sql(
-    source_df: DataFrame,
+    source_df: "DataFrame",
     tablename: str,
     chunksize: int = None,
     unique_key: list[str] = None,
@@ -1,2 +1,4 @@
 import pandera as pa
-from pandera import Check, Column, DataFrameSchema, check_input, check_io, check_output, check, check_types
\ No newline at end of file
+from pandera import Check, Column, DataFrameSchema, check_input, check_io, check_output, check, check_types
+from lichens.validator.validator import *
+from lichens.validator.fast_checks import *
\ No newline at end of file
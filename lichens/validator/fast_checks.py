@@ -0,0 +1,268 @@
+import copy
+import re
+from typing import Any, Callable, Iterable
+
+import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame
+from pandas.core.series import Series
+from pandera import Check, DataFrameSchema
+
+from lichens.errors.validation_errors import ValidationFailedError
+
+
+def _categorical_aware(fn: Callable[[Series], Series]) -> Callable[[Series], np.ndarray]:
+    """Evaluate `fn` on the distinct values only if `s` is categorical or of objects, then broadcast it by codes.
+    A value `fn` cannot evaluate, e.g., `str_startswith` on the number 5 or `ge(0)` on a string, fails;
+    nulls pass and are left to `nullable`."""
+    def wrapper(s: Series) -> np.ndarray:
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            codes, uniques = s.cat.codes.to_numpy(), s.cat.categories
+        elif s.dtype == object:
+            codes, uniques = pd.factorize(s, use_na_sentinel=True)
+        else:
+            try:
+                valid: np.ndarray = fn(s).fillna(False).astype(bool).to_numpy()
+            except (TypeError, AttributeError):  # e.g., a number compared with a string
+                valid = np.zeros(len(s), dtype=bool)
+            return valid | s.isna().to_numpy() if s.hasnans else valid
+        try:
+            on_uniques: np.ndarray = fn(Series(uniques, dtype=object)).fillna(False).astype(bool).to_numpy()
+        except (TypeError, AttributeError):  # mixed values: find the ones which cannot be evaluated
+            on_uniques = np.array([_valid_value(fn, v) for v in uniques], dtype=bool)
+        return np.append(on_uniques, True)[codes]  # code -1 (null) picks the trailing True
+    return wrapper
+
+
+def _valid_value(fn: Callable[[Series], Series], value: Any) -> bool:
+    try:
+        return bool(fn(Series([value], dtype=object)).fillna(False).iloc[0])
+    except (TypeError, AttributeError):
+        return False
+
+
+class FastCheck:
+    """
+    A vectorized check on a column. `mask(s)` returns a boolean array where True means valid.
+    Nulls pass all checks but `not_null()`, the same as pandera's `ignore_na=True`.
+
+    Args:
+        name (str): name of the check shown in the failure report.
+        func (Callable[[Series], np.ndarray]): returns the valid mask of a Series.
+    """
+    def __init__(self, name: str, func: Callable[[Series], np.ndarray]) -> None:
+        self.name: str = name
+        self.func: Callable[[Series], np.ndarray] = func
+
+    def __repr__(self) -> str:
+        return f"FastCheck({self.name})"
+
+    def mask(self, s: Series) -> np.ndarray:
+        return self.func(s)
+
+    @classmethod
+    def not_null(cls) -> "FastCheck":
+        return cls("not_null", lambda s: s.notna().to_numpy())
+
+    @classmethod
+    def in_range(cls, min_value: Any = None, max_value: Any = None, include_min: bool = True, include_max: bool = True) -> "FastCheck":
+        def _check(s: Series) -> Series:
+            ok: Series = Series(True, index=s.index)
+            if min_value is not None:
+                ok &= s.ge(min_value) if include_min else s.gt(min_value)
+            if max_value is not None:
+                ok &= s.le(max_value) if include_max else s.lt(max_value)
+            return ok
+        return cls(f"in_range({min_value}, {max_value})", _categorical_aware(_check))
+
+    @classmethod
+    def ge(cls, value: Any) -> "FastCheck":
+        return cls(f"ge({value})", _categorical_aware(lambda s: s.ge(value)))
+
+    @classmethod
+    def gt(cls, value: Any) -> "FastCheck":
+        return cls(f"gt({value})", _categorical_aware(lambda s: s.gt(value)))
+
+    @classmethod
+    def le(cls, value: Any) -> "FastCheck":
+        return cls(f"le({value})", _categorical_aware(lambda s: s.le(value)))
+
+    @classmethod
+    def lt(cls, value: Any) -> "FastCheck":
+        return cls(f"lt({value})", _categorical_aware(lambda s: s.lt(value)))
+
+    @classmethod
+    def eq(cls, value: Any) -> "FastCheck":
+        return cls(f"eq({value})", _categorical_aware(lambda s: s.eq(value)))
+
+    @classmethod
+    def ne(cls, value: Any) -> "FastCheck":
+        return cls(f"ne({value})", _categorical_aware(lambda s: s.ne(value)))
+
+    @classmethod
+    def isin(cls, values: Iterable) -> "FastCheck":
+        values = list(values)
+        return cls(f"isin({values})", _categorical_aware(lambda s: s.isin(values)))
+
+    @classmethod
+    def notin(cls, values: Iterable) -> "FastCheck":
+        values = list(values)
+        return cls(f"notin({values})", _categorical_aware(lambda s: ~s.isin(values)))
+
+    @classmethod
+    def str_startswith(cls, prefix: str) -> "FastCheck":
+        return cls(f"str_startswith({prefix})", _categorical_aware(lambda s: s.str.startswith(prefix)))
+
+    @classmethod
+    def str_endswith(cls, suffix: str) -> "FastCheck":
+        return cls(f"str_endswith({suffix})", _categorical_aware(lambda s: s.str.endswith(suffix)))
+
+    @classmethod
+    def str_matches(cls, pattern: str | re.Pattern) -> "FastCheck":
+        return cls(f"str_matches({getattr(pattern, 'pattern', pattern)})", _categorical_aware(lambda s: s.str.match(pattern)))
+
+
+# pandera built-in check name -> FastCheck factory of its statistics
+_PANDERA_CHECKS: dict[str, Callable[..., FastCheck]] = {
+    "greater_than_or_equal_to": lambda min_value: FastCheck.ge(min_value),
+    "greater_than": lambda min_value: FastCheck.gt(min_value),
+    "less_than_or_equal_to": lambda max_value: FastCheck.le(max_value),
+    "less_than": lambda max_value: FastCheck.lt(max_value),
+    "equal_to": lambda value: FastCheck.eq(value),
+    "not_equal_to": lambda value: FastCheck.ne(value),
+    "in_range": FastCheck.in_range,
+    "isin": lambda allowed_values: FastCheck.isin(allowed_values),
+    "notin": lambda forbidden_values: FastCheck.notin(forbidden_values),
+    "str_startswith": lambda string: FastCheck.str_startswith(string),
+    "str_endswith": lambda string: FastCheck.str_endswith(string),
+    "str_matches": lambda pattern: FastCheck.str_matches(pattern),
+}
+
+
+class FastSchema:
+    """
+    A set of vectorized checks which bypasses pandera's per-check machinery for the simple cases:
+    not-null, ranges, `isin`, string prefix/regex and uniqueness on `unique_key`.
+    The gain is modest end to end, since dtypes still run in pandera: about 1.09x to 1.4x at 300k rows
+    in `benchmarks/bench_validator.py`, while the fast checks alone are about 3.5x to 4.5x faster.
+
+    Args:
+        columns (dict[str, list[FastCheck]]): checks of each column.
+        unique_key (list[str], optional): the columns must be unique together, e.g., the `unique_key` of `load_df`. Defaults to None.
+        schema (DataFrameSchema, optional): a pandera schema run after the fast checks, for dtypes and custom checks. Defaults to None.
+
+    Example:
+    ```
+    fast = FastSchema(
+        {
+            "column1": [FastCheck.not_null(), FastCheck.in_range(0, 10)],
+            "column3": [FastCheck.str_startswith("value_")],
+        },
+        unique_key=["column1", "column3"],
+    )
+    validated_df = fast.validate(df)
+
+    # Or split an existing pandera schema into fast checks and the rest
+    fast = FastSchema.from_pandera(schema, unique_key=["column1", "column3"])
+    ```
+    """
+    def __init__(self, columns: dict[str, list[FastCheck]], unique_key: list[str] = None, schema: DataFrameSchema = None) -> None:
+        self.columns: dict[str, list[FastCheck]] = columns
+        self.unique_key: list[str] = unique_key
+        self.schema: DataFrameSchema = schema
+
+    @classmethod
+    def from_pandera(cls, schema: DataFrameSchema, unique_key: list[str] = None) -> "FastSchema":
+        """Translate the built-in checks, nullability and uniqueness of a pandera schema into fast checks.
+        Whatever cannot be translated, e.g., dtypes and custom checks, stays in the remaining pandera schema,
+        as do all the checks of the columns pandera coerces, since the fast checks run on the raw values.
+
+        Args:
+            schema (DataFrameSchema): the pandera schema.
+            unique_key (list[str], optional): overrides `schema.unique`. Defaults to None.
+
+        Returns:
+            FastSchema: the fast schema.
+        """
+        columns: dict[str, list[FastCheck]] = {}
+        rest: DataFrameSchema = copy.deepcopy(schema)
+        for name, col in schema.columns.items():
+            if col.coerce or schema.coerce:
+                continue
+            fast: list[FastCheck] = []
+            slow: list[Check] = []
+            if not col.nullable:
+                fast.append(FastCheck.not_null())
+            if col.unique:
+                fast.append(FastCheck("unique", lambda s: ~s.duplicated(keep=False).to_numpy()))
+            for check in col.checks:
+                factory = _PANDERA_CHECKS.get(check.name)
+                if factory is not None and check.ignore_na and not check.groupby:
+                    fast.append(factory(**check.statistics))
+                else:
+                    slow.append(check)
+            columns[name] = fast
+            rest = rest.update_column(name, checks=slow, nullable=True, unique=False)
+
+        if unique_key is None and schema.unique:
+            unique_key = list(schema.unique)
+        rest.unique = None
+        return cls(columns, unique_key=unique_key, schema=rest)
+
+    def report(self, df: DataFrame, sample: int = 5) -> DataFrame:
+        """Run the fast checks and return the failures in one row per failed check.
+
+        Args:
+            df (DataFrame): the DataFrame to check.
+            sample (int, optional): number of failed index kept in the report. Defaults to 5.
+
+        Returns:
+            DataFrame: columns `column`, `check`, `failed` and `index_sample`. Empty if all passed.
+        """
+        rows: list[dict[str, Any]] = []
+
+        def _collect(column: str, check: str, valid: np.ndarray) -> None:
+            failed: np.ndarray = np.flatnonzero(~valid)
+            if len(failed):
+                rows.append({
+                    "column": column,
+                    "check": check,
+                    "failed": len(failed),
+                    "index_sample": df.index[failed[:sample]].tolist(),
+                })
+
+        for name, checks in self.columns.items():
+            if name not in df.columns:
+                rows.append({"column": name, "check": "column_in_dataframe", "failed": len(df), "index_sample": []})
+                continue
+            s: Series = df[name]
+            for check in checks:
+                _collect(name, check.name, check.mask(s))
+        if self.unique_key:
+            _collect(",".join(self.unique_key), "unique_key", ~df.duplicated(subset=self.unique_key, keep=False).to_numpy())
+        return DataFrame(rows, columns=["column", "check", "failed", "index_sample"])
+
+    def validate(self, df: DataFrame) -> DataFrame:
+        """Run the fast checks, then the remaining pandera schema if any.
+
+        Args:
+            df (DataFrame): the DataFrame to validate.
+
+        Raises:
+            ValidationFailedError: with the compact failure report as `failure_cases`.
+
+        Returns:
+            DataFrame: the validated DataFrame.
+        """
+        failure_cases: DataFrame = self.report(df)
+        if len(failure_cases):
+            raise ValidationFailedError(
+                f"{int(failure_cases['failed'].sum())} failure(s) in {len(failure_cases)} check(s).",
+                failure_cases,
+            )
+        if self.schema is not None:
+            df = self.schema.validate(df)
+        return df
+
+    def __call__(self, df: DataFrame) -> DataFrame:
+        return self.validate(df)
@@ -0,0 +1,214 @@
+import copy
+import os
+import pickle
+import threading
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor
+from itertools import repeat
+from logging import getLogger
+from typing import Callable
+
+import pandas as pd
+from pandas.core.frame import DataFrame
+from pandera import Check, Column, DataFrameSchema, Index
+from pandera.errors import SchemaError, SchemaErrors
+
+from lichens.errors.validation_errors import ValidationFailedError
+
+log = getLogger()
+
+# checks of a column evaluated over all its values at once, which cannot be split into chunks
+CROSS_ROW_CHECKS: set[str] = {"unique_values_eq"}
+
+_schema_cache: dict[str, tuple[DataFrameSchema, "_Prepared"]] = {}
+_worker_schemas: dict[bytes, DataFrameSchema] = {}
+_pools: dict[int, ProcessPoolExecutor] = {}
+_pools_lock: threading.Lock = threading.Lock()
+
+
+class _Prepared:
+    """A schema split into the row-wise checks validated by chunks and the checks across rows validated on the whole frame."""
+    def __init__(self, schema: DataFrameSchema) -> None:
+        self.rows, self.frame = _split_schema(schema)
+        self._payload: bytes = None
+
+    @property
+    def payload(self) -> bytes:
+        """The pickled row-wise schema sent to the workers."""
+        if self._payload is None:
+            self._payload = pickle.dumps(self.rows)
+        return self._payload
+
+
+def _split_schema(schema: DataFrameSchema) -> tuple[DataFrameSchema, DataFrameSchema | None]:
+    rows: DataFrameSchema = copy.deepcopy(schema)
+    columns: dict[str, Column] = {}
+    for name, column in rows.columns.items():
+        cross_row: list[Check] = [c for c in column.checks if c.name in CROSS_ROW_CHECKS]
+        if column.unique or cross_row:
+            columns[name] = Column(
+                checks=cross_row, unique=column.unique, report_duplicates=column.report_duplicates,
+                nullable=True, required=False, regex=column.regex, name=name,
+            )
+            column.unique = False
+            column.checks = [c for c in column.checks if c.name not in CROSS_ROW_CHECKS]
+    index: Index | None = None
+    if isinstance(rows.index, Index) and rows.index.unique:
+        index = Index(unique=True, report_duplicates=rows.index.report_duplicates, name=rows.index.name)
+        rows.index.unique = False
+    if not (columns or index is not None or schema.checks or schema.unique):
+        return rows, None
+    frame = DataFrameSchema(
+        columns, checks=schema.checks, index=index, unique=schema.unique, report_duplicates=schema.report_duplicates,
+    )
+    rows.checks = []
+    rows.unique = None
+    return rows, frame
+
+
+def get_schema(key: str, schema: DataFrameSchema | Callable[[], DataFrameSchema]) -> DataFrameSchema:
+    """Get the prepared schema of an ETL from the cache. Build and cache it at the first call.
+
+    Args:
+        key (str): cache key, usually the ETL name.
+        schema (DataFrameSchema | Callable[[], DataFrameSchema]): the schema, or a function builds it.
+
+    Returns:
+        DataFrameSchema: the cached schema.
+    """
+    if key not in _schema_cache:
+        _schema: DataFrameSchema = schema() if callable(schema) and not isinstance(schema, DataFrameSchema) else schema
+        _schema_cache[key] = (_schema, _Prepared(_schema))
+    return _schema_cache[key][0]
+
+
+def clear_schema_cache() -> None:
+    _schema_cache.clear()
+
+
+def shutdown_pools(wait: bool = True) -> None:
+    """Shut down the process pools kept by `validate_chunked`. They are started again when needed."""
+    with _pools_lock:
+        pools: list[ProcessPoolExecutor] = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait)
+
+
+def _shared_pool(workers: int) -> ProcessPoolExecutor:
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return _pools[workers]
+
+
+def _drop_pool(pool: Executor) -> None:
+    with _pools_lock:
+        for workers, p in list(_pools.items()):
+            if p is pool:
+                del _pools[workers]
+
+
+def _validate_chunk(chunk: DataFrame, schema: DataFrameSchema = None, payload: bytes = None) -> tuple[DataFrame | None, DataFrame | None]:
+    if schema is None:
+        schema = _worker_schemas.get(payload)
+        if schema is None:
+            if len(_worker_schemas) >= 32:
+                _worker_schemas.clear()
+            schema = _worker_schemas[payload] = pickle.loads(payload)
+    try:
+        return schema.validate(chunk, lazy=True), None
+    except SchemaErrors as e:
+        return None, e.failure_cases
+    except SchemaError as e:
+        return None, DataFrame({"check": [str(e.check)], "failure_case": [str(e)], "index": [None]})
+
+
+def validate_chunked(
+    df: DataFrame,
+    schema: DataFrameSchema,
+    chunksize: int = 500_000,
+    workers: int = None,
+    key: str = None,
+    sample: float | int = None,
+    random_state: int = None,
+    executor: Executor = None,
+) -> DataFrame:
+    """
+    Validate a DataFrame by chunks in parallel on a process pool.
+
+    Only the row-wise checks are run by chunks. Checks across rows, i.e., `unique` and `report_duplicates`
+    of the columns, index and schema, dataframe-wide checks and `CROSS_ROW_CHECKS`, run once on the whole frame.
+    The failure cases of all the chunks and the whole frame are merged and raised in one `ValidationFailedError`.
+
+    Args:
+        df (DataFrame): the DataFrame to validate.
+        schema (DataFrameSchema): the pandera schema.
+        chunksize (int, optional): rows of each chunk. Defaults to 500_000.
+        workers (int, optional): size of process pool. Defaults to `os.cpu_count()`.
+            The pool is kept by the module and reused by the next calls; see `shutdown_pools()`.
+        key (str, optional): cache key of the prepared schema, usually the ETL name. Defaults to None.
+        sample (float | int, optional): Fast check mode for trusted sources. Validate only a random sample,
+            a fraction if float or number of rows if int, and return `df` as is. Defaults to None.
+        random_state (int, optional): seed of sampling. Defaults to None.
+        executor (Executor, optional): run the chunks on this pool instead, e.g., one owned by the application. Defaults to None.
+
+    Raises:
+        ValidationFailedError: with the merged `failure_cases`.
+
+    Returns:
+        DataFrame: the validated DataFrame.
+
+    Example:
+    ```
+    validated_df = validate_chunked(df, schema, chunksize=200_000, workers=4, key=em.name)
+
+    # Fast check mode: validate 1% rows only
+    df = validate_chunked(df, schema, key=em.name, sample=0.01)
+    ```
+    """
+    if key:
+        get_schema(key, schema)
+        prepared: _Prepared = _schema_cache[key][1]
+    else:
+        prepared = _Prepared(schema)
+
+    if sample is not None:
+        target: DataFrame = (
+            df.sample(frac=sample, random_state=random_state)
+            if isinstance(sample, float)
+            else df.sample(n=min(sample, len(df)), random_state=random_state)
+        )
+        _ = _run(target, prepared, chunksize, workers, executor)
+        return df
+    return _run(df, prepared, chunksize, workers, executor)
+
+
+def _run(df: DataFrame, prepared: _Prepared, chunksize: int, workers: int, executor: Executor) -> DataFrame:
+    chunks: list[DataFrame] = [df.iloc[i : i + chunksize] for i in range(0, len(df), chunksize)] or [df]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+
+    if executor is None and workers <= 1:
+        results = [_validate_chunk(chunk, prepared.rows) for chunk in chunks]
+    else:
+        pool: Executor = executor or _shared_pool(workers)
+        try:
+            results = list(pool.map(_validate_chunk, chunks, repeat(None), repeat(prepared.payload)))
+        except BrokenExecutor:
+            if executor is None:
+                _drop_pool(pool)
+            raise
+
+    failures: list[DataFrame] = [f for _, f in results if f is not None]
+    validated: list[DataFrame] = [v for v, _ in results]
+    validated_df: DataFrame = df if failures else validated[0] if len(validated) == 1 else pd.concat(validated)
+    frame_failure: DataFrame | None = None
+    if prepared.frame is not None:
+        frame_failure = _validate_chunk(validated_df, prepared.frame)[1]
+    if failures or frame_failure is not None:
+        failure_cases: DataFrame = pd.concat(failures if frame_failure is None else failures + [frame_failure], ignore_index=True)
+        across: str = "" if frame_failure is None else " and in the checks across rows"
+        raise ValidationFailedError(
+            f"{len(failure_cases)} failure case(s) in {len(failures)} of {len(chunks)} chunk(s){across}.",
+            failure_cases,
+        )
+    return validated_df
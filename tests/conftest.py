@@ -0,0 +1,50 @@
+from typing import Callable
+
+import pytest
+from sqlalchemy import Connection, Engine, text
+
+from lichens.db.migrate import upgrade
+from lichens.db.utils import get_engine
+from lichens.db.writers import Chunk, SqliteWriter
+from lichens.manager import EtlManager
+from lichens.tools.tools import add_etl, add_file
+
+
+class FlakyWriter(SqliteWriter):
+    """Runs `fail[index]` on the connection before the chunk `index`, once, e.g., to raise an error in the middle of a load."""
+    def __init__(self) -> None:
+        self.fail: dict[int, Callable[[Connection], None]] = {}
+
+    def chunks(self, *args, **kwargs) -> list[Chunk]:
+        def _execute(con: Connection, chunk: Chunk) -> None:
+            inject = self.fail.pop(chunk.index, None)
+            if inject is not None:
+                inject(con)
+            chunk.execute(con)
+        return [c._replace(execute=lambda con, c=c: _execute(con, c)) for c in super().chunks(*args, **kwargs)]
+
+
+@pytest.fixture
+def sqlite_url(tmp_path) -> str:
+    url: str = f"sqlite:///{tmp_path / 'lichens.db'}"
+    upgrade(url)
+    add_etl("test", str(tmp_path), str(tmp_path), {}, 1, url)
+    add_file("f.csv", 1, 1, url)
+    return url
+
+
+@pytest.fixture
+def engine(sqlite_url) -> Engine:
+    return get_engine(sqlite_url)
+
+
+@pytest.fixture
+def em(sqlite_url) -> EtlManager:
+    em = EtlManager(sqlite_url, "test", writer=FlakyWriter())
+    yield em
+    em.close()
+
+
+def rows(engine: Engine, sql: str) -> list[tuple]:
+    with engine.connect() as con:
+        return [tuple(r) for r in con.execute(text(sql))]
@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+from lichens.utils.cache import ExtractCache, arguments_key
+
+
+@pytest.fixture
+def csv(tmp_path):
+    fp = tmp_path / "a.csv"
+    fp.write_text("x;y\n1;2\n")
+    return fp
+
+
+def test_arguments_are_part_of_the_key(tmp_path, csv):
+    cache = ExtractCache(tmp_path / "cache")
+    assert list(cache.get_or_extract(csv, pd.read_csv).columns) == ["x;y"]
+    assert list(cache.get_or_extract(csv, pd.read_csv, sep=";").columns) == ["x", "y"]
+    assert list(cache.get_or_extract(csv, pd.read_csv).columns) == ["x;y"]
+    assert len(cache._entries()) == 2
+
+
+def test_unkeyable_arguments_bypass_cache(tmp_path, csv):
+    cache = ExtractCache(tmp_path / "cache")
+    df = cache.get_or_extract(csv, pd.read_csv, sep=";", converters={"x": lambda v: int(v) * 10})
+    assert df["x"].tolist() == [10]
+    assert not cache._entries()
+
+
+def test_extractors_of_other_modules_are_keyed_apart(tmp_path, csv):
+    cache = ExtractCache(tmp_path / "cache")
+    extractors = []
+    for module, sep in (("etl_a", ","), ("etl_b", ";")):
+        namespace = {"pd": pd, "__name__": module}
+        exec(f"def extract(fp):\n    return pd.read_csv(fp, sep={sep!r})", namespace)
+        extractors.append(namespace["extract"])
+    assert extractors[0].__qualname__ == extractors[1].__qualname__
+    assert list(cache.get_or_extract(csv, extractors[0]).columns) == ["x;y"]
+    assert list(cache.get_or_extract(csv, extractors[1]).columns) == ["x", "y"]
+    assert len(cache._entries()) == 2
+
+
+def test_arguments_key_is_order_independent():
+    assert arguments_key((), {"sep": ";", "dtype": {"b": str, "a": int}}) == arguments_key((), {"dtype": {"a": int, "b": str}, "sep": ";"})
+    assert arguments_key((0,), {}) != arguments_key((), {"sheet_name": 0})
+    assert arguments_key((object(),), {}) is None
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from lichens.tracing import start_trace
+from lichens.utils.compact import compact_df
+
+
+def test_input_frame_is_not_modified():
+    df = pd.DataFrame({"id": np.arange(10, dtype=np.int64), "grade": ["A", "B"] * 5})
+    compacted = compact_df(df)
+    assert df["id"].dtype == np.int64 and df["grade"].dtype == object
+    assert "memory_report" not in df.attrs
+    assert compacted["id"].dtype == np.int8
+    assert compacted.attrs["memory_report"]["columns"]["grade"] == "object->category"
+
+
+def test_unchanged_frame_gets_report_on_copy():
+    df = pd.DataFrame({"value": [0.1, 0.2]})
+    compacted = compact_df(df)
+    assert compacted is not df
+    assert "memory_report" not in df.attrs
+    assert compacted.attrs["memory_report"]["columns"] == {}
+
+
+def test_report_is_recorded_on_trace():
+    df = pd.DataFrame({"id": np.arange(10, dtype=np.int64)})
+    with start_trace("sample.csv") as root:
+        compact_df(df)
+    assert root.trace.records["memory_report"]["columns"] == {"id": "int64->int8"}
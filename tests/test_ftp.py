@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+
+import pytest
+
+pyftpdlib = pytest.importorskip("pyftpdlib")
+from pyftpdlib.authorizers import DummyAuthorizer
+from pyftpdlib.handlers import DTPHandler, FTPHandler, ThrottledDTPHandler
+from pyftpdlib.servers import ThreadedFTPServer
+
+from lichens.utils.ftp import FtpServer
+
+FILES: dict[str, bytes] = {f"f{i}.bin": os.urandom(64 * 1024 + i) for i in range(5)}
+
+
+@pytest.fixture
+def dtp_handler():
+    return DTPHandler
+
+
+@pytest.fixture
+def server(tmp_path, dtp_handler):
+    root = tmp_path / "remote"
+    (root / "in").mkdir(parents=True)
+    (root / "out").mkdir()
+    for name, data in FILES.items():
+        (root / "in" / name).write_bytes(data)
+    authorizer = DummyAuthorizer()
+    authorizer.add_user("user", "secret", str(root), perm="elradfmwMT")
+    handler = type("Handler", (FTPHandler,), {"authorizer": authorizer, "banner": "test", "dtp_handler": dtp_handler})
+    srv = ThreadedFTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=srv.serve_forever, kwargs={"timeout": 0.1}, daemon=True)
+    thread.start()
+    yield root, srv.address[1]
+    srv.close_all()
+    thread.join(5)
+
+
+@pytest.fixture
+def ftp(server):
+    ftp = FtpServer(timeout=10)
+    ftp.connect("127.0.0.1", server[1])
+    ftp.login("user", "secret")
+    yield ftp
+    ftp.close()
+
+
+def test_parallel_batch_download(server, ftp, tmp_path):
+    dst = tmp_path / "local"
+    dst.mkdir()
+    report = ftp.parallel_batch_download("/in", dst, workers=3)
+    assert report.files == len(FILES) and not report.failed
+    assert report.bytes == sum(map(len, FILES.values()))
+    for name, data in FILES.items():
+        assert (dst / name).read_bytes() == data
+
+
+def test_parallel_batch_upload(server, ftp, tmp_path):
+    src = tmp_path / "local"
+    src.mkdir()
+    for name, data in FILES.items():
+        (src / name).write_bytes(data)
+    report = ftp.parallel_batch_upload(src, "/out", filter_regex="*.bin", workers=3)
+    assert report.files == len(FILES) and not report.failed
+    for name, data in FILES.items():
+        assert (server[0] / "out" / name).read_bytes() == data
+    # unchanged files are not sent again
+    assert ftp.parallel_batch_upload(src, "/out", workers=3).bytes == 0
+
+
+def test_download_resumes_truncated_file(server, ftp, tmp_path):
+    dst = tmp_path / "local"
+    dst.mkdir()
+    data = FILES["f0.bin"]
+    (dst / "f0.bin").write_bytes(data[:1000])
+    report = ftp.parallel_batch_download("/in", dst, filter_regex="f0.bin", workers=1)
+    assert report.files == 1
+    assert report.bytes == len(data) - 1000
+    assert (dst / "f0.bin").read_bytes() == data
+
+
+def test_failed_file_is_reported(server, ftp, tmp_path):
+    (server[0] / "in" / "broken.bin").mkdir()  # listed, but RETR of a directory fails
+    dst = tmp_path / "local"
+    dst.mkdir()
+    report = ftp.parallel_batch_download("/in", dst, workers=2, retries=1)
+    assert report.files == len(FILES)
+    assert list(report.failed) == ["/in/broken.bin"]
+
+
+@pytest.mark.parametrize("dtp_handler", [type("SlowDTPHandler", (ThrottledDTPHandler,), {"write_limit": 1024})])
+def test_closing_stream_aborts_blocked_transfer(server, tmp_path):
+    ftp = FtpServer(timeout=None)  # a read of the transfer blocks until data arrives
+    ftp.connect("127.0.0.1", server[1])
+    ftp.login("user", "secret")
+    stream = ftp.open_stream("/in/f0.bin", archive_path=tmp_path / "f0.bin", buffer_size=16)
+    assert stream.read(16) == FILES["f0.bin"][:16]
+    started = time.monotonic()
+    stream.close()
+    assert time.monotonic() - started < 2
+    assert not stream.raw._thread.is_alive()
+    assert not (tmp_path / "f0.bin").exists() and not (tmp_path / "f0.bin.part").exists()
+    ftp.close()
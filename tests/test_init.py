@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+import lichens
+
+
+def test_unknown_name_raises_without_heavy_imports():
+    code = (
+        "import sys, lichens\n"
+        "assert not hasattr(lichens, 'EtlManger')\n"
+        "assert not {'pandas', 'sqlalchemy', 'pandera'} & set(sys.modules), sorted(sys.modules)\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(os.path.dirname(lichens.__file__)))
+
+
+def test_names_of_the_old_star_import_resolve():
+    from lichens.errors.db_errors import InsertInterruptedError
+    from lichens.manager.manager import EtlManager
+
+    assert lichens.EtlManager is EtlManager and lichens.InsertInterruptedError is InsertInterruptedError
+    assert lichens.os.__name__ == "os" and lichens.pa.__name__ == "pandera"
+    assert all(hasattr(lichens, name) for name in lichens.__all__)
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from conftest import rows
+from lichens.db.writers import SqliteWriter
+from lichens.errors.db_errors import InsertInterruptedError
+from lichens.utils.load import LoadTarget, RenderedFrame, sql_literal
+
+
+@pytest.fixture
+def nullable() -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": [1, 2, 3],
+        "count": pd.array([1, None, 3], dtype="Int64"),
+        "flag": pd.array([True, None, False], dtype="boolean"),
+        "name": pd.array(["a'b", None, "c"], dtype="string"),
+    })
+
+
+@pytest.mark.parametrize("value", [None, np.nan, pd.NaT, pd.NA])
+def test_sql_literal_missing(value):
+    assert sql_literal(value) == "NULL"
+
+
+def test_render_nullable_columns(nullable):
+    frame = RenderedFrame(nullable)
+    assert frame.column("count") == ["1", "NULL", "3"]
+    assert frame.column("flag") == ["TRUE", "NULL", "FALSE"]
+    assert frame.column("name") == ["'a''b'", "NULL", "'c'"]
+
+
+def test_render_numpy_columns():
+    frame = RenderedFrame(pd.DataFrame({"i": np.array([1, -2]), "b": [True, False], "f": [0.5, np.nan]}))
+    assert frame.column("i") == ["1", "-2"]
+    assert frame.column("b") == ["TRUE", "FALSE"]
+    assert frame.column("f") == ["0.5", "NULL"]
+
+
+def test_write_nullable_columns(nullable):
+    engine = create_engine("sqlite://")
+    with engine.begin() as con:
+        con.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, count INTEGER, flag BOOLEAN, name TEXT)"))
+        SqliteWriter().write(con, RenderedFrame(nullable), "t", list(nullable.columns))
+        rows = con.execute(text("SELECT id, count, flag, name FROM t ORDER BY id")).all()
+    assert rows == [(1, 1, 1, "a'b"), (2, None, None, None), (3, 3, 0, "c")]
+
+
+@pytest.fixture
+def lots(engine):
+    with engine.begin() as con:
+        con.execute(text("CREATE TABLE lot_header (lot_id TEXT PRIMARY KEY, product TEXT)"))
+        con.execute(text(
+            "CREATE TABLE lot_detail (lot_id TEXT REFERENCES lot_header (lot_id), seq INTEGER, value REAL CHECK (value >= 0), "
+            "PRIMARY KEY (lot_id, seq))"
+        ))
+        # the order the rows are written in
+        con.execute(text("CREATE TABLE written (tablename TEXT)"))
+        for table in ("lot_header", "lot_detail"):
+            con.execute(text(f"CREATE TRIGGER {table}_written AFTER INSERT ON {table} BEGIN INSERT INTO written VALUES ('{table}'); END"))
+    return pd.DataFrame({
+        "lot_id": ["L1", "L1", "L1", "L2", "L2"],
+        "product": ["p1", "p1", "p1", "p2", "p2"],
+        "seq": [1, 2, 3, 1, 2],
+        "value": [0.5, 1.5, 2.5, 3.5, 4.5],
+    })
+
+
+# the detail table first, as a caller may list them
+TARGETS: list[LoadTarget] = [
+    LoadTarget("lot_detail", columns=["lot_id", "seq", "value"], if_exists="replace", unique_key=["lot_id", "seq"]),
+    LoadTarget("lot_header", columns=["lot_id", "product"], if_exists="skip", unique_key=["lot_id"]),
+]
+
+
+def test_load_many_writes_referenced_table_first(em, engine, lots):
+    report = em.load_many(TARGETS, df=lots, chunksize=2)
+    assert report.rows == {"lot_header": 2, "lot_detail": 5}
+    written = [r[0] for r in rows(engine, "SELECT tablename FROM written ORDER BY rowid")]
+    assert written == ["lot_header"] * 2 + ["lot_detail"] * 5
+
+
+def test_load_many_writes_distinct_projection(em, engine, lots):
+    em.load_many(TARGETS, df=lots)
+    assert rows(engine, "SELECT lot_id, product FROM lot_header ORDER BY lot_id") == [("L1", "p1"), ("L2", "p2")]
+    assert rows(engine, "SELECT count(*) FROM lot_detail") == [(5,)]
+
+
+def test_load_many_renders_shared_frame_once(em, lots, monkeypatch):
+    frames: list[RenderedFrame] = []
+    rendered: list[str] = []
+
+    class SpyFrame(RenderedFrame):
+        def __init__(self, df):
+            super().__init__(df)
+            frames.append(self)
+
+        def column(self, name):
+            if name not in self._columns:
+                rendered.append(name)
+            return super().column(name)
+    monkeypatch.setattr("lichens.manager.manager.RenderedFrame", SpyFrame)
+    em.load_many(TARGETS, df=lots, chunksize=2)
+    assert len(frames) == 1
+    assert sorted(rendered) == ["lot_id", "product", "seq", "value"]
+
+
+def test_load_many_rolls_back_all_targets(em, engine, lots):
+    lots.loc[4, "value"] = -1.0  # violates the check of lot_detail, after the header is written
+    with pytest.raises(InsertInterruptedError):
+        em.load_many(TARGETS, df=lots, chunksize=2)
+    assert rows(engine, "SELECT count(*) FROM written") == [(0,)]
+    assert rows(engine, "SELECT count(*) FROM lot_header") == [(0,)]
+    assert rows(engine, "SELECT count(*) FROM lot_detail") == [(0,)]
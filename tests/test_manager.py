@@ -0,0 +1,139 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from conftest import rows
+from lichens.db.retry import RetryPolicy
+from lichens.errors.db_errors import InsertInterruptedError
+from lichens.manager.manager import LOAD_PROGRESS_KEY
+
+
+def _missing_table(con):
+    con.execute(text("SELECT * FROM missing_table"))
+
+
+@pytest.fixture
+def table(engine):
+    with engine.begin() as con:
+        con.execute(text("CREATE TABLE r (id INTEGER PRIMARY KEY, v TEXT)"))
+    return "r"
+
+
+@pytest.fixture
+def df() -> pd.DataFrame:
+    return pd.DataFrame({"id": range(250), "v": ["x"] * 250})
+
+
+def _progress(engine) -> dict:
+    import json
+    last_log = rows(engine, "SELECT last_log FROM etl_proc_hist WHERE file_name = 'f.csv'")[0][0]
+    last_log = json.loads(last_log) if isinstance(last_log, str) else last_log or {}
+    return last_log.get(LOAD_PROGRESS_KEY) or {}
+
+
+def _load(em, df, table):
+    return em.load_df(df, table, if_exists="replace", unique_key=["id"], chunksize=50, commit_every=1, checkpoint="f.csv")
+
+
+def test_commit_every_keeps_committed_chunks_and_resumes(em, engine, table, df):
+    em.writer.fail[3] = _missing_table
+    with pytest.raises(InsertInterruptedError):
+        _load(em, df, table)
+    assert rows(engine, "SELECT count(*) FROM r") == [(150,)]
+    assert list(_progress(engine).values()) == [3]
+
+    report = _load(em, df, table)
+    assert report.resumed_chunks == 3 and report.chunks == 2
+    assert rows(engine, "SELECT count(*) FROM r") == [(250,)]
+    assert _progress(engine) == {}
+
+
+def test_changed_frame_does_not_resume(em, engine, table, df):
+    em.writer.fail[3] = _missing_table
+    with pytest.raises(InsertInterruptedError):
+        _load(em, df, table)
+
+    corrected = df.copy()
+    corrected.loc[101, "v"] = "y"  # committed already, neither the first nor the last row
+    report = _load(em, corrected, table)
+    assert report.resumed_chunks == 0 and report.chunks == 5
+    assert rows(engine, "SELECT v FROM r WHERE id = 101") == [("y",)]
+
+
+def _locked(con):
+    raise OperationalError("INSERT", {}, sqlite3.OperationalError("database is locked"))
+
+
+def _disconnected(con):
+    raise OperationalError("INSERT", {}, sqlite3.OperationalError("connection reset"), connection_invalidated=True)
+
+
+@pytest.fixture
+def quick_retry(em):
+    em.retry = RetryPolicy(max_attempts=3, base_delay=0.001)
+    return em
+
+
+def _load_once(em, df, table):
+    return em.load_df(df, table, if_exists="replace", unique_key=["id"], chunksize=50)
+
+
+def test_statement_retry(quick_retry, engine, table, df):
+    quick_retry.writer.fail[2] = _locked
+    report = _load_once(quick_retry, df, table)
+    assert (report.retries, report.reconnects, report.replayed_chunks) == (1, 0, 0)
+    assert rows(engine, "SELECT count(*) FROM r") == [(250,)]
+
+
+def test_reconnect_replays_transaction(quick_retry, engine, table, df):
+    quick_retry.writer.fail[3] = _disconnected
+    report = _load_once(quick_retry, df, table)
+    assert (report.retries, report.reconnects, report.replayed_chunks) == (1, 1, 3)
+    assert report.errors[0].startswith("r[3] connection")
+    assert rows(engine, "SELECT count(*) FROM r") == [(250,)]
+
+
+def test_failed_reconnect_is_another_attempt(quick_retry, engine, table, df, monkeypatch):
+    begin_load = quick_retry._begin_load
+    refused: list[int] = [1]
+
+    def _begin_load(sess):
+        if refused[0]:
+            refused[0] -= 1
+            raise OperationalError("connect", {}, sqlite3.OperationalError("connection refused"))
+        return begin_load(sess)
+    monkeypatch.setattr(quick_retry, "_begin_load", _begin_load)
+    quick_retry.writer.fail[3] = _disconnected
+    report = _load_once(quick_retry, df, table)
+    assert (report.retries, report.reconnects) == (2, 1)
+    assert rows(engine, "SELECT count(*) FROM r") == [(250,)]
+
+    refused[0] = 5
+    quick_retry.writer.fail[1] = _disconnected
+    with pytest.raises(InsertInterruptedError):
+        _load_once(quick_retry, df, table)
+
+
+def test_failed_listener_polls(em, engine, monkeypatch):
+    class BrokenListener:
+        channel = "lichens_etl_queue_1"
+
+        def wait(self, timeout):
+            raise TypeError("notifies() got an unexpected keyword argument 'timeout'")
+
+        def close(self):
+            pass
+
+    with engine.begin() as con:
+        con.execute(text("UPDATE etl_proc_hist SET status = 'success'"))
+    listens, sleeps = [], []
+    monkeypatch.setattr(em, "_listen", lambda: listens.append(1) or BrokenListener())
+    monkeypatch.setattr("lichens.manager.manager.sleep", sleeps.append)
+    clock = iter(range(0, 100, 10))
+    monkeypatch.setattr("lichens.manager.manager.time.monotonic", lambda: next(clock))
+    assert em.wait_for_work(timeout=25, poll_interval=10) == []
+    # one listen, then a sleep of the poll interval, per check of the queue
+    assert sleeps == [10, 5] and len(listens) == 3
@@ -0,0 +1,32 @@
+import threading
+
+from lichens.metrics import Counter, Histogram, Registry, generate_latest
+
+
+def test_observations_of_threads_are_merged():
+    registry = Registry()
+    rows = Counter("t_rows", "Rows.", ["table"], registry=registry)
+    seconds = Histogram("t_seconds", "Durations.", ["stage"], buckets=(0.1, 1.0), registry=registry)
+    gate = threading.Barrier(4)
+
+    def work():
+        gate.wait()
+        for _ in range(1000):
+            rows.labels("t").inc()
+            seconds.labels("load").observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    seconds.labels("load").observe(5.0)
+    assert rows.labels("t").value == 4000
+    assert seconds.labels("load").snapshot() == ([0, 4000, 1], 2005.0)
+    # the shards of the finished threads are folded, the one of this thread is kept
+    assert len(rows.labels("t")._shards) == 0 and len(seconds.labels("load")._shards) == 1
+    text = generate_latest(registry)
+    assert 't_rows_total{table="t"} 4000' in text
+    assert 't_seconds_bucket{stage="load",le="1.0"} 4000' in text
+    assert 't_seconds_bucket{stage="load",le="+Inf"} 4001' in text
+    assert 't_seconds_sum{stage="load"} 2005.0' in text
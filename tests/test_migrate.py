@@ -0,0 +1,15 @@
+from sqlalchemy import create_engine, inspect, text
+
+from lichens.db.migrate import upgrade
+from lichens.db.models import Base
+
+
+def test_upgrade_sqlite_creates_missing_tables_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'lichens.db'}")
+    assert upgrade(engine) is True
+    assert set(inspect(engine).get_table_names()) >= {t.name for t in Base.metadata.tables.values()}
+    assert upgrade(engine) is False
+    with engine.begin() as con:
+        con.execute(text("DROP TABLE etl_remote_manifest"))
+    assert upgrade(engine) is True
+    assert "etl_remote_manifest" in inspect(engine).get_table_names()
@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from lichens.errors.file_errors import RecordFormatError
+from lichens.utils.mmap_reader import iter_fixed_width, read_delimited, read_fixed_width
+
+
+def test_fixed_width_blank_fields_are_missing(tmp_path):
+    fp = tmp_path / "a.txt"
+    fp.write_bytes(b"LOT1  12 Y 1.5\r\nLOT2     N    \n\nLOT3   3     \n")
+    df = read_fixed_width(
+        fp, [(0, 6), (6, 8), (8, 11), (11, 14)], ["lot", "seq", "ok", "value"],
+        {"seq": "int64", "ok": "bool", "value": "float64"},
+    )
+    assert df["lot"].tolist() == ["LOT1", "LOT2", "LOT3"]
+    assert df["seq"].tolist() == [12, pd.NA, 3]
+    assert df["ok"].dtype == "boolean"
+    assert df["ok"].tolist() == [True, False, pd.NA]
+    assert df["value"].isna().tolist() == [False, True, True]
+
+
+def test_fixed_width_bool_without_blanks_is_numpy(tmp_path):
+    fp = tmp_path / "a.txt"
+    fp.write_bytes(b"1\n0\nT\n")
+    assert read_fixed_width(fp, [(0, 1)], ["ok"], {"ok": "bool"})["ok"].tolist() == [True, False, True]
+
+
+def test_fixed_width_requires_columns(tmp_path):
+    fp = tmp_path / "a.txt"
+    fp.write_bytes(b"LOT1\n")
+    with pytest.raises(ValueError):
+        list(iter_fixed_width(fp, [], []))
+
+
+def test_delimited(tmp_path):
+    fp = tmp_path / "a.csv"
+    fp.write_bytes(b"lot,seq,value\r\nLOT1,1,0.5\nLOT2,,\n")
+    df = read_delimited(fp, dtypes={"seq": "int32", "value": "float64"})
+    assert list(df.columns) == ["lot", "seq", "value"]
+    assert df["seq"].tolist() == [1, pd.NA]
+    with pytest.raises(RecordFormatError):
+        read_delimited(fp, names=["lot", "seq"])
+
+
+def test_delimited_header_only(tmp_path):
+    fp = tmp_path / "a.csv"
+    fp.write_bytes(b"# exported\n\nlot,seq\r\n")
+    df = read_delimited(fp, skiprows=1)
+    assert list(df.columns) == ["lot", "seq"] and df.empty
@@ -0,0 +1,10 @@
+import pytest
+
+from lichens.errors.db_errors import DialectNotSupportedError
+from lichens.tools.reports import queue_report, status_report
+
+
+@pytest.mark.parametrize("report", [status_report, queue_report])
+def test_reports_refuse_other_databases(sqlite_url, report):
+    with pytest.raises(DialectNotSupportedError, match="needs Postgres, not sqlite"):
+        report(sqlite_url)
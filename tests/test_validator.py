@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pandera as pa
+import pytest
+
+from lichens.errors.validation_errors import ValidationFailedError
+from lichens.validator import validator
+from lichens.validator import FastCheck, FastSchema, shutdown_pools, validate_chunked
+
+
+@pytest.fixture(autouse=True)
+def _pools():
+    yield
+    shutdown_pools()
+
+
+@pytest.fixture
+def df() -> pd.DataFrame:
+    return pd.DataFrame({"id": range(10), "name": [f"n{i}" for i in range(10)]})
+
+
+def test_unique_across_chunks(df):
+    schema = pa.DataFrameSchema({"id": pa.Column(int, pa.Check.ge(0), unique=True), "name": pa.Column(str)})
+    assert validate_chunked(df, schema, chunksize=3, workers=1).equals(df)
+    duplicated = pd.concat([df, df.iloc[[0]]], ignore_index=True)
+    with pytest.raises(ValidationFailedError) as e:
+        validate_chunked(duplicated, schema, chunksize=3, workers=2)
+    assert sorted(e.value.failure_cases["index"]) == [0, 10]
+
+
+def test_dataframe_checks_run_once_on_whole_frame(df):
+    schema = pa.DataFrameSchema(
+        {"id": pa.Column(int)}, checks=[pa.Check(lambda d: len(d) == 10)], unique=["id", "name"],
+    )
+    assert len(validate_chunked(df, schema, chunksize=3, workers=1)) == 10
+    with pytest.raises(ValidationFailedError):
+        validate_chunked(df.iloc[:9], schema, chunksize=3, workers=1)
+
+
+def test_row_checks_stay_chunked(df):
+    schema = pa.DataFrameSchema({"id": pa.Column(int, pa.Check.lt(5))})
+    with pytest.raises(ValidationFailedError) as e:
+        validate_chunked(df, schema, chunksize=3, workers=1)
+    assert "in 3 of 4 chunk(s)" in str(e.value.msg)
+
+
+def test_pool_is_reused(df):
+    schema = pa.DataFrameSchema({"id": pa.Column(int, pa.Check.ge(0))})
+    validate_chunked(df, schema, chunksize=3, workers=2)
+    pool = validator._pools[2]
+    validate_chunked(df, schema, chunksize=3, workers=2, key="test_pool_is_reused")
+    assert validator._pools[2] is pool
+
+
+def test_given_executor(df):
+    schema = pa.DataFrameSchema({"id": pa.Column(int, pa.Check.ge(0))})
+    with ThreadPoolExecutor(2) as executor:
+        assert len(validate_chunked(df, schema, chunksize=3, executor=executor)) == 10
+    assert not validator._pools
+
+
+@pytest.mark.parametrize("dtype", [object, "category"])
+def test_fast_check_fails_values_it_cannot_evaluate(dtype):
+    s = pd.Series(["LOT_1", 5, None, "X"], dtype=object).astype(dtype)
+    assert FastCheck.str_startswith("LOT_").mask(s).tolist() == [True, False, True, False]
+    assert FastCheck.str_matches(r"LOT_\d").mask(s).tolist() == [True, False, True, False]
+
+
+def test_fast_check_on_string_dtype():
+    s = pd.Series(["LOT_1", None, "X"], dtype="string")
+    assert FastCheck.str_endswith("1").mask(s).tolist() == [True, True, False]
+
+
+def test_fast_check_fails_mixed_values_instead_of_raising():
+    s = pd.Series([1, "a", None, -1], dtype=object)
+    assert FastCheck.ge(0).mask(s).tolist() == [True, False, True, False]
+    assert FastCheck.in_range(0, 10).mask(s).tolist() == [True, False, True, False]
+
+
+def test_from_pandera_keeps_checks_of_coerced_columns():
+    schema = pa.DataFrameSchema({
+        "id": pa.Column(int, pa.Check.ge(0), coerce=True),
+        "name": pa.Column(str, pa.Check.str_startswith("n")),
+    })
+    df = pd.DataFrame({"id": ["1", "2", "3"], "name": ["n1", "n2", "n3"]})
+    fast = FastSchema.from_pandera(schema)
+    assert "id" not in fast.columns and [c.name for c in fast.columns["name"]] == ["not_null", "str_startswith(n)"]
+    assert fast.validate(df)["id"].tolist() == [1, 2, 3]
+    with pytest.raises(pa.errors.SchemaError):
+        fast.validate(df.assign(id=["1", "-2", "3"]))